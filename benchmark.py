@@ -0,0 +1,10 @@
+import sys
+import numpy as np
+from equity_analysis.simulation import benchmark_mcs
+
+# Usage: python benchmark.py [simulations] [workers] [float32|float64]
+if __name__ == "__main__":
+    arguments = sys.argv[1:]
+    benchmark_mcs(simulations=int(arguments[0]) if arguments else 10_000_000,
+                  workers=int(arguments[1]) if len(arguments) > 1 else 1,
+                  dtype=np.dtype(arguments[2]) if len(arguments) > 2 else np.float32)
@@ -2,13 +2,14 @@ import os
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
+from equity_analysis import bar_store
 
 save_dir = "../data/plots"
 
 
-def gbm_model(ticker):
+def gbm_model(ticker, seed=42):
     # Load data
-    data = pd.read_csv("../data/raw_data/data_1d.csv")
+    data = bar_store.read_bars("data_1d")
 
     # Convert date column to datetime
     data["Date"] = pd.to_datetime(data["Date"])
@@ -36,9 +37,9 @@ def gbm_model(ticker):
     sigma = data["Log Returns"].std()
     mu = mean_log_return * 252 + 0.5 * sigma ** 2  # Annualized drift
 
-    # Generate Brownian motion (Wiener process)
-    np.random.seed(42)
-    W = np.random.normal(0, np.sqrt(dt), size=N).cumsum()
+    # Generate Brownian motion (Wiener process) from its own random stream
+    rng = np.random.default_rng(seed)
+    W = rng.normal(0, np.sqrt(dt), size=N).cumsum()
 
     # Compute GBM stock price path
     t = np.linspace(0, T, N)
@@ -2,79 +2,116 @@ import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import scipy.stats as stats
+import itertools
 import os
-from equity_analysis import analytics
+from collections import OrderedDict
+from functools import partial
+from equity_analysis import analytics, arima_garch, artifacts, bar_store, path_stats, simulation
 
 save_dir = "../data/plots"
 
+# run ID -> ForecastResult, least recently used first; each holds the paths of a whole run
+_forecasts = OrderedDict()
+FORECAST_CACHE_SIZE = 2
 
-def prediction_mcs(days=30, simulations=1000):
+
+def prediction_mcs(days=30, simulations=1000, seed=None, chunk_size=simulation.CHUNK_SIZE, dtype=np.float64,
+                   workers=1, export_csv=False, step=1, as_frame=False):
     """
     Monte Carlo method for stock price forecasting.
 
     Arguments:
-    - data: DataFrame with historical stock data, must contain the 'Close' column.
     - days: Number of days for the forecast.
     - simulations: Number of Monte Carlo simulations.
+    - seed: Seed for reproducible paths (default: random).
+    - chunk_size: Number of paths generated per vectorized block (see `simulation.simulate_paths`).
+    - dtype: np.float64 (default) or np.float32.
+    - workers: Number of processes; the paths for a given seed are the same for any number.
+    - export_csv: Also write the paths to ../data/raw_data/forecast_results_mcs.csv.
+    - step: Days per simulated step (e.g. 5 for weekly steps); `days` must be a multiple of it
+      and the run has days / step rows. Target probabilities of coarse runs should use `bridge=True`.
+    - as_frame: Return the paths as a DataFrame (loaded into memory) instead of the run ID.
+
+    The paths are saved as a simulation run (see `artifacts.py`), which the analysis functions
+    below use by default; `artifacts.open_run` maps it without loading it.
 
     Returns:
-    - DataFrame with simulated price trajectories.
+    - ID of the simulation run, or with `as_frame` a DataFrame with simulated price
+      trajectories and the run ID in `attrs['run_id']`.
     """
-    data = pd.read_csv("../data/raw_data/data_1d.csv")
-    # Extract closing prices
-    close_prices = data['Close'].dropna().values
-
-    # Calculate logarithmic returns
-    log_returns = np.log(close_prices[1:] / close_prices[:-1])
-
-    # Compute model parameters
-    mu = np.mean(log_returns)  # Expected return (drift)
-    sigma = np.std(log_returns)  # Volatility
-
-    # Initial price (last available price)
-    S0 = close_prices[-1]
-
-    # Array to store all simulations
-    simulations_results = np.zeros((days, simulations))
-
-    # Generate random price paths using the Monte Carlo method
-    for i in range(simulations):
-        # Generate random normal values Z
-        Z = np.random.normal(0, 1, days)
-
-        # Generate future logarithmic returns
-        future_returns = mu - 0.5 * sigma ** 2 + sigma * Z
-
-        # Generate the price trajectory
-        price_path = S0 * np.exp(np.cumsum(future_returns))
-        simulations_results[:, i] = price_path
-
-    # Create a DataFrame with simulated price trajectories
-    forecast_df = pd.DataFrame(simulations_results)
-    filename="forecast_results_mcs.csv"
-    raw_data_dir = "../data/raw_data"
-    file_path = os.path.join(raw_data_dir, filename)
-    forecast_df.to_csv(file_path, index=False)
-
+    close = bar_store.open_bars("data_1d", columns=["Close"])["Close"]
+
+    # Compute model parameters: drift and volatility of the log returns, last available price
+    mu, sigma, S0 = simulation.estimate_parameters(close)
+
+    if days % step:
+        raise ValueError(f"days ({days}) must be a multiple of step ({step})")
+
+    # Generate the price paths in vectorized chunks, written straight into the run's array
+    steps = days // step
+    run_id, simulations_results, meta = artifacts.create_run("mcs", steps, simulations, dtype, mu=mu, sigma=sigma,
+                                                             S0=S0, seed=seed, step=step)
+    start = 0
+    for chunk in simulation.simulate_paths(S0, mu, sigma, steps, simulations, seed=seed, chunk_size=chunk_size,
+                                           dtype=dtype, workers=workers, step=step):
+        simulations_results[:, start:start + chunk.shape[1]] = chunk
+        start += chunk.shape[1]
+    artifacts.finish_run(run_id, simulations_results, meta)
+    print(f"Simulation run saved: {run_id}")
+
+    if export_csv:
+        artifacts.export_csv(run_id, os.path.join("../data/raw_data", "forecast_results_mcs.csv"))
+    return _run_result(run_id, simulations_results, as_frame)
+
+
+def _run_result(run_id, paths, as_frame):
+    """Returns the run ID, or with `as_frame` a DataFrame of the paths carrying it in `attrs['run_id']`."""
+    if not as_frame:
+        return run_id
+    forecast_df = pd.DataFrame(np.asarray(paths))
+    forecast_df.attrs["run_id"] = run_id
     return forecast_df
 
 
-def conf_intervals():
-    forecast = pd.read_csv("../data/raw_data/forecast_results.csv")
-    # Compute confidence intervals
-    median_forecast = forecast.median(axis=1)  # 50th percentile (median)
-    percentile_5 = forecast.quantile(0.05, axis=1)  # 5th percentile (worst-case scenario)
-    percentile_95 = forecast.quantile(0.95, axis=1)  # 95th percentile (best-case scenario)
+def prediction_garch_mcs(days=30, simulations=1000, seed=None, chunk_size=simulation.CHUNK_SIZE, dtype=np.float64,
+                         workers=1, garch_result=None, p=None, q=None, as_frame=False):
+    """
+    Monte Carlo forecast with GARCH volatility instead of a constant sigma: every path runs
+    the variance recursion of the fitted model forward from its last state, so the price fan
+    shows volatility clustering and fatter tails.
 
-    # Convert index to numerical values for plotting
-    x_values = np.arange(len(median_forecast))
+    Arguments:
+    - days, simulations, seed, chunk_size, dtype, workers, as_frame: See `prediction_mcs`.
+    - garch_result: Fitted arch_model result (e.g. returned by `arima_garch.garch_model`) of
+      the log returns in percent. By default a model is fitted to the daily closes.
+    - p, q: Orders of the model fitted by default (see `arima_garch.fit_garch`).
 
-    # Convert Series to NumPy arrays for plotting
-    median_forecast = median_forecast.values
-    percentile_5 = percentile_5.values
-    percentile_95 = percentile_95.values
+    The paths are saved as a 'garch' simulation run.
 
-    # Visualization with confidence intervals
+    Returns:
+    - ID of the simulation run, or with `as_frame` a DataFrame (see `prediction_mcs`).
+    """
+    close = bar_store.open_bars("data_1d", columns=["Close"])["Close"]
+    S0 = simulation.estimate_parameters(close)[2]
+    if garch_result is None:
+        close = pd.Series(close).dropna()
+        log_returns = np.log(close / close.shift(1)).dropna()
+        garch_result = arima_garch.fit_garch(log_returns, p, q)
+    params = dict(arima_garch.garch_parameters(garch_result), S0=S0)
+
+    run_id, simulations_results, meta = artifacts.create_run("garch", days, simulations, dtype, seed=seed, **params)
+    start = 0
+    for chunk in simulation.map_chunks(simulation.garch_paths, params, days, simulations, seed, chunk_size, dtype,
+                                       workers):
+        simulations_results[:, start:start + chunk.shape[1]] = chunk
+        start += chunk.shape[1]
+    artifacts.finish_run(run_id, simulations_results, meta)
+    print(f"Simulation run saved: {run_id}")
+    return _run_result(run_id, simulations_results, as_frame)
+
+
+def _plot_confidence_intervals(x_values, median_forecast, percentile_5, percentile_95):
+    """Saves the median forecast with its 90% confidence band as Monte_Carlo_Price.png."""
     plt.figure(figsize=(12, 6))
     plt.plot(x_values, median_forecast, label="Median Forecast", color="blue")
     plt.fill_between(x_values, percentile_5, percentile_95, color='blue', alpha=0.2, label="90% Confidence Interval")
@@ -86,7 +123,125 @@ def conf_intervals():
     save_path = os.path.join(save_dir, f"Monte_Carlo_Price.png")
     plt.savefig(save_path, dpi=600, bbox_inches='tight')
     print(f"Chart saved: {save_path}")
-    print(f"Chart saved: {save_path}")
+
+
+def forecast_summary(days=30, simulations=1_000_000, targets=None, seed=None, chunk_size=simulation.CHUNK_SIZE,
+                     dtype=np.float64, workers=1):
+    """
+    Single-pass Monte Carlo forecast: paths are generated chunk by chunk and only fed into
+    online accumulators (see `path_stats.py`), so memory does not depend on `simulations`.
+
+    Arguments:
+    - days: Number of days for the forecast.
+    - simulations: Number of Monte Carlo simulations.
+    - targets: Optional price levels; the probability of touching each one is reported.
+    - seed, chunk_size, dtype, workers: See `simulation.simulate_paths`. The statistics for a
+      given seed are bit-identical for any number of workers.
+
+    Returns:
+    - DataFrame with the daily mean, standard deviation, 5th/50th/95th percentiles.
+    - DataFrame with target prices and their probabilities (None without targets).
+    """
+    close = bar_store.open_bars("data_1d", columns=["Close"])["Close"]
+    mu, sigma, S0 = simulation.estimate_parameters(close)
+
+    moments = path_stats.RunningMoments(days)
+    sketch = path_stats.QuantileSketch.for_paths(S0, sigma, days)
+    accumulators = [moments, sketch]
+    if targets is not None:
+        hits = path_stats.TargetHits(targets, S0)
+        accumulators.append(hits)
+    simulation.accumulate(S0, mu, sigma, accumulators, days, simulations, seed=seed, chunk_size=chunk_size,
+                          dtype=dtype, workers=workers)
+
+    percentile_5, median_forecast, percentile_95 = sketch.quantile([0.05, 0.5, 0.95])
+    summary = pd.DataFrame({
+        "Day": np.arange(days),
+        "Mean": moments.mean,
+        "Std": moments.std,
+        "Percentile 5": percentile_5,
+        "Median": median_forecast,
+        "Percentile 95": percentile_95,
+    })
+    _plot_confidence_intervals(summary["Day"].values, median_forecast, percentile_5, percentile_95)
+
+    print(f"Final Day Forecast ({simulations} paths):")
+    print(f"Median Price: {median_forecast[-1]}")
+    print(f"Lower Bound (5% percentile): {percentile_5[-1]}")
+    print(f"Upper Bound (95% percentile): {percentile_95[-1]}")
+
+    probability_df = None
+    if targets is not None:
+        probability_df = pd.DataFrame({"Target Price": hits.targets, "Probability (%)": hits.probability})
+    return summary, probability_df
+
+
+def forecast_precision(days=30, simulations=100_000, method="antithetic", control_variate=True, targets=None,
+                       seed=None, workers=1):
+    """
+    Monte Carlo forecast estimates with standard errors, using variance reduction.
+
+    Arguments:
+    - days: Number of days for the forecast.
+    - simulations: Number of Monte Carlo simulations.
+    - method: 'plain', 'antithetic' or 'sobol' (see `simulation.estimate`).
+    - control_variate: Adjust the target-touch probabilities with the analytic mean of the final
+      price. The mean final price is the control itself, so it is always reported raw.
+    - targets: Optional price levels whose touch probabilities are estimated.
+    - seed, workers: See `simulation.map_chunks`.
+
+    Returns:
+    - DataFrame with one row per statistic: estimate and standard error.
+    """
+    # Independent unit of the standard error of each sampling method
+    units = {"plain": "path", "antithetic": "pair", "sobol": "chunk"}
+    if method not in units:
+        raise ValueError(f"Unknown sampling method: {method}")
+
+    close = bar_store.open_bars("data_1d", columns=["Close"])["Close"]
+    mu, sigma, S0 = simulation.estimate_parameters(close)
+
+    unit = units[method]
+    control_mean = S0 * np.exp(mu * days) if control_variate else None
+    final = path_stats.MeanEstimator(path_stats.final_price, unit)
+    quantiles = path_stats.BatchQuantiles([0.05, 0.5, 0.95], unit)
+    accumulators = [final, quantiles]
+    if targets is not None:
+        touches = path_stats.MeanEstimator(partial(path_stats.target_touches, targets=targets, reference=S0),
+                                           unit, control_mean)
+        accumulators.append(touches)
+    simulation.estimate(S0, mu, sigma, accumulators, days, simulations, method=method, seed=seed, workers=workers)
+
+    rows = []
+    estimates, errors = final.result()
+    rows.append(("Mean Final Price", estimates[0], errors[0]))
+    estimates, errors = quantiles.result()
+    rows += [(f"Final Price {int(level * 100)}th Percentile", estimate, error)
+             for level, estimate, error in zip(quantiles.levels, estimates, errors)]
+    if targets is not None:
+        estimates, errors = touches.result()
+        rows += [(f"Probability (%) of {target}", estimate, error)
+                 for target, estimate, error in zip(targets, estimates, errors)]
+
+    result = pd.DataFrame(rows, columns=["Statistic", "Estimate", "Std Error"])
+    print(f"Monte Carlo estimates ({method}, control variate: {control_variate}):")
+    print(result.to_string(index=False))
+    return result
+
+
+def conf_intervals(run_id=None):
+    """
+    Median and 90% confidence interval of a simulation run (default: the latest
+    `prediction_mcs` run).
+    """
+    forecast, meta = artifacts.open_run(run_id, model="mcs")
+    # Compute confidence intervals: 5th percentile (worst case), median, 95th percentile (best case)
+    percentile_5, median_forecast, percentile_95 = np.quantile(forecast, [0.05, 0.5, 0.95], axis=1)
+
+    # Day of every row for plotting (runs with coarse steps hold one row per step)
+    x_values = np.arange(1, len(median_forecast) + 1) * meta.get("step", 1)
+
+    _plot_confidence_intervals(x_values, median_forecast, percentile_5, percentile_95)
     # Display forecasted values for the last day
     median_price = median_forecast[-1]
     lower_bound = percentile_5[-1]
@@ -100,48 +255,113 @@ def conf_intervals():
     return median_price, lower_bound, upper_bound
 
 
-def probability_of_target(target_price):
+def path_risk_report(run_id=None, horizons=None, barriers=None, levels=(0.95, 0.99),
+                     chunk_size=simulation.CHUNK_SIZE):
     """
-    Calculate the probability of the price reaching or exceeding a target level.
+    Path-dependent risk metrics of a simulation run, computed in one pass over its paths.
+
+    Arguments:
+    - run_id: Simulation run (default: the latest `prediction_mcs` run).
+    - horizons: Days at which VaR and CVaR of the return are reported (default: those of 1, 5,
+      10 and 30 that are multiples of the step); they must be multiples of the run's step.
+    - barriers: Price levels for first-passage times (default: ±10% of the initial price).
+    - levels: VaR/CVaR confidence levels.
+    - chunk_size: Number of paths read from the memory-mapped run at a time.
+
+    Returns:
+    - Dictionary with DataFrames 'var' (VaR/CVaR per horizon and level) and 'first_passage',
+      the 'max_drawdown' summary and the 'time_under_water' distribution.
+    """
+    forecast, meta = artifacts.open_run(run_id, model="mcs")
+    S0 = meta["S0"]
+    if barriers is None:
+        barriers = [S0 * 0.9, S0 * 1.1]
+
+    step = meta.get("step", 1)
+    if horizons is None:
+        horizons = [h for h in (1, 5, 10, 30) if h % step == 0]
+    risk = path_stats.PathRiskStatistics(S0, forecast.shape[0], horizons, barriers, levels, step=step)
+    for start in range(0, forecast.shape[1], chunk_size):
+        risk.update(forecast[:, start:start + chunk_size])
+
+    report = {
+        "var": risk.value_at_risk(),
+        "max_drawdown": risk.max_drawdown(),
+        "first_passage": risk.first_passage(),
+        "time_under_water": risk.time_under_water(),
+    }
+    print(f"Path risk report for {meta['run_id']} ({risk.count} paths):")
+    print(report["var"].to_string(index=False))
+    print(f"Maximum drawdown: {report['max_drawdown']}")
+    print(report["first_passage"].to_string(index=False))
+    return report
+
+
+def load_forecast(run_id=None):
+    """
+    Loads the paths of a simulation run (default: the latest `prediction_mcs` run) as a
+    `path_stats.ForecastResult`. Runs never change, so the FORECAST_CACHE_SIZE most recently
+    used results are kept in memory and repeated target queries do not read the paths again.
+    """
+    run_id = run_id or artifacts.latest_run("mcs")
+    if run_id in _forecasts:
+        _forecasts.move_to_end(run_id)
+    else:
+        paths, meta = artifacts.open_run(run_id)
+        _forecasts[run_id] = path_stats.ForecastResult(paths, meta.get("S0"), meta.get("sigma"), meta.get("step", 1))
+        while len(_forecasts) > FORECAST_CACHE_SIZE:
+            _forecasts.popitem(last=False)
+    return _forecasts[run_id]
+
+
+def probability_of_target(target_price, direction="up", run_id=None, bridge=False):
+    """
+    Calculate the probability of the price reaching a target level.
 
     Arguments:
-    - forecast: DataFrame containing Monte Carlo simulated price paths.
     - target_price: The target price level (Take-Profit or Stop-Loss).
+    - direction: 'up' for reaching or exceeding the target (Take-Profit), 'down' for falling
+      to or below it (Stop-Loss).
+    - run_id: Simulation run (default: the latest `prediction_mcs` run).
+    - bridge: Also count touches between the simulated steps (Brownian-bridge correction),
+      recommended for runs with coarse steps.
 
     Returns:
     - Probability (percentage) of reaching the target price within the forecast period.
     """
-    # Count how many simulations reach or exceed the target price at any point
-    forecast = pd.read_csv("../data/raw_data/forecast_results.csv")
-    simulations_reaching_target = (forecast >= target_price).any(axis=0).sum()
-
-    # Compute probability as a percentage
-    probability = (simulations_reaching_target / forecast.shape[1]) * 100
+    forecast = load_forecast(run_id)
+    if bridge:
+        probability = forecast.touch_probability(target_price, direction)
+    elif direction == "up":
+        probability = forecast.probability_above(target_price)
+    elif direction == "down":
+        probability = forecast.probability_below(target_price)
+    else:
+        raise ValueError("direction must be 'up' or 'down'")
     print(f'Probability of target = {probability} %')
     return probability
 
-def probability_distribution(current_price):
-    forecast = pd.read_csv("../data/raw_data/forecast_results.csv")
+def probability_distribution(current_price, run_id=None, bridge=False):
     """
     Calculate the probability of the price reaching different target levels.
 
     Arguments:
-    - forecast: DataFrame containing Monte Carlo simulated price paths.
     - current_price: The current price of the asset.
+    - run_id: Simulation run (default: the latest `prediction_mcs` run).
+    - bridge: Use the Brownian-bridge correction (see `probability_of_target`).
 
     Returns:
     - DataFrame with target price levels and their probabilities.
     - Plot showing probability distribution for different targets.
     """
-    target_prices = []  # List to store target price levels
-    probabilities = []  # List to store corresponding probabilities
+    forecast = load_forecast(run_id)
 
-    # Generate target prices in the range of 75% to 125% of current price (increments of 5%)
-    for multiplier in np.arange(1, 1.51, 0.05):  # Adjusted range to include 1.25
-        price = current_price * multiplier
-        target_prices.append(price)
-        probability = probability_of_target(price)
-        probabilities.append(probability)
+    # Generate target prices in the range of 100% to 150% of current price (increments of 5%)
+    target_prices = current_price * np.arange(1, 1.51, 0.05)
+    if bridge:
+        probabilities = forecast.touch_probability(target_prices, "up")
+    else:
+        probabilities = forecast.probability_above(target_prices)
 
     # Create a DataFrame with results
     probability_df = pd.DataFrame({
@@ -165,23 +385,23 @@ def probability_distribution(current_price):
     return probability_df
 
 
-def risk_reward_analysis(current_price, take_profit, stop_loss):
+def risk_reward_analysis(current_price, take_profit, stop_loss, run_id=None, bridge=False):
     """
     Calculate the probability of hitting Take-Profit and Stop-Loss levels and assess the Risk/Reward Ratio.
 
     Arguments:
-    - forecast: DataFrame containing Monte Carlo simulated price paths.
     - current_price: The current price of the asset.
-    - take_profit: Target price level (profit goal).
-    - stop_loss: Stop-loss level (maximum acceptable loss).
+    - take_profit: Target price level (profit goal), reached when the price rises to it.
+    - stop_loss: Stop-loss level (maximum acceptable loss), hit when the price falls to it.
+    - run_id: Simulation run (default: the latest `prediction_mcs` run).
+    - bridge: Use the Brownian-bridge correction (see `probability_of_target`).
 
     Returns:
     - Dictionary with probabilities of hitting Take-Profit and Stop-Loss, and Risk/Reward Ratio.
     """
-    forecast = pd.read_csv("../data/raw_data/forecast_results.csv")
     # Calculate probabilities
-    prob_take_profit = probability_of_target(take_profit)
-    prob_stop_loss = probability_of_target(stop_loss)
+    prob_take_profit = probability_of_target(take_profit, direction="up", run_id=run_id, bridge=bridge)
+    prob_stop_loss = probability_of_target(stop_loss, direction="down", run_id=run_id, bridge=bridge)
 
     # Calculate potential reward and risk
     potential_reward = take_profit - current_price
@@ -203,7 +423,24 @@ def risk_reward_analysis(current_price, take_profit, stop_loss):
     return result
 
 
-def stress_test_mcs(ticker, stress_factor=1.5, max_price_multiplier=3, use_log_normal=True):
+def stressed_paths(S0, sigma, max_price, use_log_normal, days, paths, rng, dtype=np.float64):
+    """
+    Simulates stressed price paths without drift, capped at `max_price`
+    (path generator for `simulation.map_chunks`).
+    """
+    if use_log_normal:
+        # Truncated normal values (log-normal approach), clamped between -2σ and +2σ
+        Z = simulation.truncated_normal(rng.random((days, paths)), -2, 2).astype(dtype, copy=False)
+    else:
+        Z = rng.standard_normal((days, paths), dtype=dtype)
+    future_returns = -0.5 * sigma ** 2 + sigma * Z
+    price_paths = S0 * np.exp(np.cumsum(future_returns, axis=0))
+    # Limit excessive price growth
+    return np.minimum(price_paths, max_price)
+
+
+def stress_test_mcs(ticker, stress_factor=1.5, max_price_multiplier=3, use_log_normal=True, seed=None, workers=1,
+                    run_id=None):
     """
     Perform stress testing by increasing volatility (σ) and assessing the impact on price distribution.
     Uses either a normal or log-normal distribution.
@@ -215,40 +452,36 @@ def stress_test_mcs(ticker, stress_factor=1.5, max_price_multiplier=3, use_log_n
     - stress_factor: Multiplier to artificially increase volatility (default is 1.5x).
     - max_price_multiplier: Maximum multiple of the initial price to prevent unrealistic growth (default is 3x).
     - use_log_normal: If True, uses a log-normal distribution; otherwise, uses a normal distribution.
+    - seed: Seed for reproducible paths (default: random).
+    - workers: Number of processes; the paths for a given seed are the same for any number.
+    - run_id: Simulation run whose size and initial price are used (default: the latest
+      `prediction_mcs` run). The stressed paths are saved as a 'stress' run.
 
     Returns:
     - DataFrame with stressed simulation results.
     - Visualization of the impact on price projections with median and confidence intervals.
     """
-    data = pd.read_csv("../data/raw_data/data_1d.csv")
+    data = bar_store.read_bars("data_1d", columns=["Date", "Close"])
     sigma = analytics.calculate_historical_volatility(data)
-    forecast = pd.read_csv("../data/raw_data/forecast_results_MCS.csv")
+    forecast, forecast_meta = artifacts.open_run(run_id, model="mcs")
     # Increase volatility by the stress factor
     stressed_sigma = min(sigma * stress_factor, 0.5)  # Limit max volatility to 50%
 
-    # Extract the last observed price as the starting point
-    S0 = forecast.iloc[0, 0]
+    # The last observed price is the starting point
+    S0 = forecast_meta["S0"]
 
-    # Generate stressed Monte Carlo simulations
-    days, simulations = forecast.shape
-    stressed_results = np.zeros((days, simulations))
+    # Generate daily stressed Monte Carlo simulations over the horizon of the run in chunks
+    rows, simulations = forecast.shape
+    days = rows * forecast_meta.get("step", 1)
+    params = {"S0": S0, "sigma": stressed_sigma, "max_price": S0 * max_price_multiplier,
+              "use_log_normal": use_log_normal}
+    stressed_results = np.concatenate(list(simulation.map_chunks(stressed_paths, params, days, simulations, seed=seed,
+                                                                 workers=workers)), axis=1)
 
-    for i in range(simulations):
-        if use_log_normal:
-            # Generate random values from a truncated normal distribution (log-normal approach)
-            Z = stats.truncnorm.rvs(-2, 2, loc=0, scale=1, size=days)  # Clamped between -2σ and +2σ
-        else:
-            # Generate random values from a standard normal distribution
-            Z = np.random.normal(0, 1, days)
-
-        # Apply price path formula
-        future_returns = -0.5 * stressed_sigma ** 2 + stressed_sigma * Z
-        price_path = S0 * np.exp(np.cumsum(future_returns))
-
-        # Limit excessive price growth to max_price_multiplier * S0
-        price_path[price_path > S0 * max_price_multiplier] = S0 * max_price_multiplier
-
-        stressed_results[:, i] = price_path
+    stress_run = artifacts.save_run(stressed_results, "stress", source_run=forecast_meta["run_id"], S0=S0,
+                                    sigma=stressed_sigma, stress_factor=stress_factor,
+                                    max_price_multiplier=max_price_multiplier, use_log_normal=use_log_normal, seed=seed)
+    print(f"Simulation run saved: {stress_run}")
 
     # Create a DataFrame with stressed simulations
     stressed_forecast = pd.DataFrame(stressed_results)
@@ -282,3 +515,120 @@ def stress_test_mcs(ticker, stress_factor=1.5, max_price_multiplier=3, use_log_n
     plt.savefig(save_path, dpi=600, bbox_inches='tight')
     print(f"Chart saved: {save_path}")
     return stressed_forecast
+
+
+STRESS_STATISTICS = ["Mean", "Percentile 5", "Median", "Percentile 95"]
+
+
+def common_uniforms(days, paths, rng, dtype=np.float64):
+    """Common random numbers of `stress_grid` (path generator for `simulation.map_chunks`)."""
+    return rng.random((days, paths))
+
+
+class StressScenarios:
+    """
+    Accumulator of `stress_grid`: maps every chunk of common uniforms to the stressed prices of
+    each scenario and keeps their per-day moments and quantile sketch (see `path_stats.py`).
+
+    - `sigmas`, `distributions`: Stressed volatility and distribution of every scenario.
+    """
+
+    def __init__(self, S0, sigmas, distributions, max_price, days, bins=4096):
+        self.S0 = S0
+        self.sigmas = list(sigmas)
+        self.distributions = list(distributions)
+        self.max_price = max_price
+        self.moments = [path_stats.RunningMoments(days) for _ in self.sigmas]
+        # Prices never exceed the cap, so the bins end there
+        self.sketches = [path_stats.QuantileSketch(days, S0 * np.exp(-0.5 * sigma ** 2 * days - 8 * sigma * np.sqrt(days)),
+                                                   max_price * (1 + 1e-9), bins)
+                         for sigma in self.sigmas]
+
+    def update(self, uniforms):
+        shocks = {}
+        for distribution in set(self.distributions):
+            if distribution == "log_normal":
+                shocks[distribution] = np.cumsum(simulation.truncated_normal(uniforms, -2, 2), axis=0)
+            else:
+                shocks[distribution] = np.cumsum(stats.norm.ppf(uniforms), axis=0)
+
+        steps = np.arange(1, uniforms.shape[0] + 1)[:, np.newaxis]
+        for sigma, distribution, moments, sketch in zip(self.sigmas, self.distributions, self.moments,
+                                                        self.sketches):
+            price_paths = self.S0 * np.exp(-0.5 * sigma ** 2 * steps + sigma * shocks[distribution])
+            np.minimum(price_paths, self.max_price, out=price_paths)
+            moments.update(price_paths)
+            sketch.update(price_paths)
+        return self
+
+    def merge(self, other):
+        for mine, theirs in zip(self.moments + self.sketches, other.moments + other.sketches):
+            mine.merge(theirs)
+        return self
+
+    def cube(self):
+        """Returns the (scenarios, days, statistics) array of STRESS_STATISTICS."""
+        return np.stack([np.column_stack([moments.mean, sketch.quantile([0.05, 0.5, 0.95]).T])
+                         for moments, sketch in zip(self.moments, self.sketches)])
+
+
+def stress_grid(ticker, stress_factors=(1.5,), volatility_caps=(0.5,), distributions=("log_normal", "normal"),
+                max_price_multiplier=3, days=30, simulations=1000, seed=None, chunk_size=simulation.CHUNK_SIZE,
+                workers=1):
+    """
+    Batched stress test over a grid of scenarios (every combination of stress factor,
+    volatility cap and distribution).
+
+    All scenarios use the same common random numbers: every chunk of uniforms is mapped in
+    bulk to normal or truncated normal (±2σ, 'log_normal') values by inverse CDF, so the
+    scenarios differ only by their parameters and their differences carry no sampling noise.
+    The chunks are reduced to per-day moments and quantile sketches, so memory does not grow
+    with the number of simulations.
+
+    Arguments:
+    - stress_factors: Multipliers of the historical volatility.
+    - volatility_caps: Upper limits of the stressed volatility (0.5 in `stress_test_mcs`).
+    - distributions: 'log_normal' (truncated normal values) and/or 'normal'.
+    - max_price_multiplier: Maximum multiple of the initial price.
+    - days, simulations, seed: Size of the simulation and seed of the random numbers.
+    - chunk_size, workers: See `simulation.map_chunks`; the result for a seed is the same for
+      any number of workers.
+
+    Returns:
+    - DataFrame with one row per scenario (Stress Factor, Volatility Cap, Distribution, Sigma).
+    - Result cube of shape (scenarios, days, statistics), statistics as in STRESS_STATISTICS
+      (the percentiles are read from the quantile sketches).
+    """
+    unknown = set(distributions) - {"log_normal", "normal"}
+    if unknown:
+        raise ValueError(f"Unknown distribution: {', '.join(sorted(unknown))}")
+
+    data = bar_store.read_bars("data_1d", columns=["Date", "Close"])
+    sigma = analytics.calculate_historical_volatility(data)
+    S0 = float(data["Close"].dropna().iloc[-1])
+
+    scenarios = pd.DataFrame(list(itertools.product(stress_factors, volatility_caps, distributions)),
+                             columns=["Stress Factor", "Volatility Cap", "Distribution"])
+    scenarios["Sigma"] = np.minimum(sigma * scenarios["Stress Factor"], scenarios["Volatility Cap"])
+
+    statistics = StressScenarios(S0, scenarios["Sigma"], scenarios["Distribution"], S0 * max_price_multiplier, days)
+    partials = simulation.map_chunks(common_uniforms, {}, days, simulations, seed, chunk_size, workers=workers,
+                                     accumulators=[statistics])
+    simulation.merge_chunks([statistics], partials)
+    cube = statistics.cube()
+
+    # Visualization: median and 90% band of every scenario
+    plt.figure(figsize=(12, 6))
+    for i, scenario in scenarios.iterrows():
+        label = f"{scenario['Stress Factor']}x, cap {scenario['Volatility Cap']}, {scenario['Distribution']}"
+        line, = plt.plot(cube[i, :, 2], linewidth=2, label=label)
+        plt.fill_between(range(days), cube[i, :, 1], cube[i, :, 3], color=line.get_color(), alpha=0.15)
+    plt.title(f"Stress Test {ticker}: Monte Carlo Price Forecast by Scenario (Median and 90% Interval)")
+    plt.xlabel("Days")
+    plt.ylabel("Price")
+    plt.legend()
+    plt.grid(True)
+    save_path = os.path.join(save_dir, f"Stress_Test_Scenarios.png")
+    plt.savefig(save_path, dpi=600, bbox_inches='tight')
+    print(f"Chart saved: {save_path}")
+    return scenarios, cube
@@ -1,9 +1,9 @@
 from .data_request import all_data_request, request_fin_data
 from .utils import clear_working_folders, price
 from .indices import indices_corr
-from .analytics import add_analytics_to_df
+from .analytics import add_analytics_to_df, update_analytics
 from .charts import generate_charts, plot_indicators
-from .MCS import prediction_mcs, conf_intervals, probability_of_target, probability_distribution,risk_reward_analysis,stress_test_mcs
+from .MCS import prediction_mcs, prediction_garch_mcs, forecast_summary, forecast_precision, conf_intervals, probability_of_target, probability_distribution,risk_reward_analysis,stress_test_mcs,stress_grid,path_risk_report
 from .fundamental_analysis import get_latest_fundamental, get_latest_stock_valuation, get_dividend_metrics
-from .arima_garch import arima_model, garch_model
+from .arima_garch import arima_model, garch_model, backtest_arima, update_garch, model_universe
 from .GBM import gbm_model
\ No newline at end of file
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+
+def _as_int64(dates):
+    """Converts datetimes (or int64 epoch nanoseconds) to a sorted int64 array without copying when possible."""
+    dates = np.asarray(dates)
+    if np.issubdtype(dates.dtype, np.datetime64):
+        dates = dates.astype("datetime64[ns]").view(np.int64)
+    elif dates.dtype == object:
+        dates = pd.to_datetime(dates).values.astype("datetime64[ns]").view(np.int64)
+    if len(dates) > 1 and np.any(dates[1:] < dates[:-1]):
+        raise ValueError("Dates must be sorted in ascending order")
+    return dates
+
+
+class CalendarIndex:
+    """
+    Union trading calendar of several series with precomputed integer position maps.
+
+    For every series the index keeps, per calendar date, the position of the last observation
+    at or before that date (-1 if none) and whether the date is an exact match. Aligning a
+    column is then a single gather (`values[positions]`) instead of a merge, so no frames are
+    copied and every series can be forward-filled (as-of) onto the dates of the other markets.
+
+    - `dates_by_key`: Mapping of series key to its sorted dates (datetime or int64 epoch ns).
+    """
+
+    def __init__(self, dates_by_key=None):
+        self.dates = np.array([], dtype=np.int64)
+        self.series_dates = {}
+        self.positions = {}
+        for key, dates in (dates_by_key or {}).items():
+            self.add(key, dates)
+
+    def __len__(self):
+        return len(self.dates)
+
+    def add(self, key, dates):
+        """
+        Adds a series. The calendar is extended with its new dates and the existing position
+        maps are remapped through the old calendar instead of being searched again.
+        """
+        dates = _as_int64(dates)
+        old_dates = self.dates
+        new_dates = np.union1d(old_dates, dates)
+
+        if len(new_dates) != len(old_dates):
+            # Position of every new calendar date in the old calendar (as-of)
+            old_position = np.searchsorted(old_dates, new_dates, side="right") - 1
+            for other, positions in self.positions.items():
+                remapped = np.full(len(new_dates), -1, dtype=np.int64)
+                valid = old_position >= 0
+                remapped[valid] = positions[old_position[valid]]
+                self.positions[other] = remapped
+            self.dates = new_dates
+
+        self.series_dates[key] = dates
+        self.positions[key] = np.searchsorted(dates, self.dates, side="right") - 1
+        return self
+
+    def exact_mask(self, key):
+        """Returns True for calendar dates on which the series has its own observation."""
+        positions = self.positions[key]
+        dates = self.series_dates[key]
+        mask = positions >= 0
+        mask[mask] = dates[positions[mask]] == self.dates[mask]
+        return mask
+
+    def first_common_position(self):
+        """Returns the first calendar position at which every series has started."""
+        starts = [int(np.argmax(positions >= 0)) for positions in self.positions.values() if (positions >= 0).any()]
+        return max(starts) if starts else 0
+
+    def align(self, key, values, method="asof"):
+        """
+        Maps the values of a series onto the calendar.
+
+        - `method`: 'asof' forward-fills the last observation, 'exact' leaves NaN on dates
+          without an observation of this series.
+        """
+        if method not in ("asof", "exact"):
+            raise ValueError("Unsupported alignment method")
+        values = np.asarray(values, dtype=np.float64)
+        positions = self.positions[key]
+        if len(values) == 0:
+            return np.full(len(positions), np.nan)
+        aligned = values[np.maximum(positions, 0)]
+        missing = positions < 0 if method == "asof" else ~self.exact_mask(key)
+        aligned[missing] = np.nan
+        return aligned
+
+    def datetime_index(self, name="Date"):
+        """Returns the calendar as a DatetimeIndex."""
+        return pd.DatetimeIndex(self.dates.astype("datetime64[ns]"), name=name)
+
+    def frame(self, values_by_key, method="asof", start=None):
+        """
+        Builds a DataFrame with a 'Date' column and one aligned column per series.
+
+        - `start`: Optional calendar position to start from (e.g. `first_common_position()`).
+        """
+        start = start or 0
+        data = {"Date": self.datetime_index()[start:]}
+        for key, values in values_by_key.items():
+            data[key] = self.align(key, values, method)[start:]
+        return pd.DataFrame(data)
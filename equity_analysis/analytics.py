@@ -1,8 +1,11 @@
 import numpy as np
 import pandas as pd
 import os
+from equity_analysis import bar_store, kernels
+from equity_analysis.indicators import bollinger_band, compute_indicators, STANDARD_INDICATORS
+from equity_analysis.streaming import IndicatorEngine
 
-DATA_DIR = "../data/raw_data/"
+STATE_DIR = "../data/indicator_state"
 
 
 def calculate_historical_volatility(data):
@@ -27,50 +30,42 @@ def calculate_historical_volatility(data):
     return annualized_volatility
 
 
+def _indicator(data, name):
+    """Computes one indicator of the registry in `indicators.py`, where every formula is defined."""
+    return compute_indicators(data, [name])[name]
+
+
 def moving_average(data, period=50):
     """Calculates the moving average (MA) for the given period."""
-    return data['Close'].rolling(window=period).mean()
+    return _indicator(data, f"MA_{period}")
 
 
 def average_true_range(data, period=14):
     """Calculates the Average True Range (ATR) to measure volatility."""
-    high_low = data['High'] - data['Low']
-    high_close = np.abs(data['High'] - data['Close'].shift())
-    low_close = np.abs(data['Low'] - data['Close'].shift())
-    true_range = pd.Series(np.maximum.reduce([high_low, high_close, low_close]), index=data.index)
-    return true_range.rolling(window=period).mean()
+    return _indicator(data, f"ATR_{period}")
 
 
 def relative_strength_index(data, period=14):
     """Calculates the Relative Strength Index (RSI)."""
-    delta = data['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    rs = gain / loss
-    return 100 - (100 / (1 + rs))
+    return _indicator(data, f"RSI_{period}")
 
 
 def exponential_moving_average(data, period=12):
     """Calculates the Exponential Moving Average (EMA)."""
-    return data['Close'].ewm(span=period, adjust=False).mean()
+    return _indicator(data, f"EMA_{period}")
 
 
 def macd(data):
     """Calculates the Moving Average Convergence Divergence (MACD)."""
-    ema12 = exponential_moving_average(data, 12)
-    ema26 = exponential_moving_average(data, 26)
-    macd_line = ema12 - ema26
-    signal_line = macd_line.ewm(span=9, adjust=False).mean()
-    return macd_line, signal_line
+    columns = compute_indicators(data, ["MACD", "Signal_Line"])
+    return columns["MACD"], columns["Signal_Line"]
 
 
 def bollinger_bands(data, period=20, k=2):
     """Calculates Bollinger Bands."""
-    ma = moving_average(data, period)
-    std_dev = data['Close'].rolling(window=period).std()
-    upper_band = ma + (k * std_dev)
-    lower_band = ma - (k * std_dev)
-    return upper_band, lower_band
+    columns = compute_indicators(data, [f"MA_{period}", f"STD_{period}"])
+    ma, std_dev = columns[f"MA_{period}"], columns[f"STD_{period}"]
+    return bollinger_band(ma, std_dev, k), bollinger_band(ma, std_dev, -k)
 
 
 def sharpe_ratio(data, risk_free_rate=0.01):
@@ -93,22 +88,63 @@ def pe_ratio(stock_price, earnings_per_share):
     return stock_price / earnings_per_share
 
 
-def add_analytics_to_df():
-    allowed_files = {"data_1d.csv", "data_1h.csv", "data_1m.csv", "data_1w.csv", "data_15m.csv"}
+def add_analytics_to_df(indicators=STANDARD_INDICATORS):
+    """
+    Adds indicator columns to the stored timeframes of the ticker.
 
-    for file in os.listdir(DATA_DIR):
-        if file in allowed_files:
-            file_path = os.path.join(DATA_DIR, file)
+    - `indicators`: Indicator names resolved through `indicators.compute_indicators`, so shared
+      intermediates (e.g. the EMAs of MACD) are computed once per dataset.
+    """
+    allowed_datasets = {"data_1d", "data_1h", "data_1m", "data_1w", "data_15m"}
 
-            df = pd.read_csv(file_path, parse_dates=['Date'])
+    for name in bar_store.list_datasets():
+        if name in allowed_datasets:
+            df = bar_store.read_bars(name)
+            columns = compute_indicators(df, indicators)
 
-            df['MA_50'] = moving_average(df, 50)
-            df['ATR_14'] = average_true_range(df, 14)
-            df['RSI_14'] = relative_strength_index(df, 14)
-            df['EMA_12'] = exponential_moving_average(df, 12)
-            df['EMA_26'] = exponential_moving_average(df, 26)
-            df['MACD'], df['Signal_Line'] = macd(df)
+            # Only the indicator columns are written, the OHLCV columns stay untouched
+            bar_store.update_columns(name, columns)
+            print(f"Analytics added: {name}")
+        elif name.startswith("universe_"):
+            # Panels are computed for all tickers at once
+            kernels.add_panel_indicators(name)
 
-            df.to_csv(file_path, index=False)
-            print(f"Analytics added: {file}")
 
+def update_analytics(name):
+    """
+    Incrementally updates the indicator columns of a stored dataset.
+
+    The streaming indicator state is saved to STATE_DIR as of the second to last bar, so the
+    next run re-processes the (possibly still forming) last bar plus the newly appended bars
+    in O(1) per bar. If the stored history no longer matches the saved state, all indicators
+    are recomputed from the first bar.
+    """
+    bars = bar_store.open_bars(name, columns=['Date', 'High', 'Low', 'Close'])
+    meta = bar_store.read_meta(name)
+    state_path = os.path.join(STATE_DIR, f"{name}.json")
+    length = len(bars['Date'])
+
+    engine, start = IndicatorEngine(), 0
+    if os.path.exists(state_path) and all(column in meta['columns'] for column in IndicatorEngine.columns):
+        saved_engine, state = IndicatorEngine.load(state_path)
+        position = state['position']
+        if 0 < position <= length and int(bars['Date'][position - 1]) == state['date']:
+            engine, start = saved_engine, position
+
+    existing = bar_store.open_bars(name, columns=IndicatorEngine.columns) if start else {}
+    columns = {column: np.empty(length) for column in IndicatorEngine.columns}
+    for column in IndicatorEngine.columns:
+        if start:
+            columns[column][:start] = existing[column][:start]
+
+    for i in range(start, length):
+        if i == length - 1 and i > 0:
+            os.makedirs(STATE_DIR, exist_ok=True)
+            engine.save(state_path, position=i, date=int(bars['Date'][i - 1]))
+        values = engine.update(bars['High'][i], bars['Low'][i], bars['Close'][i])
+        for column, value in values.items():
+            columns[column][i] = value
+
+    bar_store.update_columns(name, columns)
+    print(f"Analytics updated: {name} ({length - start} bars processed)")
+    return length - start
@@ -1,17 +1,28 @@
 import pandas as pd
 import numpy as np
 import os
+import json
+import math
+import time
+import signal
+import threading
+import warnings
+import multiprocessing
+import multiprocessing.connection
+from collections import deque
 import matplotlib.pyplot as plt
-from statsmodels.tsa.stattools import adfuller, pacf, acf
+from concurrent.futures import ProcessPoolExecutor
+from statsmodels.tsa.stattools import adfuller
 from statsmodels.tsa.arima.model import ARIMA
 from arch import arch_model
+from equity_analysis import analytics, autocorrelation, bar_store, cache
 
 save_dir = "../data/plots"
 
 
 def find_q(series, max_lags=5):
     """Find optimal q (MA order) based on ACF values."""
-    acf_values = acf(series.dropna().values, nlags=min(max_lags, len(series) - 1))
+    acf_values = autocorrelation.correlations(series.dropna().values, min(max_lags, len(series) - 1))["acf"]
     for i in range(1, len(acf_values)):
         if abs(acf_values[i]) < (2 / (len(series) ** 0.5)):
             return i - 1
@@ -20,7 +31,7 @@ def find_q(series, max_lags=5):
 
 def find_p(series, max_lags=5):
     """Find optimal p (AR order) based on PACF values."""
-    pacf_values = pacf(series.dropna().values, nlags=min(max_lags, len(series) - 1))
+    pacf_values = autocorrelation.correlations(series.dropna().values, min(max_lags, len(series) - 1))["pacf"]
     for i in range(1, len(pacf_values)):
         if abs(pacf_values[i]) < (2 / (len(series) ** 0.5)):
             return i - 1
@@ -38,36 +49,158 @@ def adf_test(series, d=0, column="Close"):
         return adf_test(series.dropna(), d + 1, column=f"{column}_diff")
 
 
-def arima_model(ticker):
-    """Load data, convert it to daily frequency, and check for stationarity."""
-    data = pd.read_csv("../data/raw_data/data_1d.csv", parse_dates=["Date"], index_col="Date")
-    data = data[["Close"]].dropna()
+def _fit_arima(task):
+    """
+    Fits one ARIMA order (worker of `search_order`). Parameters of a fitted neighbouring
+    order are used as start values; parameters it does not have start at 0.
+    """
+    values, order, neighbour = task
+    model = ARIMA(values, order=order, enforce_stationarity=False, enforce_invertibility=False)
+    result = {"order": order, "param_names": list(model.param_names), "params": None,
+              "aic": np.inf, "bic": np.inf, "converged": False}
+    start_params = None
+    if neighbour is not None:
+        start_params = [neighbour.get(name, 0.0) for name in model.param_names]
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            model_fit = model.fit(start_params=start_params)
+    except Exception as e:
+        result["error"] = str(e)
+        return result
+    result.update(params=[float(value) for value in model_fit.params], aic=float(model_fit.aic),
+                  bic=float(model_fit.bic), converged=bool(model_fit.mle_retvals.get("converged", False)))
+    return result
+
+
+def search_order(series, d=0, max_p=3, max_q=3, criterion="aic", workers=1, patience=1):
+    """
+    Selects the ARIMA order by information criterion.
+
+    Orders are fitted level by level of p + q (all orders of one level in parallel), each
+    warm-started from the better of its fitted neighbours (p - 1, q) and (p, q - 1). The search
+    stops once the best criterion has not improved for `patience` levels. Fits are cached by a
+    hash of the data and d, so re-running on unchanged data does not fit again.
+
+    - `series`: Values the model is fitted to (missing values allowed).
+    - `d`: Differencing order (e.g. from `adf_test`).
+    - `criterion`: 'aic' or 'bic'.
+    - `workers`: Number of processes fitting the orders of a level.
+
+    Returns (best, table): the fit of the best order (order, params, param_names, aic, bic,
+    converged) and a DataFrame of all fitted orders ranked by the criterion.
+    """
+    if criterion not in ("aic", "bic"):
+        raise ValueError("criterion must be 'aic' or 'bic'")
+    values = np.asarray(series, dtype=np.float64)
+    key = cache.digest((values, d))
+    entry = cache.load_entry("arima", key)
+    fits = dict(entry["value"]) if entry else {}
+    fitted_before = len(fits)
+
+    def neighbour_params(p, q):
+        candidates = [fits.get((p - 1, d, q)), fits.get((p, d, q - 1))]
+        candidates = [fit for fit in candidates if fit is not None and fit["params"] is not None]
+        if not candidates:
+            return None
+        fit = min(candidates, key=lambda fit: fit[criterion])
+        return dict(zip(fit["param_names"], fit["params"]))
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    best, stale = None, 0
+    try:
+        for level in range(max_p + max_q + 1):
+            orders = [(p, d, level - p) for p in range(max(0, level - max_q), min(level, max_p) + 1)]
+            tasks = [(values, order, neighbour_params(order[0], order[2])) for order in orders if order not in fits]
+            results = executor.map(_fit_arima, tasks) if executor and len(tasks) > 1 else map(_fit_arima, tasks)
+            for result in results:
+                fits[result["order"]] = result
+
+            level_best = min((fits[order] for order in orders), key=lambda fit: fit[criterion])
+            if best is None or level_best[criterion] < best[criterion]:
+                best, stale = level_best, 0
+            else:
+                stale += 1
+                if stale >= patience:
+                    break
+    finally:
+        if executor:
+            executor.shutdown()
+
+    if len(fits) > fitted_before:
+        cache.store("arima", key, fits)
+    table = pd.DataFrame([{"order": fit["order"], "aic": fit["aic"], "bic": fit["bic"], "converged": fit["converged"]}
+                          for fit in fits.values()]).sort_values(criterion, ignore_index=True)
+    return best, table
+
+
+def prepare_arima_data(close):
+    """Converts closes indexed by date to the daily frequency modelled by `arima_model` and returns (data, d)."""
+    data = close.dropna().to_frame("Close")
 
     # Explicitly set frequency
-    data = data.asfreq('D')
+    if isinstance(data.index, pd.DatetimeIndex):
+        data = data.asfreq('D')
 
     # ADF Test for differencing order (d)
-    data, d = adf_test(data, d=0, column="Close")
+    return adf_test(data, d=0, column="Close")
+
+
+def arima_data():
+    """Loads the daily closes at daily frequency as modelled by `arima_model` and returns (data, d)."""
+    data = bar_store.read_bars("data_1d", columns=["Date", "Close"]).set_index("Date")
+    return prepare_arima_data(data["Close"])
+
 
-    # Extract Close column as a Series
-    close_series = data["Close"]
+def arima_order(data, d):
+    """The (p, d, q) order of `arima_model`: p and q from the ACF/PACF thresholds of `find_p` / `find_q`."""
+    return find_p(data["Close"], max_lags=5), d, find_q(data["Close"], max_lags=5)
 
-    # Find p and q
-    q, p = find_q(close_series, max_lags=5), find_p(close_series, max_lags=5)
+
+def fit_arima(data, order):
+    """Fits the ARIMA specification of `arima_model` to the 'Close' column of `data`."""
+    model = ARIMA(data["Close"].reset_index(drop=True), order=order, enforce_stationarity=False,
+                  enforce_invertibility=False)
+    return model.fit()
+
+
+def arima_model(ticker, order_search=False, criterion="aic", max_p=3, max_q=3, workers=1):
+    """
+    Load data, convert it to daily frequency, and check for stationarity.
+
+    - `order_search`: Select p and q by information criterion (see `search_order`) instead of
+      the ACF/PACF thresholds of `find_p` / `find_q`.
+    - `criterion`, `max_p`, `max_q`, `workers`: Options of the order search.
+    """
+    data, d = arima_data()
 
     # Reset index to avoid datetime issues
     data_reset = data.reset_index()
 
-    # Fit ARIMA Model
-    model = ARIMA(data_reset["Close"], order=(p, d, q), enforce_stationarity=False, enforce_invertibility=False)
-
-    try:
-        model_fit = model.fit()
-        if not model_fit.mle_retvals['converged']:
+    if order_search:
+        best, _ = search_order(data_reset["Close"], d, max_p=max_p, max_q=max_q, criterion=criterion, workers=workers)
+        if best["params"] is None:
+            print(f"ARIMA model failed to converge: {best.get('error')}")
+            return
+        p, _, q = best["order"]
+        print(f"Selected ARIMA{best['order']} by {criterion.upper()}: {best[criterion]:.2f}")
+        if not best["converged"]:
             print("⚠️ Warning: ARIMA model did NOT converge properly.")
-    except Exception as e:
-        print(f"ARIMA model failed to converge: {e}")
-        return
+        # The search already estimated the parameters; only run the filter with them
+        model = ARIMA(data_reset["Close"], order=(p, d, q), enforce_stationarity=False, enforce_invertibility=False)
+        model_fit = model.filter(best["params"])
+    else:
+        # Find p and q
+        p, _, q = arima_order(data, d)
+
+        try:
+            # Fit ARIMA Model
+            model_fit = fit_arima(data, (p, d, q))
+            if not model_fit.mle_retvals['converged']:
+                print("⚠️ Warning: ARIMA model did NOT converge properly.")
+        except Exception as e:
+            print(f"ARIMA model failed to converge: {e}")
+            return
 
     # Forecasting
     forecast_steps = 10  # Predict next 10 days
@@ -104,8 +237,9 @@ def arima_model(ticker):
 
 def find_garch_q(series, max_lags=5):
     """Find optimal q (ARCH order) based on ACF of squared returns."""
-    squared_series = series.dropna() ** 2  # GARCH models use squared returns
-    acf_values = acf(squared_series.values, nlags=min(max_lags, len(series) - 1))
+    # GARCH models use squared returns (computed in the same batch as the ACF/PACF of the returns)
+    acf_values = autocorrelation.correlations(series.dropna().values,
+                                              min(max_lags, len(series) - 1))["acf_squared"]
 
     for i in range(1, len(acf_values)):
         if abs(acf_values[i]) < (2 / (len(series) ** 0.5)):  # Significance threshold
@@ -116,8 +250,9 @@ def find_garch_q(series, max_lags=5):
 
 def find_garch_p(series, max_lags=5):
     """Find optimal p (GARCH order) based on PACF of squared returns."""
-    squared_series = series.dropna() ** 2  # Use squared log returns
-    pacf_values = pacf(squared_series.values, nlags=min(max_lags, len(series) - 1))
+    # Use squared log returns
+    pacf_values = autocorrelation.correlations(series.dropna().values,
+                                               min(max_lags, len(series) - 1))["pacf_squared"]
 
     for i in range(1, len(pacf_values)):
         if abs(pacf_values[i]) < (2 / (len(series) ** 0.5)):  # Significance threshold
@@ -126,9 +261,107 @@ def find_garch_p(series, max_lags=5):
     return min(max_lags, len(series) - 1)
 
 
+def fit_garch(log_returns, p=None, q=None, starting_values=None):
+    """
+    Fits the zero-mean GARCH model of `garch_model` to daily log returns (in percent).
+
+    - `p`, `q`: Model orders (default: `find_garch_p` / `find_garch_q`, with at least one
+      ARCH term, which arch_model requires).
+    - `starting_values`: Optional start parameters (omega, alpha..., beta...), e.g. of a
+      previous fit, to warm-start the optimizer.
+
+    Returns the fitted arch_model result.
+    """
+    p = max(find_garch_p(log_returns), 1) if p is None else p
+    q = find_garch_q(log_returns) if q is None else q
+    model = arch_model(log_returns * 100, vol="Garch", p=p, q=q, mean="Zero", dist="normal")
+    return model.fit(disp="off", starting_values=starting_values)
+
+
+def garch_parameters(garch_result):
+    """
+    Returns the fitted parameters and the last state of a GARCH result as keyword arguments
+    of `simulation.garch_paths` (omega, alpha, beta, residuals, variances).
+    """
+    params = garch_result.params
+    p, q = garch_result.model.volatility.p, garch_result.model.volatility.q
+    residuals = np.asarray(garch_result.resid)
+    variances = np.asarray(garch_result.conditional_volatility) ** 2
+    return {
+        "omega": float(params["omega"]),
+        "alpha": [float(params[f"alpha[{i}]"]) for i in range(1, p + 1)],
+        "beta": [float(params[f"beta[{i}]"]) for i in range(1, q + 1)],
+        "residuals": residuals[len(residuals) - p:].tolist(),
+        "variances": variances[len(variances) - q:].tolist(),
+    }
+
+
+class GarchVariance:
+    """
+    Runs the variance recursion of a fitted zero-mean GARCH(p, q) model forward one return at
+    a time (see `garch_parameters` for the parameters and the starting state).
+
+    Also tracks how well the model still fits: under the model the squared standardized
+    residuals average 1, and `drift_score` is their deviation in standard errors since the fit.
+    The standard error uses the `kurtosis` of the standardized residuals of the fit
+    (Var(z^2) = kurtosis - 1), so fat tails alone do not count as drift.
+    """
+
+    def __init__(self, omega, alpha, beta, residuals, variances, scale=100.0, kurtosis=3.0):
+        self.omega = float(omega)
+        self.alpha = [float(value) for value in alpha]
+        self.beta = [float(value) for value in beta]
+        # Last p residuals and last q variances, oldest first
+        self.residuals = [float(value) for value in residuals][len(residuals) - len(self.alpha):]
+        self.variances = [float(value) for value in variances][len(variances) - len(self.beta):]
+        self.scale = scale
+        self.kurtosis = float(kurtosis)
+        self.updates = 0
+        self.squared_z = 0.0
+
+    def forecast(self):
+        """Returns the conditional variance of the next return (in squared percent)."""
+        variance = self.omega
+        variance += sum(a * e ** 2 for a, e in zip(self.alpha, reversed(self.residuals)))
+        variance += sum(b * h for b, h in zip(self.beta, reversed(self.variances)))
+        return variance
+
+    def update(self, log_return):
+        """Consumes one log return and returns its conditional variance."""
+        variance = self.forecast()
+        residual = float(log_return) * self.scale
+        if self.alpha:
+            self.residuals = self.residuals[1:] + [residual]
+        if self.beta:
+            self.variances = self.variances[1:] + [variance]
+        self.updates += 1
+        self.squared_z += residual ** 2 / variance
+        return variance
+
+    @property
+    def drift_score(self):
+        if not self.updates:
+            return 0.0
+        return abs(self.squared_z - self.updates) / math.sqrt((self.kurtosis - 1) * self.updates)
+
+    def starting_values(self):
+        """Parameters in the order of arch_model (omega, alpha[1..p], beta[1..q])."""
+        return np.array([self.omega] + self.alpha + self.beta)
+
+    def to_dict(self):
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, state):
+        model = cls(state["omega"], state["alpha"], state["beta"], state["residuals"], state["variances"],
+                    state["scale"])
+        model.__dict__.update(state)
+        return model
+
+
 def garch_model(ticker):
     # Load data
-    data = pd.read_csv("../data/raw_data/data_1d.csv")
+    data = bar_store.read_bars("data_1d")
 
     # Adjust close prices
     data["Adj Close"] = data["Close"] * (data["Close"] / data["Close"].shift(1))
@@ -149,8 +382,7 @@ def garch_model(ticker):
     print(f"Optimal GARCH(p,q): ({best_p}, {best_q})")
 
     # Fit the GARCH model
-    garch_model = arch_model(data["Log return"] * 100, vol="Garch", p=best_p, q=best_q, mean="Zero", dist="normal")
-    garch_result = garch_model.fit(disp="off")
+    garch_result = fit_garch(data["Log return"], best_p, best_q)
 
     print(garch_result.summary())
 
@@ -216,5 +448,358 @@ def garch_model(ticker):
 
     print(f"1-Day 95% VaR Estimate: {VaR:.2f}%")
 
-
-# TODO: Arima testing
+    return garch_result
+
+
+def update_garch(ticker, refit_every=20, drift_threshold=3.0):
+    """
+    Incrementally updates the GARCH volatility of the daily closes.
+
+    The fitted parameters with the last residuals and conditional variances are saved to
+    STATE_DIR as of the second to last bar, so new bars only run the variance recursion
+    forward (O(1) per bar, see `GarchVariance`). The state file is replaced
+    atomically. The model is re-estimated, warm-started from the saved parameters with the
+    same orders, after `refit_every` new bars or when the standardized residuals drift from
+    the model (`drift_threshold` standard errors, allowing for the kurtosis of the fit).
+    Without a matching, readable saved state the model is fitted from scratch.
+
+    Returns a dictionary with the next-day volatility and 95% VaR (in percent), whether the
+    model was refitted and the number of bars processed.
+    """
+    bars = bar_store.open_bars("data_1d", columns=["Date", "Close"])
+    valid = ~np.isnan(bars["Close"])
+    dates, close = np.asarray(bars["Date"])[valid], np.asarray(bars["Close"], dtype=np.float64)[valid]
+    log_returns = np.log(close[1:] / close[:-1])
+    state_path = os.path.join(analytics.STATE_DIR, f"garch_{ticker}.json")
+
+    model, start, since_fit = None, 0, 0
+    state = None
+    if os.path.exists(state_path):
+        try:
+            with open(state_path) as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable GARCH state {state_path}: {e}")
+    if state is not None:
+        position = state["position"]
+        # Return i ends on bar i + 1
+        if 0 < position <= len(log_returns) and int(dates[position]) == state["date"]:
+            model, start, since_fit = GarchVariance.from_dict(state["model"]), position, state["since_fit"]
+
+    refitted = False
+    if model is not None:
+        for log_return in log_returns[start:-1]:
+            model.update(log_return)
+        since_fit += len(log_returns) - 1 - start
+        if since_fit >= refit_every or model.drift_score > drift_threshold:
+            garch_result = fit_garch(pd.Series(log_returns[:-1]), len(model.alpha), len(model.beta),
+                                     starting_values=model.starting_values())
+            model = None
+    else:
+        garch_result = fit_garch(pd.Series(log_returns[:-1]))
+    if model is None:
+        standardized = np.asarray(garch_result.std_resid)
+        kurtosis = np.mean(standardized ** 4) / np.mean(standardized ** 2) ** 2
+        model = GarchVariance(**garch_parameters(garch_result), kurtosis=kurtosis)
+        refitted, since_fit = True, 0
+
+    os.makedirs(analytics.STATE_DIR, exist_ok=True)
+    bar_store.write_json(state_path, {"position": len(log_returns) - 1, "date": int(dates[-2]),
+                                      "since_fit": since_fit, "model": model.to_dict()})
+
+    # The last (possibly still forming) bar is processed but not saved
+    model.update(log_returns[-1])
+    volatility = float(np.sqrt(model.forecast()))
+    result = {
+        "volatility": volatility,
+        "VaR 95%": volatility * 1.645,
+        "refitted": refitted,
+        "bars processed": len(log_returns) - start,
+    }
+    print(f"{ticker} GARCH volatility: {volatility:.2f}%, 1-Day 95% VaR Estimate: {result['VaR 95%']:.2f}%"
+          f"{' (refitted)' if refitted else ''}")
+    return result
+
+
+def _backtest_block(task):
+    """
+    Walks one block of forecast origins forward (worker of `backtest_arima`): the model is
+    fitted at the first origin and only extended with the new observations at the others.
+    """
+    values, order, origins, horizon, start_params = task
+    rows = []
+    model_fit, previous = None, None
+    for origin in origins:
+        if model_fit is None:
+            model = ARIMA(values[:origin], order=order, enforce_stationarity=False, enforce_invertibility=False)
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                model_fit = model.fit(start_params=start_params)
+        else:
+            # Runs the filter over the new observations only, keeping the parameters
+            model_fit = model_fit.extend(values[previous:origin])
+        previous = origin
+
+        forecast = np.asarray(model_fit.forecast(steps=horizon))
+        actual = values[origin:origin + horizon]
+        for step, (predicted, observed) in enumerate(zip(forecast, actual), start=1):
+            rows.append((origin, step, predicted, observed))
+    return rows
+
+
+def backtest_arima(ticker, order=None, horizon=10, initial=0.7, step=1, refit_every=20, workers=1):
+    """
+    Rolling-origin backtest of the `arima_model` forecast.
+
+    At every origin the model forecasts `horizon` days from the data up to that day. The
+    parameters are re-estimated only every `refit_every` origins (warm-started from the fit on
+    the initial window); in between the fitted model is extended with the new observations.
+    Blocks between refits are independent, so they run in parallel and the result does not
+    depend on the number of workers.
+
+    - `order`: ARIMA order (default: `find_p` / `find_q` on the initial window, d from `adf_test`).
+    - `initial`: Size of the first training window in observations, or as a fraction of the data.
+    - `step`: Observations between two origins.
+    - `workers`: Number of processes.
+
+    Returns:
+    - DataFrame with MAE, RMSE and MAPE (%) by forecast horizon, also saved to
+      ../data/raw_data/backtest_arima_{ticker}.csv.
+    - DataFrame with every forecast (origin, horizon, forecast, actual).
+    """
+    data, d = arima_data()
+    values = data["Close"].to_numpy(dtype=np.float64)
+    initial = int(len(values) * initial) if isinstance(initial, float) else initial
+    if order is None:
+        training = data["Close"].iloc[:initial]
+        order = (find_p(training, max_lags=5), d, find_q(training, max_lags=5))
+
+    # The initial fit provides the start values of every refit
+    initial_model = ARIMA(values[:initial], order=order, enforce_stationarity=False, enforce_invertibility=False)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        start_params = initial_model.fit().params
+
+    origins = list(range(initial, len(values) - 1, step))
+    blocks = [origins[i:i + refit_every] for i in range(0, len(origins), refit_every)]
+    tasks = [(values, order, block, horizon, start_params) for block in blocks]
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            results = list(executor.map(_backtest_block, tasks))
+    else:
+        results = list(map(_backtest_block, tasks))
+
+    forecasts = pd.DataFrame([row for rows in results for row in rows],
+                             columns=["Origin", "Horizon", "Forecast", "Actual"])
+    forecasts["Origin"] = data.index[forecasts["Origin"]]
+    # Days without a close (weekends at daily frequency) are not scored
+    errors = forecasts.dropna(subset=["Actual"])
+    error = errors["Forecast"] - errors["Actual"]
+    metrics = pd.DataFrame({
+        "MAE": error.abs().groupby(errors["Horizon"]).mean(),
+        "RMSE": np.sqrt((error ** 2).groupby(errors["Horizon"]).mean()),
+        "MAPE (%)": (error.abs() / errors["Actual"].abs()).groupby(errors["Horizon"]).mean() * 100,
+        "Forecasts": errors.groupby("Horizon").size(),
+    }).reset_index()
+
+    print(f"ARIMA{tuple(order)} backtest for {ticker}: {len(origins)} origins, refit every {refit_every}")
+    print(metrics.to_string(index=False))
+
+    filename = f"backtest_arima_{ticker}.csv"
+    raw_data_dir = "../data/raw_data"
+    file_path = os.path.join(raw_data_dir, filename)
+    metrics.to_csv(file_path, index=False)
+    return metrics, forecasts
+
+
+def universe_closes():
+    """
+    Collects the daily closes of everything that can be modelled: the ticker in data_1d, the
+    tickers of the 'universe_1d' panel and the indices in merged_indices.csv.
+
+    Returns a dictionary of series name to close Series indexed by date.
+    """
+    closes = {}
+    if bar_store.has_bars("data_1d"):
+        data = bar_store.read_bars("data_1d", columns=["Date", "Close"])
+        closes[bar_store.read_meta("data_1d").get("ticker") or "data_1d"] = data.set_index("Date")["Close"]
+    if bar_store.has_bars("universe_1d"):
+        panel = bar_store.read_panel("universe_1d", "Close")
+        closes.update({ticker: panel[ticker] for ticker in panel.columns})
+    indices_path = "../data/raw_data/merged_indices.csv"
+    if os.path.exists(indices_path):
+        indices = pd.read_csv(indices_path, parse_dates=["Date"]).set_index("Date")
+        # The ticker column (data_1d, renamed by indices.prepare_indices) is already included
+        for column in indices.columns:
+            if column != "data_1d" and column not in closes:
+                closes[column] = indices[column]
+    return closes
+
+
+def _garch_rows(close, horizon):
+    """Fits `fit_garch` to the log returns; returns (converged, rows)."""
+    close = close.to_numpy()
+    log_returns = pd.Series(np.log(close[1:] / close[:-1]))
+    garch_result = fit_garch(log_returns)
+    rows = [("Parameter", name, None, float(value)) for name, value in garch_result.params.items()]
+    rows.append(("Volatility", "Conditional volatility (%)", 0, float(garch_result.conditional_volatility.iloc[-1])))
+    predicted_vol = np.sqrt(garch_result.forecast(horizon=horizon).variance.values[-1])
+    rows += [("Forecast", "Volatility (%)", h, float(value)) for h, value in enumerate(predicted_vol, start=1)]
+    return garch_result.convergence_flag == 0, rows
+
+
+def _arima_rows(close, horizon):
+    """Fits the `arima_model` specification (see `arima_order` and `fit_arima`); returns (converged, rows)."""
+    data, d = prepare_arima_data(close)
+    order = arima_order(data, d)
+    model_fit = fit_arima(data, order)
+    rows = [("Parameter", name, None, float(value)) for name, value in zip("pdq", order)]
+    rows += [("Parameter", name, None, float(value)) for name, value in model_fit.params.items()]
+    rows.append(("Volatility", "Residual std", 0, float(np.sqrt(model_fit.params["sigma2"]))))
+    rows += [("Forecast", "Close", h, float(value))
+             for h, value in enumerate(np.asarray(model_fit.forecast(steps=horizon)), start=1)]
+    return bool(model_fit.mle_retvals.get("converged", False)), rows
+
+
+UNIVERSE_MODELS = {"garch": _garch_rows, "arima": _arima_rows}
+
+
+def _raise_timeout(signum, frame):
+    raise TimeoutError
+
+
+def _fit_universe_task(task):
+    """
+    Fits one model to one series (worker of `model_universe`). The timeout interrupts the fit
+    through SIGALRM where the platform supports it; elsewhere `_run_universe_processes` enforces it.
+    """
+    name, model, close, horizon, timeout = task
+    started = time.perf_counter()
+    result = {"Series": name, "Model": model, "Status": "ok", "Converged": False, "rows": []}
+    use_alarm = (timeout and hasattr(signal, "SIGALRM")
+                 and threading.current_thread() is threading.main_thread())
+    if use_alarm:
+        previous_handler = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            result["Converged"], result["rows"] = UNIVERSE_MODELS[model](close, horizon)
+    except TimeoutError:
+        result["Status"] = "timeout"
+    except Exception as e:
+        result["Status"] = f"error: {e}"
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous_handler)
+    result["Seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def _fit_universe_process(task, connection):
+    """Process target of `_run_universe_processes`: sends the result of one fit back."""
+    connection.send(_fit_universe_task(task))
+    connection.close()
+
+
+def _run_universe_processes(tasks, workers, timeout):
+    """
+    Runs every task of `model_universe` in its own process, at most `workers` at a time, for
+    platforms without SIGALRM: a fit still running after `timeout` seconds is terminated and
+    reported as 'timeout' without disturbing the other fits.
+    """
+    results = [None] * len(tasks)
+    pending = deque(range(len(tasks)))
+    running = {}  # result pipe -> (task index, process, start time)
+    while pending or running:
+        while pending and len(running) < workers:
+            index = pending.popleft()
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(target=_fit_universe_process, args=(tasks[index], sender), daemon=True)
+            process.start()
+            sender.close()
+            running[receiver] = (index, process, time.perf_counter())
+
+        # Sleep until a fit finishes or the earliest deadline passes
+        deadline = min(started for _, _, started in running.values()) + timeout
+        for receiver in multiprocessing.connection.wait(list(running), max(deadline - time.perf_counter(), 0)):
+            index, process, started = running.pop(receiver)
+            try:
+                results[index] = receiver.recv()
+            except EOFError:
+                results[index] = _failed_task(tasks[index], f"error: worker exited with code {process.exitcode}",
+                                              time.perf_counter() - started)
+            process.join()
+
+        for receiver, (index, process, started) in list(running.items()):
+            if time.perf_counter() - started > timeout:
+                process.terminate()
+                process.join()
+                del running[receiver]
+                results[index] = _failed_task(tasks[index], "timeout", time.perf_counter() - started)
+    return results
+
+
+def _failed_task(task, status, seconds):
+    """Result record of a fit that did not return."""
+    name, model = task[:2]
+    return {"Series": name, "Model": model, "Status": status, "Converged": False, "rows": [],
+            "Seconds": round(seconds, 3)}
+
+
+def model_universe(closes=None, models=("garch", "arima"), horizon=10, workers=None, timeout=120):
+    """
+    Fits GARCH and/or ARIMA models to many series in a shared process pool.
+
+    - `closes`: Dictionary (or DataFrame) of series name to daily closes (default: `universe_closes`,
+      the ticker, the universe panel and the indices).
+    - `models`: Models fitted to every series ('garch', 'arima').
+    - `horizon`: Forecast horizon in days.
+    - `workers`: Number of processes (default: all cores).
+    - `timeout`: Seconds after which a single fit is abandoned and reported as 'timeout'. Fits
+      are interrupted through SIGALRM where available; elsewhere every fit runs in its own
+      process, which is terminated (see `_run_universe_processes`).
+
+    Returns a tidy DataFrame with one row per value: Series, Model, Status, Converged, Seconds,
+    Kind ('Parameter', 'Volatility' or 'Forecast'), Variable, Horizon and Value. It is also
+    saved to ../data/raw_data/model_universe.csv.
+    """
+    closes = universe_closes() if closes is None else closes
+    unknown = set(models) - set(UNIVERSE_MODELS)
+    if unknown:
+        raise ValueError(f"Unknown models: {', '.join(sorted(unknown))}")
+    tasks = []
+    for name, close in closes.items():
+        close = pd.Series(close, dtype=np.float64).dropna()
+        tasks += [(name, model, close, horizon, timeout) for model in models]
+
+    workers = min(workers or os.cpu_count() or 1, max(len(tasks), 1))
+    if timeout and tasks and not hasattr(signal, "SIGALRM"):
+        results = _run_universe_processes(tasks, workers, timeout)
+    elif workers > 1:
+        # Every worker interrupts its own fits through SIGALRM
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_fit_universe_task, tasks))
+    else:
+        results = list(map(_fit_universe_task, tasks))
+
+    columns = ["Series", "Model", "Status", "Converged", "Seconds"]
+    records = []
+    for result in results:
+        fields = [result[column] for column in columns]
+        records += [fields + list(row) for row in result["rows"]] or [fields + [None, None, None, None]]
+    table = pd.DataFrame(records, columns=columns + ["Kind", "Variable", "Horizon", "Value"])
+
+    failed = [result for result in results if result["Status"] != "ok"]
+    not_converged = [result for result in results if result["Status"] == "ok" and not result["Converged"]]
+    print(f"Fitted {len(results)} models on {len(closes)} series: {len(results) - len(failed) - len(not_converged)} "
+          f"converged, {len(not_converged)} not converged, {len(failed)} failed.")
+    for result in not_converged:
+        print(f"⚠️ Warning: {result['Model']} model for {result['Series']} did NOT converge properly.")
+    for result in failed:
+        print(f"⚠️ Warning: {result['Model']} model for {result['Series']} failed ({result['Status']}).")
+
+    file_path = os.path.join("../data/raw_data", "model_universe.csv")
+    table.to_csv(file_path, index=False)
+    return table
@@ -0,0 +1,127 @@
+import os
+import json
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from equity_analysis import bar_store
+
+ARTIFACT_DIR = "../data/simulations"
+PATHS_FILE = "paths.npy"
+META_FILE = "meta.json"
+LATEST_FILE = "latest.json"
+
+# Every simulation run is a folder named by its run ID holding the (days x simulations) path
+# matrix as a .npy file and a small JSON header (model, parameters, seed, created_at).
+# Consumers memory-map the matrix, so nothing is parsed and only the pages read are loaded.
+# LATEST_FILE points to the most recent run of every model, so the default run of an analysis
+# is found without reading all headers.
+
+
+def _run_dir(run_id):
+    return os.path.join(ARTIFACT_DIR, run_id)
+
+
+def _read_latest():
+    """Loads the latest-run pointers ({model or '*': run_id}), or {} if missing or unreadable."""
+    try:
+        with open(os.path.join(ARTIFACT_DIR, LATEST_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def new_run_id(model):
+    """Returns a new run ID such as 'mcs_20250219_153012_123456'."""
+    return f"{model}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+
+
+def create_run(model, days, simulations, dtype=np.float64, run_id=None, **meta):
+    """
+    Creates an empty run and returns (run_id, paths, meta), where `paths` is a writable
+    memory-mapped (days x simulations) array that can be filled chunk by chunk. The header is
+    written by `finish_run`, so unfinished runs are never listed.
+
+    - `meta`: Extra header fields (e.g. mu, sigma, S0, seed).
+    """
+    run_id = run_id or new_run_id(model)
+    os.makedirs(_run_dir(run_id), exist_ok=True)
+    paths = np.lib.format.open_memmap(os.path.join(_run_dir(run_id), PATHS_FILE), mode="w+",
+                                      dtype=dtype, shape=(days, simulations))
+    meta = dict(meta, run_id=run_id, model=model, days=days, simulations=simulations, dtype=np.dtype(dtype).name)
+    return run_id, paths, meta
+
+
+def finish_run(run_id, paths, meta):
+    """Flushes the paths of a run created with `create_run` and publishes its header."""
+    paths.flush()
+    meta = dict(meta, created_at=datetime.now().isoformat())
+    bar_store.write_json(os.path.join(_run_dir(run_id), META_FILE), meta)
+    latest = dict(_read_latest(), **{"*": run_id, meta["model"]: run_id})
+    bar_store.write_json(os.path.join(ARTIFACT_DIR, LATEST_FILE), latest)
+    return meta
+
+
+def save_run(paths, model, run_id=None, **meta):
+    """Saves a complete (days x simulations) path matrix as a new run and returns its run ID."""
+    paths = np.asarray(paths)
+    run_id, target, meta = create_run(model, paths.shape[0], paths.shape[1], paths.dtype, run_id, **meta)
+    target[:] = paths
+    finish_run(run_id, target, meta)
+    return run_id
+
+
+def list_runs(model=None):
+    """Returns the headers of all finished runs (optionally of one model), oldest first."""
+    if not os.path.isdir(ARTIFACT_DIR):
+        return []
+    runs = []
+    for run_id in os.listdir(ARTIFACT_DIR):
+        meta_path = os.path.join(_run_dir(run_id), META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if model is None or meta.get("model") == model:
+                runs.append(meta)
+    return sorted(runs, key=lambda meta: meta["created_at"])
+
+
+def latest_run(model=None):
+    """Returns the run ID of the most recent run (optionally of one model)."""
+    run_id = _read_latest().get(model or "*")
+    if run_id and os.path.exists(os.path.join(_run_dir(run_id), META_FILE)):
+        return run_id
+    # No pointer yet (or its run was removed): scan the headers
+    runs = list_runs(model)
+    if not runs:
+        raise FileNotFoundError(f"No simulation runs{f' of model {model}' if model else ''} found in {ARTIFACT_DIR}")
+    return runs[-1]["run_id"]
+
+
+def read_meta(run_id):
+    """Loads the header of a run."""
+    with open(os.path.join(_run_dir(run_id), META_FILE)) as f:
+        return json.load(f)
+
+
+def open_run(run_id=None, model=None):
+    """
+    Opens the paths of a run as a read-only memory-mapped (days x simulations) array.
+
+    - `run_id`: Run to open (default: the latest run, optionally of `model`).
+
+    Returns (paths, meta).
+    """
+    run_id = run_id or latest_run(model)
+    meta = read_meta(run_id)
+    paths = np.load(os.path.join(_run_dir(run_id), PATHS_FILE), mmap_mode="r")
+    return paths, meta
+
+
+def export_csv(run_id=None, file_path=None):
+    """Exports the paths of a run to CSV in the layout of the former forecast_results*.csv files."""
+    paths, meta = open_run(run_id)
+    if file_path is None:
+        file_path = os.path.join("../data/raw_data", f"{meta['run_id']}.csv")
+    pd.DataFrame(paths).to_csv(file_path, index=False)
+    print(f"Exported {meta['run_id']} to {file_path}")
+    return file_path
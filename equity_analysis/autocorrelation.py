@@ -0,0 +1,85 @@
+import hashlib
+from collections import OrderedDict
+import numpy as np
+from scipy import fft
+
+# Autocorrelations of many series at once: the autocovariances of all rows come from one
+# FFT and the partial autocorrelations from a Durbin-Levinson recursion over all rows, with
+# the same conventions as statsmodels `acf` (fft=True) and `pacf` (method='ywadjusted').
+
+# (data hash, nlags) -> correlations of a series and of its square, least recently used first
+_correlations = OrderedDict()
+CACHE_SIZE = 256
+
+
+def autocovariance(series, nlags, adjusted=False):
+    """
+    Autocovariances up to `nlags` of every series.
+
+    - `series`: 2-D array (one series per row) or a list of 1-D arrays of different lengths.
+    - `adjusted`: Divide lag k by n - k instead of n.
+
+    Returns a (series x nlags + 1) array.
+    """
+    rows = [np.asarray(values, dtype=np.float64) for values in series]
+    lengths = np.array([len(values) for values in rows])
+    # Demeaned series padded with zeros, so products beyond a series' end vanish
+    padded = np.zeros((len(rows), lengths.max()))
+    for row, values in zip(padded, rows):
+        row[:len(values)] = values - values.mean()
+
+    size = fft.next_fast_len(2 * padded.shape[1] - 1, real=True)
+    spectrum = fft.rfft(padded, n=size, axis=1)
+    result = fft.irfft(spectrum * np.conj(spectrum), n=size, axis=1)[:, :nlags + 1]
+    lags = np.arange(nlags + 1)
+    divisor = lengths[:, np.newaxis] - lags if adjusted else lengths[:, np.newaxis]
+    return result / divisor
+
+
+def acf(series, nlags):
+    """Autocorrelations (lags 0..nlags) of every series, like statsmodels `acf`."""
+    covariances = autocovariance(series, nlags)
+    return covariances / covariances[:, :1]
+
+
+def pacf(series, nlags):
+    """
+    Partial autocorrelations (lags 0..nlags) of every series, solving the Yule-Walker
+    equations of the adjusted autocovariances with the Durbin-Levinson recursion, like
+    statsmodels `pacf` (method='ywadjusted').
+    """
+    covariances = autocovariance(series, nlags, adjusted=True)
+    result = np.ones_like(covariances)
+    coefficients = np.zeros((len(covariances), 0))
+    variance = covariances[:, 0]
+    for lag in range(1, nlags + 1):
+        reflection = (covariances[:, lag] - np.sum(coefficients * covariances[:, lag - 1:0:-1], axis=1)) / variance
+        coefficients = np.column_stack([coefficients - reflection[:, np.newaxis] * coefficients[:, ::-1], reflection])
+        variance = variance * (1 - reflection ** 2)
+        result[:, lag] = reflection
+    return result
+
+
+def correlations(values, nlags):
+    """
+    ACF and PACF of a series and of its square (as used by the GARCH order selection),
+    computed in one batch and cached by the content of the series. The cache keeps the
+    CACHE_SIZE most recently used series.
+
+    Returns a dictionary with read-only 'acf', 'pacf', 'acf_squared' and 'pacf_squared' arrays.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    key = (hashlib.sha1(values.tobytes()).hexdigest(), nlags)
+    if key in _correlations:
+        _correlations.move_to_end(key)
+    else:
+        batch = np.vstack([values, values ** 2])
+        acf_values, pacf_values = acf(batch, nlags), pacf(batch, nlags)
+        result = {"acf": acf_values[0], "pacf": pacf_values[0],
+                  "acf_squared": acf_values[1], "pacf_squared": pacf_values[1]}
+        for array in result.values():
+            array.setflags(write=False)
+        _correlations[key] = result
+        while len(_correlations) > CACHE_SIZE:
+            _correlations.popitem(last=False)
+    return dict(_correlations[key])
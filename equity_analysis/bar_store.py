@@ -0,0 +1,308 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+
+STORE_DIR = "../data/bar_store"
+META_FILE = "meta.json"
+
+
+def _dataset_dir(name):
+    """Returns the directory holding the columns of a stored dataset."""
+    return os.path.join(STORE_DIR, name)
+
+
+def write_json(file_path, payload):
+    """Writes JSON to a temporary file and atomically moves it into place."""
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(payload, f, indent=2, default=str)
+    os.replace(tmp_path, file_path)
+
+
+def has_bars(name):
+    """Checks whether a dataset exists in the bar store."""
+    return os.path.exists(os.path.join(_dataset_dir(name), META_FILE))
+
+
+def list_datasets():
+    """Lists all datasets available in the bar store."""
+    if not os.path.isdir(STORE_DIR):
+        return []
+    return sorted(name for name in os.listdir(STORE_DIR) if has_bars(name))
+
+
+def read_meta(name):
+    """Loads the metadata header (columns, dtypes, length, ticker, interval) of a dataset."""
+    meta_path = os.path.join(_dataset_dir(name), META_FILE)
+    if not os.path.exists(meta_path):
+        raise FileNotFoundError(f"No dataset named {name} found in {STORE_DIR}")
+    with open(meta_path) as f:
+        return json.load(f)
+
+
+def _encode_column(series, dtype=None):
+    """Converts a DataFrame column into a typed numpy array for storage."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        # Epoch nanoseconds of the (timezone-naive) exchange time
+        return series.values.astype("datetime64[ns]").astype(np.int64)
+    if dtype is not None:
+        return series.to_numpy(dtype=dtype)
+    if pd.api.types.is_bool_dtype(series):
+        return series.to_numpy(dtype=np.bool_)
+    if pd.api.types.is_integer_dtype(series):
+        return series.to_numpy(dtype=np.int64)
+    if pd.api.types.is_numeric_dtype(series):
+        return series.to_numpy(dtype=np.float64)
+    raise ValueError(f"Column {series.name} is not numeric and cannot be stored")
+
+
+def _remove_stale_files(name):
+    """
+    Removes the column files that the current header of a dataset no longer references.
+    Files that cannot be removed yet (still mapped by a reader on Windows) are retried on the next write.
+    """
+    dataset_dir = _dataset_dir(name)
+    live_files = {META_FILE}
+    if has_bars(name):
+        live_files |= {spec["file"] for spec in read_meta(name)["columns"].values()}
+    for file_name in os.listdir(dataset_dir):
+        if file_name not in live_files and not file_name.endswith(".tmp"):
+            try:
+                os.remove(os.path.join(dataset_dir, file_name))
+            except OSError:
+                pass
+
+
+def _save_generation(name, meta, arrays):
+    """
+    Writes column files for a new generation and swaps the metadata header in one step.
+
+    Column files are never overwritten in place: every write creates files tagged with a new
+    generation number and the header is replaced atomically, so readers always see a
+    consistent set of columns. Files of replaced generations are removed lazily at the start
+    of the next write, so readers still mapping the previous generation keep their data.
+    """
+    dataset_dir = _dataset_dir(name)
+    os.makedirs(dataset_dir, exist_ok=True)
+    _remove_stale_files(name)
+
+    generation = meta.get("generation", 0) + 1
+    columns = dict(meta.get("columns", {}))
+    new_files = []
+    try:
+        for column, values in arrays.items():
+            index = columns[column]["index"] if column in columns else len(columns)
+            file_name = f"c{index}.{generation}.npy"
+            new_files.append(file_name)
+            np.save(os.path.join(dataset_dir, file_name), values, allow_pickle=False)
+            columns[column] = {"index": index, "file": file_name, "dtype": str(values.dtype)}
+
+        # Time is the last axis of every column (1-D bars, 2-D ticker x time panels)
+        lengths = {np.load(os.path.join(dataset_dir, spec["file"]), mmap_mode="r").shape[-1]
+                   for spec in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Columns of {name} have different lengths: {sorted(lengths)}")
+    except Exception:
+        # The header still references the previous generation; drop the files of this one
+        for file_name in new_files:
+            try:
+                os.remove(os.path.join(dataset_dir, file_name))
+            except OSError:
+                pass
+        raise
+
+    order = list(meta.get("order", []))
+    order += [column for column in arrays if column not in order]
+    meta = dict(meta, generation=generation, columns=columns, order=order, length=lengths.pop() if lengths else 0)
+    write_json(os.path.join(dataset_dir, META_FILE), meta)
+    return meta
+
+
+def write_bars(data, name, ticker=None, interval=None, dtypes=None):
+    """
+    Saves a bar DataFrame (OHLCV plus indicators) to the columnar store.
+
+    - `data`: DataFrame with a 'Date' column and numeric columns.
+    - `name`: Dataset name (e.g. 'data_1d').
+    - `ticker`, `interval`: Optional identifiers kept in the metadata header.
+    - `dtypes`: Optional mapping of column name to numpy dtype (e.g. {'RSI_14': 'float32'}).
+
+    The 'Date' column is stored as int64 epoch nanoseconds and the 'Timezone' column is kept
+    in the metadata header. An existing dataset with the same name is replaced.
+    """
+    if "Date" not in data.columns:
+        raise ValueError("No 'Date' column found in the data.")
+
+    dtypes = dtypes or {}
+    timezone = None
+    if "Timezone" in data.columns:
+        zones = data["Timezone"].dropna()
+        timezone = str(zones.iloc[-1]) if not zones.empty else None
+
+    arrays = {}
+    for column in data.columns:
+        if column == "Timezone":
+            continue
+        arrays[column] = _encode_column(pd.to_datetime(data[column]) if column == "Date" else data[column],
+                                        dtypes.get(column))
+
+    meta = {"name": name, "ticker": ticker, "interval": interval, "timezone": timezone, "order": list(data.columns)}
+    if has_bars(name):
+        # Keep the generation counter so new files never collide with mapped ones
+        meta["generation"] = read_meta(name)["generation"]
+    return _save_generation(name, meta, arrays)
+
+
+def update_columns(name, columns, dtypes=None):
+    """
+    Adds or replaces columns of an existing dataset without rewriting the other columns.
+
+    - `columns`: Mapping of column name to array-like values of the dataset length
+      (or to (tickers x time) arrays for panels).
+    """
+    meta = read_meta(name)
+    dtypes = dtypes or {}
+    arrays = {}
+    for column, values in columns.items():
+        if isinstance(values, np.ndarray) and values.ndim > 1:
+            arrays[column] = values.astype(dtypes.get(column, np.float64), copy=False)
+        else:
+            arrays[column] = _encode_column(pd.Series(values, name=column), dtypes.get(column))
+    return _save_generation(name, meta, arrays)
+
+
+def append_bars(data, name):
+    """
+    Appends newly fetched bars to an existing dataset and returns the number of bars added.
+
+    Stored bars with a timestamp at or after the first new bar are replaced by the new ones,
+    so an overlapping (possibly still forming) last bar is de-duplicated. Columns that exist
+    only on one side are filled with NaN. The append is published atomically.
+    """
+    meta = read_meta(name)
+    stored = open_bars(name)
+    new_dates = _encode_column(pd.to_datetime(data["Date"]))
+    if len(new_dates) == 0:
+        return 0
+
+    # Number of stored bars that are strictly older than the new data
+    keep = int(np.searchsorted(stored["Date"], new_dates[0], side="left"))
+
+    arrays = {}
+    for column in dict.fromkeys(list(stored) + [c for c in data.columns if c != "Timezone"]):
+        if column == "Date":
+            new = new_dates
+        elif column in data.columns:
+            new = _encode_column(data[column], meta["columns"].get(column, {}).get("dtype"))
+        else:
+            # NaN in the smallest float type that holds the stored values (float32 stays float32)
+            new = np.full(len(data), np.nan, dtype=np.result_type(stored[column].dtype, np.float32))
+        if column in stored:
+            old = stored[column][:keep]
+        else:
+            old = np.full(keep, np.nan, dtype=np.result_type(new.dtype, np.float32))
+        if old.dtype != new.dtype:
+            dtype = np.result_type(old.dtype, new.dtype)
+            old, new = old.astype(dtype), new.astype(dtype)
+        arrays[column] = np.concatenate([old, new])
+
+    added = len(arrays["Date"]) - meta["length"]
+    _save_generation(name, meta, arrays)
+    return added
+
+
+def open_bars(name, columns=None):
+    """
+    Opens a dataset as read-only memory-mapped numpy arrays (zero-copy).
+
+    Returns a dictionary of column name to array; 'Date' holds int64 epoch nanoseconds.
+    """
+    meta = read_meta(name)
+    dataset_dir = _dataset_dir(name)
+    selected = columns if columns is not None else sorted(meta["columns"], key=lambda c: meta["columns"][c]["index"])
+    return {column: np.load(os.path.join(dataset_dir, meta["columns"][column]["file"]), mmap_mode="r")
+            for column in selected}
+
+
+def read_bars(name, columns=None, start=0):
+    """
+    Loads a dataset as a DataFrame with 'Date' as datetime and the 'Timezone' column restored.
+
+    - `start`: Optional first bar position, only the bars from there on are read.
+    """
+    meta = read_meta(name)
+    arrays = open_bars(name, columns)
+
+    data = pd.DataFrame({column: values[start:] for column, values in arrays.items()})
+    if "Date" in data.columns:
+        data["Date"] = pd.to_datetime(data["Date"].values.astype("datetime64[ns]"))
+    if columns is None:
+        if meta.get("timezone") is not None:
+            data["Timezone"] = meta["timezone"]
+        data = data[[column for column in meta["order"] if column in data.columns]]
+    return data
+
+
+def write_panel(name, tickers, dates, fields, interval=None, timezones=None, dtypes=None):
+    """
+    Saves an aligned multi-ticker panel to the store.
+
+    - `tickers`: List of ticker symbols (first axis of every field).
+    - `dates`: Timestamps of the common time axis.
+    - `fields`: Mapping of field name (e.g. 'Close') to a (tickers x time) array.
+    - `timezones`: Optional mapping of ticker to its exchange timezone.
+    """
+    dtypes = dtypes or {}
+    arrays = {"Date": _encode_column(pd.Series(pd.to_datetime(dates)))}
+    for field, values in fields.items():
+        values = np.asarray(values, dtype=dtypes.get(field, np.float64))
+        if values.shape != (len(tickers), len(arrays["Date"])):
+            raise ValueError(f"Field {field} has shape {values.shape}, expected {(len(tickers), len(arrays['Date']))}")
+        arrays[field] = values
+
+    meta = {"name": name, "kind": "panel", "interval": interval, "tickers": list(tickers),
+            "timezones": timezones or {}, "order": list(arrays)}
+    if has_bars(name):
+        meta["generation"] = read_meta(name)["generation"]
+    return _save_generation(name, meta, arrays)
+
+
+def open_panel(name, fields=None):
+    """
+    Opens a panel as memory-mapped arrays.
+
+    Returns (tickers, dates, fields): the ticker list, the int64 epoch-nanosecond time axis and
+    a dictionary of field name to (tickers x time) array.
+    """
+    meta = read_meta(name)
+    if meta.get("kind") != "panel":
+        raise ValueError(f"Dataset {name} is not a panel")
+    selected = ["Date"] + [f for f in (fields or meta["order"]) if f != "Date"]
+    arrays = open_bars(name, selected)
+    return meta["tickers"], arrays.pop("Date"), arrays
+
+
+def read_panel(name, field="Close"):
+    """Loads one field of a panel as a DataFrame indexed by Date with one column per ticker."""
+    tickers, dates, fields = open_panel(name, [field])
+    index = pd.DatetimeIndex(np.asarray(dates).astype("datetime64[ns]"), name="Date")
+    return pd.DataFrame(np.asarray(fields[field]).T, index=index, columns=tickers)
+
+
+def export_csv(name, file_path=None):
+    """Exports a stored dataset to CSV (default: ../data/raw_data/{name}.csv)."""
+    data = read_bars(name)
+    if file_path is None:
+        file_path = os.path.join("../data/raw_data", f"{name}.csv")
+    data.to_csv(file_path, index=False)
+    print(f"Exported {name} to {file_path}")
+    return file_path
+
+
+def import_csv(file_path, name=None, ticker=None, interval=None):
+    """Loads an existing bar CSV (e.g. data/raw_data/data_1d.csv) into the store."""
+    data = pd.read_csv(file_path, parse_dates=["Date"])
+    if name is None:
+        name = os.path.splitext(os.path.basename(file_path))[0]
+    return write_bars(data, name, ticker=ticker, interval=interval)
@@ -0,0 +1,83 @@
+import os
+import re
+import time
+import pickle
+import hashlib
+
+CACHE_DIR = "../data/cache"
+
+
+def _cache_path(namespace, key):
+    """Returns the file path of a cache entry."""
+    safe_key = re.sub(r"[^A-Za-z0-9_.-]", "_", str(key))
+    return os.path.join(CACHE_DIR, namespace, f"{safe_key}.pkl")
+
+
+def digest(value):
+    """Returns a content hash of a picklable value."""
+    return hashlib.sha256(pickle.dumps(value)).hexdigest()
+
+
+def load_entry(namespace, key):
+    """Loads a raw cache entry (value, digest, fetched_at, checked_at) or None if missing."""
+    file_path = _cache_path(namespace, key)
+    if not os.path.exists(file_path):
+        return None
+    try:
+        with open(file_path, "rb") as f:
+            return pickle.load(f)
+    except Exception as e:
+        print(f"Ignoring unreadable cache entry {file_path}: {e}")
+        return None
+
+
+def is_fresh(entry, ttl, now=None):
+    """
+    Checks whether an entry is still valid.
+
+    - `ttl`: Time to live in seconds; None means the entry never expires.
+    """
+    if entry is None:
+        return False
+    if ttl is None:
+        return True
+    now = time.time() if now is None else now
+    return now - entry["checked_at"] < ttl
+
+
+def store(namespace, key, value, previous=None):
+    """
+    Saves a value and returns (entry, changed).
+
+    When the value is identical to `previous` (a conditional refresh) the original fetch time
+    is kept and only the check time is updated, so callers can skip rewriting derived files.
+    """
+    file_path = _cache_path(namespace, key)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+    now = time.time()
+    value_digest = digest(value)
+    changed = previous is None or previous["digest"] != value_digest
+    entry = {
+        "value": value,
+        "digest": value_digest,
+        "fetched_at": now if changed else previous["fetched_at"],
+        "checked_at": now,
+    }
+
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(entry, f)
+    os.replace(tmp_path, file_path)
+    return entry, changed
+
+
+def clear(namespace=None):
+    """Removes all cache entries (of one namespace if given)."""
+    folder = os.path.join(CACHE_DIR, namespace) if namespace else CACHE_DIR
+    if not os.path.isdir(folder):
+        return
+    for root, _, files in os.walk(folder):
+        for file_name in files:
+            if file_name.endswith(".pkl"):
+                os.remove(os.path.join(root, file_name))
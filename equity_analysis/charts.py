@@ -3,9 +3,9 @@ import mplfinance as mpf
 import pandas as pd
 import matplotlib.dates as mdates
 import os
+from equity_analysis import bar_store
 
 save_dir = "../data/plots"
-raw_data_dir = "../data/raw_data"
 
 def candlestick_chart(data, title="Candlestick Chart"):
     """Displays a candlestick chart and saves it to a file."""
@@ -59,11 +59,11 @@ def generate_charts(ticker_name):
     """Generates candlestick and line charts for different time intervals."""
     timeframes = (" 15-Minute", " Hourly", " Daily", " Weekly", " Monthly")
     chart_types = (" Candlestick Chart", " Line Chart")
-    data_15m = pd.read_csv("../data/raw_data/data_15m.csv")
-    data_1h = pd.read_csv("../data/raw_data/data_1h.csv")
-    data_1d = pd.read_csv("../data/raw_data/data_1d.csv")
-    data_1w = pd.read_csv("../data/raw_data/data_1w.csv")
-    data_1m = pd.read_csv("../data/raw_data/data_1m.csv")
+    data_15m = bar_store.read_bars("data_15m")
+    data_1h = bar_store.read_bars("data_1h")
+    data_1d = bar_store.read_bars("data_1d")
+    data_1w = bar_store.read_bars("data_1w")
+    data_1m = bar_store.read_bars("data_1m")
     # Generate charts for all timeframes
     datasets = [data_15m, data_1h, data_1d, data_1w, data_1m]
 
@@ -79,11 +79,10 @@ def plot_indicators():
     """Generates separate line charts for each indicator with price (Close) for reference."""
     save_dir = "../data/plots_indicators"
     for timeframe in timeframes:
-        filename = f"data_{timeframe}.csv"
-        filepath = os.path.join(raw_data_dir, filename)
+        filename = f"data_{timeframe}"
 
-        if os.path.exists(filepath):
-            data = pd.read_csv(filepath)
+        if bar_store.has_bars(filename):
+            data = bar_store.read_bars(filename)
 
             # Ensure 'Date' column exists and is formatted correctly
             if "Date" in data.columns:
@@ -136,4 +135,4 @@ def plot_indicators():
                 print(f"Chart saved: {save_path}")
 
         else:
-            print(f"File not found: {filepath}")
+            print(f"Dataset not found: {filename}")
@@ -1,8 +1,13 @@
 import yfinance as yf
 from datetime import datetime, timedelta
+import numpy as np
 import pandas as pd
 import re
 import os
+import threading
+from functools import partial
+from equity_analysis import bar_store, cache, fetch, resample
+from equity_analysis.alignment import CalendarIndex
 
 
 def get_date(days_ago):
@@ -12,6 +17,25 @@ def get_date(days_ago):
 save_dir = "../data/financial_data"
 today = get_date(0)
 
+HOUR = 3600
+DAY = 24 * HOUR
+
+# yfinance property and cache time to live (seconds, None = never expires) of each section
+FUNDAMENTAL_SECTIONS = {
+    "isin": ("isin", None),
+    "info": ("info", HOUR),
+    "calendar": ("calendar", DAY),
+    "dividends": ("dividends", DAY),
+    "financial": ("financials", DAY),
+    "splits": ("splits", DAY),
+    "capital_gains": ("capital_gains", DAY),
+    "balance_sheets": ("balance_sheet", DAY),
+    "cashflow": ("cashflow", DAY),
+    "analysis": ("analyst_price_targets", HOUR),
+    "income": ("income_stmt", DAY),
+    "quarterly_income": ("quarterly_income_stmt", DAY),
+}
+
 
 def extract_timezone(datetime_str):
     """Extracts the timezone offset from a datetime string (e.g., '+04:00' or '-04:00')."""
@@ -19,31 +43,77 @@ def extract_timezone(datetime_str):
     return match.group(1) if match else None
 
 
-def basic_analysis(ticker):
-    """Fetches fundamental data for the given stock ticker."""
-    ticker = yf.Ticker(ticker)
-    return {
-        "isin": ticker.isin,
-        "info": ticker.info,
-        "calendar": ticker.calendar,
-        "dividends": ticker.dividends,
-        "financial": ticker.financials,
-        "splits": ticker.splits,
-        "capital_gains": ticker.capital_gains,
-        "balance_sheets": ticker.balance_sheet,
-        "cashflow": ticker.cashflow,
-        "analysis": ticker.analyst_price_targets,
-        "income": ticker.income_stmt,
-        "quarterly_income": ticker.quarterly_income_stmt
-    }
+# yfinance Ticker objects are not thread-safe: every worker thread builds its own
+_worker_tickers = threading.local()
+
 
+def _fetch_section(ticker_symbol, attribute):
+    """Reads one yfinance Ticker property (through the worker's own Ticker) under the shared Yahoo rate limit."""
+    tickers = _worker_tickers.__dict__.setdefault("tickers", {})
+    if ticker_symbol not in tickers:
+        tickers[ticker_symbol] = yf.Ticker(ticker_symbol)
+    fetch.get_rate_limiter(fetch.YFinanceProvider.host, fetch.YFinanceProvider.rate).acquire()
+    return getattr(tickers[ticker_symbol], attribute)
 
-def request_fin_data(ticker_symbol):
-    """Fetches fundamental data and saves each section to a CSV file."""
-    data = basic_analysis(ticker_symbol)
+
+def cached_analysis(ticker_symbol, refresh=False, max_workers=fetch.MAX_WORKERS):
+    """
+    Fetches fundamental data through the on-disk cache.
+
+    Sections whose cache entry is still within its time to live (see FUNDAMENTAL_SECTIONS) are
+    served from disk; the others are fetched concurrently. Yahoo offers no conditional requests,
+    so refreshing a section is a full re-fetch whose content digest is compared with the cached
+    one: a section that did not change keeps its original fetch time. If a fetch fails, the stale
+    cached value is used; a failed section without cache entry is reported as missing.
+
+    Returns (data, changed, missing): the section values, the set of sections whose content
+    changed and a dictionary of missing section to the error of its fetch.
+    """
+    namespace = f"fundamentals/{ticker_symbol}"
+    entries = {key: cache.load_entry(namespace, key) for key in FUNDAMENTAL_SECTIONS}
+    stale = [key for key, (_, ttl) in FUNDAMENTAL_SECTIONS.items()
+             if refresh or not cache.is_fresh(entries[key], ttl)]
+
+    results, failures = {}, {}
+    if stale:
+        tasks = {key: partial(_fetch_section, ticker_symbol, FUNDAMENTAL_SECTIONS[key][0]) for key in stale}
+        results, failures = fetch.run_parallel(tasks, max_workers=max_workers)
+
+    data, changed, missing = {}, set(), {}
+    for key in FUNDAMENTAL_SECTIONS:
+        if key in results:
+            entries[key], section_changed = cache.store(namespace, key, results[key], previous=entries[key])
+            if section_changed:
+                changed.add(key)
+        elif key in failures and entries[key] is not None:
+            print(f"⚠️ Warning: using cached {key} for {ticker_symbol}, refresh failed.")
+        elif key in failures:
+            missing[key] = failures[key]
+            print(f"⚠️ Warning: {key} for {ticker_symbol} is missing, fetch failed and nothing is cached.")
+        if entries[key] is not None:
+            data[key] = entries[key]["value"]
+
+    return data, changed, missing
+
+
+def basic_analysis(ticker, refresh=False):
+    """Fetches fundamental data for the given stock ticker (served from the cache when fresh)."""
+    data, _, _ = cached_analysis(ticker, refresh=refresh)
+    return data
+
+
+def request_fin_data(ticker_symbol, refresh=False):
+    """
+    Fetches fundamental data and saves each section to a CSV file.
+    Files of sections that are unchanged since the last run are not rewritten; sections that
+    could not be fetched are listed at the end.
+    """
+    data, changed, missing = cached_analysis(ticker_symbol, refresh=refresh)
 
     for key, value in data.items():
         file_path = os.path.join(save_dir, f"{ticker_symbol}_{key}.csv")
+        if key not in changed and os.path.exists(file_path):
+            continue
 
         if isinstance(value, pd.DataFrame):
             # Save DataFrame directly
@@ -63,23 +133,12 @@ def request_fin_data(ticker_symbol):
 
         print(f"Saved {key} to {file_path}")
 
+    if missing:
+        print(f"⚠️ Warning: no data for {', '.join(missing)} of {ticker_symbol}.")
 
-def request_data(ticker, interval, start_days, end_days=0, save=False, filename=None):
-    """
-    Fetches historical stock data for a given ticker, time interval, and date range.
-
-    - `ticker`: Stock ticker symbol.
-    - `interval`: Time interval ('15m', '1h', '1d', etc.).
-    - `start_days`: Number of days ago for the start date.
-    - `end_days`: Number of days ago for the end date (default: 0 for today).
-    - `save`: Whether to save the data as a CSV file.
-    - `filename`: Name of the CSV file (if `save` is True).
-    """
-    ticker = yf.Ticker(ticker)
-    start = get_date(start_days)
-    end = get_date(end_days)
-    data = ticker.history(interval=interval, start=start, end=end)
 
+def prepare_history(data):
+    """Moves the date index of a yfinance history frame into a timezone-naive 'Date' column."""
     # Reset index to move Date to a separate column (if it's set as index)
     data.reset_index(inplace=True)
 
@@ -99,35 +158,256 @@ def request_data(ticker, interval, start_days, end_days=0, save=False, filename=
     # Remove timezone from the Date column
     data['Date'] = data['Date'].dt.tz_localize(None)
 
-    # Optionally save the data to a CSV file
-    if save and filename:
-        data.to_csv(f"../data/raw_data/{filename}", index=False)
+    return data
+
+
+def stored_last_date(name, ticker, interval):
+    """
+    Returns the timestamp of the last stored bar of a dataset, or None if there is no
+    stored data for the same ticker and interval.
+    """
+    if not bar_store.has_bars(name):
+        return None
+    meta = bar_store.read_meta(name)
+    if meta.get("ticker") != ticker or meta.get("interval") != interval or not meta.get("length"):
+        return None
+    dates = bar_store.open_bars(name, columns=["Date"])["Date"]
+    return pd.Timestamp(int(dates[-1]))
+
+
+def request_data(ticker, interval, start_days, end_days=0, save=False, filename=None, export_csv=False,
+                 incremental=False, provider=None):
+    """
+    Fetches historical stock data for a given ticker, time interval, and date range.
+
+    - `ticker`: Stock ticker symbol.
+    - `interval`: Time interval ('15m', '1h', '1d', etc.).
+    - `start_days`: Number of days ago for the start date.
+    - `end_days`: Number of days ago for the end date (default: 0 for today).
+    - `save`: Whether to save the data to the bar store.
+    - `filename`: Dataset name (e.g. 'data_1d.csv' is stored as 'data_1d') if `save` is True.
+    - `export_csv`: Whether to also write the data as a CSV file to ../data/raw_data.
+    - `incremental`: If True and the ticker/interval is already stored, only bars from the
+      last stored timestamp onwards are downloaded and appended (the overlapping last bar is
+      replaced by its fresh version). Returns the full stored dataset in that case.
+    - `provider`: Data provider (default: yfinance, see `fetch.set_default_provider`).
+    """
+    symbol = ticker
+    name = os.path.splitext(filename)[0] if filename else None
+    start = get_date(start_days)
+    end = get_date(end_days)
+
+    last_date = stored_last_date(name, symbol, interval) if incremental and save and name else None
+    if last_date is not None:
+        start = last_date.strftime('%Y-%m-%d')
+        if start >= end:
+            print(f"{symbol} {interval}: bar store is up to date, 0 bars added")
+            return bar_store.read_bars(name)
+
+    data = fetch.fetch_history(symbol, interval, start, end, provider=provider, allow_empty=last_date is not None)
+    if data.empty and last_date is not None:
+        print(f"{symbol} {interval}: no new data returned, 0 bars added")
+        return bar_store.read_bars(name)
+    data = prepare_history(data)
+
+    # Optionally save the data to the bar store (and export it as CSV)
+    if save and name:
+        if last_date is not None:
+            added = bar_store.append_bars(data, name)
+            print(f"{symbol} {interval}: {added} bars added to {name}")
+            data = bar_store.read_bars(name)
+        else:
+            bar_store.write_bars(data, name, ticker=symbol, interval=interval)
+        if export_csv:
+            data.to_csv(f"../data/raw_data/{filename}", index=False)
 
     return data
 
 
-def request_all_ticker_data(ticker):
+# Timeframes derived locally with `request_all_ticker_data(..., local_resample=True)`. The base
+# series are fetched into their own datasets with the longest window needed, so data_15m and
+# data_1d keep their usual 7 and 180 day windows:
+# base dataset: (interval, start_days)
+BASE_TIMEFRAMES = {
+    "base_15m": ("15m", 14),  # the 14 days of hourly bars
+    "base_1d": ("1d", 1095),  # the 3 years of monthly bars
+}
+# dataset: (interval, base dataset, start_days); start_days is None for aggregated bars
+RESAMPLED_TIMEFRAMES = {
+    "data_15m": ("15m", "base_15m", 7),
+    "data_1h": ("1h", "base_15m", None),
+    "data_1d": ("1d", "base_1d", 180),
+    "data_1w": ("1wk", "base_1d", None),
+    "data_1m": ("1mo", "base_1d", None),
+}
+
+
+def _window_dataset(base_name, name, interval, start_days, incremental=False):
+    """
+    Copies the last `start_days` days of a base dataset into `name` (e.g. 180 days of base_1d
+    into data_1d). An existing window of the same ticker keeps its start and only receives
+    the new bars, as with incremental downloads. Returns the number of bars written.
     """
-    Fetches stock data for multiple timeframes and saves them as CSV files.
+    ticker = bar_store.read_meta(base_name).get("ticker")
+    base_dates = bar_store.open_bars(base_name, ["Date"])["Date"]
+    last_date = stored_last_date(name, ticker, interval) if incremental else None
+    if last_date is not None:
+        start = last_date
+    else:
+        # The window ends with the base series, which was just fetched up to today
+        start = pd.Timestamp(int(base_dates[-1])).normalize() - pd.Timedelta(days=start_days)
+    data = bar_store.read_bars(base_name, start=int(np.searchsorted(base_dates, start.value, side="left")))
+    if last_date is not None:
+        return bar_store.append_bars(data, name)
+    bar_store.write_bars(data, name, ticker=ticker, interval=interval)
+    return len(data)
+
+
+def _resampled_timeframes(ticker, export_csv=False, incremental=False, provider=None,
+                          max_workers=fetch.MAX_WORKERS):
+    """Fetches the 15m and 1d base series and derives all five timeframes from them."""
+    request = partial(request_data, ticker, save=True, incremental=incremental, provider=provider)
+    tasks = {name: partial(request, interval, start_days=start_days, filename=f"{name}.csv")
+             for name, (interval, start_days) in BASE_TIMEFRAMES.items()}
+    results, failures = fetch.run_parallel(tasks, max_workers=max_workers)
+
+    for name, (interval, base_name, start_days) in RESAMPLED_TIMEFRAMES.items():
+        if base_name not in results:
+            continue
+        if start_days is not None:
+            added = _window_dataset(base_name, name, interval, start_days, incremental)
+            print(f"{ticker} {interval}: {added} bars written to {name} (from {base_name})")
+        elif incremental:
+            added = resample.update_resampled(base_name, name, interval)
+            print(f"{ticker} {interval}: {added} bars added to {name} (resampled from {base_name})")
+        else:
+            resample.resample_dataset(base_name, name, interval)
+        results[name] = bar_store.read_bars(name)
+        if export_csv:
+            bar_store.export_csv(name)
+
+    return tuple(results.get(name) for name in ("data_15m", "data_1h", "data_1d", "data_1w", "data_1m"))
+
+
+def request_all_ticker_data(ticker, export_csv=False, incremental=False, provider=None, max_workers=fetch.MAX_WORKERS,
+                            local_resample=False):
+    """
+    Fetches stock data for multiple timeframes concurrently and saves them to the bar store.
+    With `incremental=True` only bars newer than the stored ones are downloaded.
+    A timeframe that fails after all retries is reported and returned as None.
+    With `local_resample=True` only the 15-minute (14 days) and daily (3 years) bars are
+    downloaded, into the base_15m and base_1d datasets. The 15-minute and daily timeframes are
+    copied from their windows and the hourly, weekly and monthly bars are aggregated from
+    them locally (see `resample.py`).
 
     Returns data for:
     - 15-minute interval (7 days)
     - 1-hour interval (14 days)
     - 1-day interval (180 days)
-    - 1-week interval (2 years)
+    - 1-week interval (2 years, 3 years when resampling)
     - 1-month interval (3 years)
     """
-    data_15m = request_data(ticker, "15m", start_days=7, save=True, filename="data_15m.csv")
-    data_1h = request_data(ticker, "1h", start_days=14, save=True, filename="data_1h.csv")
-    data_1d = request_data(ticker, "1d", start_days=180, save=True, filename="data_1d.csv")
-    data_1w = request_data(ticker, "1wk", start_days=730, save=True, filename="data_1w.csv")  # 2 years
-    data_1m = request_data(ticker, "1mo", start_days=1095, save=True, filename="data_1m.csv")  # 3 years
+    if local_resample:
+        return _resampled_timeframes(ticker, export_csv=export_csv, incremental=incremental, provider=provider,
+                                     max_workers=max_workers)
+
+    request = partial(request_data, ticker, save=True, export_csv=export_csv, incremental=incremental,
+                      provider=provider)
+    tasks = {
+        "15m": partial(request, "15m", start_days=7, filename="data_15m.csv"),
+        "1h": partial(request, "1h", start_days=14, filename="data_1h.csv"),
+        "1d": partial(request, "1d", start_days=180, filename="data_1d.csv"),
+        "1wk": partial(request, "1wk", start_days=730, filename="data_1w.csv"),  # 2 years
+        "1mo": partial(request, "1mo", start_days=1095, filename="data_1m.csv"),  # 3 years
+    }
+    results, failures = fetch.run_parallel(tasks, max_workers=max_workers)
+
+    return tuple(results.get(interval) for interval in tasks)
 
-    return data_15m, data_1h, data_1d, data_1w, data_1m
 
+UNIVERSE_TIMEFRAMES = {
+    # interval: (start_days, dataset suffix), same windows as request_all_ticker_data
+    "15m": (7, "15m"),
+    "1h": (14, "1h"),
+    "1d": (180, "1d"),
+    "1wk": (730, "1w"),
+    "1mo": (1095, "1m"),
+}
+PANEL_FIELDS = ["Open", "High", "Low", "Close", "Volume", "Dividends", "Stock Splits"]
 
-def request_indices():
-    """Fetches historical stock prices for major indices and saves them as CSV files."""
+
+def build_panel(frames, fields=PANEL_FIELDS):
+    """
+    Aligns per-ticker bar frames (as returned by `prepare_history`) on the union of their dates.
+
+    Returns (dates, fields): the common time axis and a dictionary of field name to a
+    (tickers x time) float array with NaN where a ticker has no bar.
+    """
+    calendar = CalendarIndex({symbol: frame["Date"].values for symbol, frame in frames.items()})
+    panel = {field: np.full((len(frames), len(calendar)), np.nan) for field in fields}
+
+    for row, (symbol, frame) in enumerate(frames.items()):
+        for field in fields:
+            if field in frame.columns:
+                panel[field][row] = calendar.align(symbol, frame[field].values, method="exact")
+
+    return calendar.datetime_index(), panel
+
+
+def request_universe_data(tickers, batch_size=100, provider=None, max_workers=fetch.MAX_WORKERS):
+    """
+    Fetches bars for a list of tickers in batches and stores each timeframe as one panel.
+
+    - `tickers`: List of ticker symbols.
+    - `batch_size`: Number of tickers per download request.
+
+    Every timeframe of UNIVERSE_TIMEFRAMES is saved as a (tickers x time) panel named
+    'universe_{suffix}' (e.g. 'universe_1d', see `bar_store.open_panel`). Tickers without
+    data are reported and left out. Returns a dictionary of interval to the stored tickers.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    batches = [tickers[i:i + batch_size] for i in range(0, len(tickers), batch_size)]
+    end = get_date(0)
+    stored = {}
+
+    for interval, (start_days, suffix) in UNIVERSE_TIMEFRAMES.items():
+        start = get_date(start_days)
+        tasks = {i: partial(fetch.fetch_batch, batch, interval, start, end, provider=provider)
+                 for i, batch in enumerate(batches)}
+        results, failures = fetch.run_parallel(tasks, max_workers=max_workers)
+
+        frames, timezones = {}, {}
+        for i in sorted(results):
+            for symbol, bars in results[i].items():
+                bars = prepare_history(bars)
+                timezones[symbol] = str(bars["Timezone"].iloc[-1]) if bars["Timezone"].notna().any() else None
+                frames[symbol] = bars
+
+        missing = [symbol for symbol in tickers if symbol not in frames]
+        if missing:
+            print(f"⚠️ Warning: no {interval} data for {len(missing)} tickers: {', '.join(missing[:20])}"
+                  f"{'...' if len(missing) > 20 else ''}")
+        if not frames:
+            continue
+
+        # Keep the requested ticker order
+        frames = {symbol: frames[symbol] for symbol in tickers if symbol in frames}
+        dates, fields = build_panel(frames)
+        bar_store.write_panel(f"universe_{suffix}", list(frames), dates, fields, interval=interval,
+                              timezones=timezones)
+        stored[interval] = list(frames)
+        print(f"Saved {interval} panel: {len(frames)} tickers x {len(dates)} bars")
+
+    return stored
+
+
+def request_indices(export_csv=False, incremental=False, provider=None, max_workers=fetch.MAX_WORKERS,
+                    include_ticker=True):
+    """
+    Fetches historical stock prices for major indices concurrently and saves them to the bar store.
+    Indices that fail after all retries are reported and left out of the merged table.
+    With `include_ticker` the Close of data_1d is merged in as the 'data_1d' column.
+    """
     indices = {
         "^GSPC": "SP500.csv",  # S&P 500
         "^IXIC": "NASDAQ.csv",  # NASDAQ Composite
@@ -142,27 +422,27 @@ def request_indices():
         "^BVSP": "Bovespa.csv",  # Brazil Bovespa
     }
 
-    all_data = []
+    print(f"Fetching data for {', '.join(indices)}...")
+    tasks = {ticker: partial(request_data, ticker, "1d", start_days=180, save=True, filename=filename,
+                             export_csv=export_csv, incremental=incremental, provider=provider)
+             for ticker, filename in indices.items()}
+    results, failures = fetch.run_parallel(tasks, max_workers=max_workers)
+    if failures:
+        print(f"⚠️ Warning: {', '.join(failures)} could not be fetched and are excluded from the merge.")
 
-    for ticker, filename in indices.items():
-        print(f"Fetching data for {ticker}...")
-        data = request_data(ticker, "1d", start_days=180, save=True, filename=filename)
-        if data is not None:
-            data = data[['Date', 'Close']]
-            data.rename(columns={'Close': ticker}, inplace=True)
-            all_data.append(data)
+    closes = {ticker: data['Close'].values for ticker, data in results.items()}
+    calendar = CalendarIndex({ticker: data['Date'].values for ticker, data in results.items()})
 
-    # Merge all index data on the Date column
-    if all_data:
-        merged_df = all_data[0]
-        for df in all_data[1:]:
-            merged_df = pd.merge(merged_df, df, on='Date', how='inner')
+    # Add data_1d to the calendar
+    if results and include_ticker:
+        data_1d = bar_store.open_bars("data_1d", columns=['Date', 'Close'])
+        closes['data_1d'] = data_1d['Close']
+        calendar.add('data_1d', data_1d['Date'])
 
-        # Load data_1d.csv and merge
-        data_1d = pd.read_csv("../data/raw_data/data_1d.csv", parse_dates=["Date"])
-        data_1d = data_1d[['Date', 'Close']]
-        data_1d.rename(columns={'Close': 'data_1d'}, inplace=True)
-        merged_df = pd.merge(merged_df, data_1d, on='Date', how='inner')
+    # Align all series on the union of their trading days, carrying the last close over market
+    # holidays, starting from the first date on which every series has data
+    if closes:
+        merged_df = calendar.frame(closes, method="asof", start=calendar.first_common_position())
 
         # Save the merged dataframe
         merged_df.to_csv("../data/raw_data/merged_indices.csv", index=False)
@@ -170,8 +450,20 @@ def request_indices():
     print("All index data has been fetched, merged, and saved.")
 
 
-def all_data_request (ticker):
-    request_all_ticker_data(ticker)
-    request_indices()
+def all_data_request (ticker, export_csv=False, incremental=False, provider=None, batch_size=100,
+                      local_resample=False):
+    """
+    Fetches all price data for one ticker, or for a list of tickers (universe mode).
+    In universe mode every timeframe is stored as a ticker x time panel (see `request_universe_data`).
+    """
+    if isinstance(ticker, (list, tuple, set)):
+        request_universe_data(list(ticker), batch_size=batch_size, provider=provider)
+        request_indices(export_csv=export_csv, incremental=incremental, provider=provider, include_ticker=False)
+        print("All data has been fetched, merged, and saved.")
+        return
+
+    request_all_ticker_data(ticker, export_csv=export_csv, incremental=incremental, provider=provider,
+                            local_resample=local_resample)
+    request_indices(export_csv=export_csv, incremental=incremental, provider=provider)
     print("All data has been fetched, merged, and saved.")
 
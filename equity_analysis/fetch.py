@@ -0,0 +1,219 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import yfinance as yf
+
+MAX_WORKERS = 8
+REQUESTS_PER_SECOND = 4.0
+RETRIES = 3
+BACKOFF = 0.5
+
+HISTORY_COLUMNS = ["Open", "High", "Low", "Close", "Volume", "Dividends", "Stock Splits"]
+
+
+class YFinanceProvider:
+    """Downloads historical bars from Yahoo Finance."""
+    host = "query2.finance.yahoo.com"
+    rate = REQUESTS_PER_SECOND
+
+    def history(self, symbol, interval, start, end):
+        return yf.Ticker(symbol).history(interval=interval, start=start, end=end)
+
+    def history_many(self, symbols, interval, start, end):
+        """Downloads many symbols in one request and splits the result per symbol."""
+        data = yf.download(list(symbols), interval=interval, start=start, end=end, group_by="ticker",
+                           auto_adjust=True, actions=True, threads=False, progress=False)
+        if not isinstance(data.columns, pd.MultiIndex):
+            return {symbols[0]: data}
+        available = set(data.columns.get_level_values(0))
+        return {symbol: data[symbol].dropna(how="all") for symbol in symbols if symbol in available}
+
+
+class FileProvider:
+    """
+    Offline stand-in for yfinance that serves bars from CSV files (e.g. data/raw_data).
+
+    - `directory`: Folder holding the CSV files.
+    - `files`: Optional mapping of (symbol, interval) or symbol to a file name. Without an
+      entry '{symbol}_{interval}.csv' and then '{symbol}.csv' are tried.
+    - `latency`: Artificial delay in seconds per request, to emulate network round-trips.
+    - `as_of`: Date that plays the role of today, so windows relative to today (e.g.
+      `start_days=180`) map onto the stored history.
+
+    Returned frames look like yfinance output: a timezone-aware 'Date' index (or 'Datetime'
+    for intraday intervals) and the OHLCV columns, limited to the [start, end) range.
+    """
+    host = "local"
+    rate = None
+
+    def __init__(self, directory, files=None, latency=0.0, as_of=None):
+        self.directory = directory
+        self.files = files or {}
+        self.latency = latency
+        self.as_of = as_of
+
+    def _file_path(self, symbol, interval):
+        candidates = [self.files.get((symbol, interval)), self.files.get(symbol),
+                      f"{symbol}_{interval}.csv", f"{symbol}.csv"]
+        for file_name in candidates:
+            if file_name and os.path.exists(os.path.join(self.directory, file_name)):
+                return os.path.join(self.directory, file_name)
+        raise FileNotFoundError(f"No file for {symbol} ({interval}) found in {self.directory}")
+
+    def history(self, symbol, interval, start, end):
+        if self.latency:
+            time.sleep(self.latency)
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        if self.as_of is not None:
+            offset = pd.Timestamp(self.as_of).normalize() - pd.Timestamp.today().normalize()
+            start, end = start + offset, end + offset
+
+        data = pd.read_csv(self._file_path(symbol, interval), parse_dates=["Date"])
+        data = data[(data["Date"] >= start) & (data["Date"] < end)]
+
+        timezone = data["Timezone"].dropna().iloc[-1] if "Timezone" in data and data["Timezone"].notna().any() else None
+        dates = data["Date"].dt.tz_localize(timezone) if timezone else data["Date"]
+        index_name = "Datetime" if interval.endswith(("m", "h")) and interval != "1mo" else "Date"
+
+        columns = [column for column in HISTORY_COLUMNS if column in data.columns]
+        history = data[columns].copy()
+        history.index = pd.DatetimeIndex(dates, name=index_name)
+        return history
+
+
+def history_many(provider, symbols, interval, start, end):
+    """
+    Fetches several symbols with one call if the provider supports it, otherwise one by one.
+    In the one-by-one case a failing symbol is skipped instead of failing the whole batch.
+    """
+    if hasattr(provider, "history_many"):
+        return provider.history_many(symbols, interval, start, end)
+
+    data = {}
+    for symbol in symbols:
+        try:
+            data[symbol] = provider.history(symbol, interval, start, end)
+        except Exception as e:
+            print(f"Skipping {symbol} ({interval}): {e}")
+    return data
+
+
+class RateLimiter:
+    """Thread-safe limiter that spaces requests to one host at least 1 / rate seconds apart."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.next_time = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            wait = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+_default_provider = None
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_provider(provider=None):
+    """Returns the given provider or the default one (yfinance unless changed)."""
+    global _default_provider
+    if provider is not None:
+        return provider
+    if _default_provider is None:
+        _default_provider = YFinanceProvider()
+    return _default_provider
+
+
+def set_default_provider(provider):
+    """Replaces the provider used when none is passed (e.g. a FileProvider for offline runs)."""
+    global _default_provider
+    _default_provider = provider
+
+
+def get_rate_limiter(host, rate=REQUESTS_PER_SECOND):
+    """Returns the shared rate limiter of a host (`rate` of None means unlimited)."""
+    with _rate_limiters_lock:
+        if host not in _rate_limiters:
+            _rate_limiters[host] = RateLimiter(rate)
+        return _rate_limiters[host]
+
+
+def fetch_history(symbol, interval, start, end, provider=None, retries=RETRIES, backoff=BACKOFF,
+                  allow_empty=False):
+    """
+    Fetches bars through a provider with per-host rate limiting and retry with exponential backoff.
+
+    An empty result counts as a failed attempt unless `allow_empty` is True.
+    """
+    provider = get_provider(provider)
+    limiter = get_rate_limiter(getattr(provider, "host", type(provider).__name__),
+                               getattr(provider, "rate", REQUESTS_PER_SECOND))
+
+    for attempt in range(retries + 1):
+        try:
+            limiter.acquire()
+            data = provider.history(symbol, interval, start, end)
+            if data is None or (data.empty and not allow_empty):
+                raise ValueError(f"No data returned for {symbol} ({interval})")
+            return data
+        except Exception as e:
+            if attempt == retries:
+                raise
+            delay = backoff * 2 ** attempt
+            print(f"Request for {symbol} ({interval}) failed: {e}. Retrying in {delay:.1f}s...")
+            time.sleep(delay)
+
+
+def fetch_batch(symbols, interval, start, end, provider=None, retries=RETRIES, backoff=BACKOFF):
+    """
+    Fetches a batch of symbols in one rate-limited request, with retry and exponential backoff.
+
+    Returns a dictionary of symbol to bars; symbols without data are left out.
+    """
+    provider = get_provider(provider)
+    limiter = get_rate_limiter(getattr(provider, "host", type(provider).__name__),
+                               getattr(provider, "rate", REQUESTS_PER_SECOND))
+
+    for attempt in range(retries + 1):
+        try:
+            limiter.acquire()
+            data = history_many(provider, symbols, interval, start, end)
+            data = {symbol: bars for symbol, bars in data.items() if bars is not None and not bars.empty}
+            if not data:
+                raise ValueError(f"No data returned for batch {symbols[0]}..{symbols[-1]} ({interval})")
+            return data
+        except Exception as e:
+            if attempt == retries:
+                raise
+            delay = backoff * 2 ** attempt
+            print(f"Batch request ({interval}) failed: {e}. Retrying in {delay:.1f}s...")
+            time.sleep(delay)
+
+
+def run_parallel(tasks, max_workers=MAX_WORKERS):
+    """
+    Runs independent tasks on a bounded thread pool with per-task failure isolation.
+
+    - `tasks`: Mapping of key to a zero-argument callable.
+
+    Returns (results, failures): dictionaries of key to result and key to exception.
+    Results keep the order of `tasks`.
+    """
+    results, failures = {}, {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tasks)))) as executor:
+        futures = {key: executor.submit(task) for key, task in tasks.items()}
+        for key, future in futures.items():
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                failures[key] = e
+                print(f"Failed to fetch {key}: {e}")
+    return results, failures
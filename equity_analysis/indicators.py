@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+
+# Every indicator is a node that declares its inputs. Requested indicators are resolved into a
+# dependency graph and each node is computed once per series, so shared intermediates (price
+# differences, true range, EMAs, rolling means) are reused by every indicator that needs them.
+# The functions of analytics.py compute their indicators through this registry; kernels.py
+# (panels) and streaming.py (bar by bar) are the array and incremental versions of it.
+
+_REGISTRY = {}
+_FAMILIES = {}
+SOURCE_COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+
+
+def register_indicator(name, inputs, func):
+    """
+    Registers an indicator node.
+
+    - `name`: Node name (e.g. 'VWAP').
+    - `inputs`: Names of the nodes (or data columns) the indicator is computed from.
+    - `func`: Function called with the input Series in the same order.
+    """
+    _REGISTRY[name] = (list(inputs), func)
+
+
+def register_family(prefix, factory):
+    """
+    Registers a parameterized family of indicators named '{prefix}_{period}' (e.g. 'MA_50').
+
+    - `factory`: Function taking the integer period and returning (inputs, func).
+    """
+    _FAMILIES[prefix] = factory
+
+
+def resolve(name):
+    """Returns (inputs, func) of a node, or None for a data column."""
+    if name in _REGISTRY:
+        return _REGISTRY[name]
+    prefix, _, period = name.rpartition("_")
+    if prefix in _FAMILIES and period.isdigit():
+        return _FAMILIES[prefix](int(period))
+    if name in SOURCE_COLUMNS:
+        return None
+    raise KeyError(f"Unknown indicator: {name}")
+
+
+def dependency_order(names):
+    """Returns all nodes needed for `names` in dependency order (inputs before dependents)."""
+    order, state = [], {}
+
+    def visit(name):
+        if state.get(name) == "done":
+            return
+        if state.get(name) == "visiting":
+            raise ValueError(f"Circular indicator dependency at {name}")
+        state[name] = "visiting"
+        spec = resolve(name)
+        for dependency in (spec[0] if spec else []):
+            visit(dependency)
+        state[name] = "done"
+        order.append(name)
+
+    for name in names:
+        visit(name)
+    return order
+
+
+def compute_indicators(data, names, cache=None):
+    """
+    Computes the requested indicators for one series.
+
+    - `data`: DataFrame with the source columns (e.g. 'High', 'Low', 'Close').
+    - `names`: Indicator names (e.g. ['MA_50', 'RSI_14', 'MACD']).
+    - `cache`: Optional dictionary of already computed nodes for the same data; it is filled
+      in place so later calls can reuse the intermediates.
+
+    Returns a dictionary of indicator name to Series.
+    """
+    cache = {} if cache is None else cache
+    for name in dependency_order(names):
+        if name in cache:
+            continue
+        spec = resolve(name)
+        if spec is None:
+            cache[name] = data[name]
+        else:
+            inputs, func = spec
+            cache[name] = func(*(cache[dependency] for dependency in inputs))
+    return {name: cache[name] for name in names}
+
+
+# Shared intermediates
+register_indicator("prev_close", ["Close"], lambda close: close.shift())
+register_indicator("delta", ["Close"], lambda close: close.diff())
+register_indicator("gain", ["delta"], lambda delta: delta.where(delta > 0, 0))
+register_indicator("loss", ["delta"], lambda delta: -delta.where(delta < 0, 0))
+register_indicator("true_range", ["High", "Low", "prev_close"],
+                   lambda high, low, prev_close: pd.Series(
+                       np.maximum.reduce([high - low, np.abs(high - prev_close), np.abs(low - prev_close)]),
+                       index=high.index))
+
+def bollinger_band(ma, std, k):
+    """Bollinger Band k standard deviations from the moving average (negative k: lower band)."""
+    return ma + k * std
+
+
+# Indicator families (the functions of analytics.py compute them through this registry)
+register_family("MA", lambda period: (["Close"], lambda close: close.rolling(window=period).mean()))
+register_family("STD", lambda period: (["Close"], lambda close: close.rolling(window=period).std()))
+register_family("EMA", lambda period: (["Close"], lambda close: close.ewm(span=period, adjust=False).mean()))
+register_family("ATR", lambda period: (["true_range"], lambda tr: tr.rolling(window=period).mean()))
+register_family("avg_gain", lambda period: (["gain"], lambda gain: gain.rolling(window=period).mean()))
+register_family("avg_loss", lambda period: (["loss"], lambda loss: loss.rolling(window=period).mean()))
+register_family("RSI", lambda period: ([f"avg_gain_{period}", f"avg_loss_{period}"],
+                                       lambda gain, loss: 100 - (100 / (1 + gain / loss))))
+register_family("BB_Upper", lambda period: ([f"MA_{period}", f"STD_{period}"],
+                                            lambda ma, std: bollinger_band(ma, std, 2)))
+register_family("BB_Lower", lambda period: ([f"MA_{period}", f"STD_{period}"],
+                                            lambda ma, std: bollinger_band(ma, std, -2)))
+
+register_indicator("MACD", ["EMA_12", "EMA_26"], lambda ema12, ema26: ema12 - ema26)
+register_indicator("Signal_Line", ["MACD"], lambda macd_line: macd_line.ewm(span=9, adjust=False).mean())
+
+STANDARD_INDICATORS = ["MA_50", "ATR_14", "RSI_14", "EMA_12", "EMA_26", "MACD", "Signal_Line"]
@@ -0,0 +1,221 @@
+import numpy as np
+from scipy.signal import lfilter
+from equity_analysis import bar_store
+
+# All kernels take (tickers x time) float arrays and work along the time axis (axis 1).
+# NaN handling follows the pandas versions in analytics.py: a rolling window containing a
+# NaN gives NaN, and the EMA carries its value over missing bars.
+
+
+def _as_2d(values):
+    """Converts the input to a float64 (tickers x time) array."""
+    values = np.asarray(values, dtype=np.float64)
+    return values[np.newaxis, :] if values.ndim == 1 else values
+
+
+def shift(values, periods=1):
+    """Shifts every row forward in time by `periods` bars, filling with NaN."""
+    values = _as_2d(values)
+    shifted = np.full_like(values, np.nan)
+    if periods < values.shape[1]:
+        shifted[:, periods:] = values[:, :values.shape[1] - periods]
+    return shifted
+
+
+def rolling_sum(values, window):
+    """
+    Rolling sum over `window` bars using cumulative sums (NaN if the window has a NaN).
+
+    Every row is centered on its mean before the cumulative sum to keep rounding errors small
+    on long histories.
+    """
+    values = _as_2d(values)
+    rows, length = values.shape
+    result = np.full_like(values, np.nan)
+    if window > length:
+        return result
+
+    missing = np.isnan(values)
+    with np.errstate(invalid="ignore"):
+        offset = np.nanmean(np.where(missing.all(axis=1, keepdims=True), 0.0, values), axis=1, keepdims=True)
+    offset = np.nan_to_num(offset)
+    filled = np.where(missing, 0.0, values - offset)
+
+    sums = np.zeros((rows, length + 1))
+    np.cumsum(filled, axis=1, out=sums[:, 1:])
+    counts = np.zeros((rows, length + 1), dtype=np.int64)
+    np.cumsum(missing, axis=1, out=counts[:, 1:])
+
+    window_sums = sums[:, window:] - sums[:, :-window] + window * offset
+    window_missing = counts[:, window:] - counts[:, :-window]
+    result[:, window - 1:] = np.where(window_missing == 0, window_sums, np.nan)
+    return result
+
+
+def _window_count(mask, window):
+    """Number of True values of `mask` in each trailing window of `window` bars."""
+    counts = np.zeros((mask.shape[0], mask.shape[1] + 1), dtype=np.int64)
+    np.cumsum(mask, axis=1, out=counts[:, 1:])
+    result = np.zeros(mask.shape, dtype=np.int64)
+    result[:, window - 1:] = counts[:, window:] - counts[:, :-window]
+    return result
+
+
+def rolling_mean(values, window):
+    """
+    Rolling mean over `window` bars (see `rolling_sum`).
+
+    As in pandas, a window of identical values returns that value exactly and the sign of
+    the mean is kept consistent with the window (so e.g. a window of zeros gives exactly 0).
+    """
+    values = _as_2d(values)
+    result = rolling_sum(values, window) / window
+    if window > values.shape[1]:
+        return result
+
+    # Length of the run of identical values ending at every bar
+    positions = np.arange(values.shape[1])
+    run_start = np.ones(values.shape, dtype=bool)
+    run_start[:, 1:] = values[:, 1:] != values[:, :-1]
+    run_length = positions - np.maximum.accumulate(np.where(run_start, positions, 0), axis=1) + 1
+    result = np.where(run_length >= window, values, result)
+
+    negative = _window_count(np.signbit(values) & ~np.isnan(values), window)
+    result = np.where((negative == 0) & (result < 0), 0.0, result)
+    result = np.where((negative == window) & (result > 0), 0.0, result)
+    return result
+
+
+def rolling_std(values, window):
+    """Rolling sample standard deviation (ddof=1) over `window` bars."""
+    values = _as_2d(values)
+    mean = rolling_mean(values, window)
+    mean_of_squares = rolling_mean(values ** 2, window)
+    variance = (mean_of_squares - mean ** 2) * window / (window - 1)
+    return np.sqrt(np.maximum(variance, 0.0))
+
+
+def _ema_with_gaps(values, alpha):
+    """EMA stepped along time for all rows at once, decaying the weights over missing bars like pandas."""
+    result = np.empty_like(values)
+
+    weighted = values[:, 0].copy()
+    old_wt = np.ones(values.shape[0])
+    result[:, 0] = weighted
+    for t in range(1, values.shape[1]):
+        current = values[:, t]
+        observed = ~np.isnan(current)
+        started = ~np.isnan(weighted)
+
+        old_wt = np.where(started, old_wt * (1.0 - alpha), old_wt)
+        update = started & observed & (weighted != current)
+        blended = (old_wt * weighted + alpha * current) / (old_wt + alpha)
+        weighted = np.where(update, blended, weighted)
+        old_wt = np.where(started & observed, 1.0, old_wt)
+        # Rows without any observation so far start at their first value
+        weighted = np.where(~started & observed, current, weighted)
+        result[:, t] = weighted
+    return result
+
+
+def ema(values, span):
+    """
+    Exponential moving average with `adjust=False` for every row.
+
+    Rows without gaps are run through a first-order recursive filter (`scipy.signal.lfilter`);
+    rows with missing bars after their first observation fall back to a stepped recursion that
+    handles the gaps like pandas. Leading NaNs stay NaN until the first observation.
+    """
+    values = _as_2d(values)
+    alpha = 1.0 / (1.0 + (span - 1) / 2.0)
+    result = np.full_like(values, np.nan)
+    if values.shape[1] == 0:
+        return result
+
+    observed = ~np.isnan(values)
+    first = np.argmax(observed, axis=1)
+    started = np.arange(values.shape[1]) >= first[:, np.newaxis]
+    has_gaps = (started & ~observed).any(axis=1)
+    simple = observed.any(axis=1) & ~has_gaps
+
+    if simple.any():
+        rows = values[simple]
+        first_value = rows[np.arange(len(rows)), first[simple]]
+        # Leading NaNs take the first value, which leaves the EMA at that value until it starts
+        rows = np.where(np.isnan(rows), first_value[:, np.newaxis], rows)
+        initial = ((1.0 - alpha) * rows[:, 0])[:, np.newaxis]
+        filtered, _ = lfilter([alpha], [1.0, alpha - 1.0], rows, axis=1, zi=initial)
+        result[simple] = np.where(started[simple], filtered, np.nan)
+    if has_gaps.any():
+        result[has_gaps] = _ema_with_gaps(values[has_gaps], alpha)
+    return result
+
+
+def true_range(high, low, close):
+    """True range: max(high - low, |high - previous close|, |low - previous close|)."""
+    high, low, close = _as_2d(high), _as_2d(low), _as_2d(close)
+    previous_close = shift(close)
+    return np.maximum.reduce([high - low, np.abs(high - previous_close), np.abs(low - previous_close)])
+
+
+def average_true_range(high, low, close, period=14):
+    """Average True Range for every row."""
+    return rolling_mean(true_range(high, low, close), period)
+
+
+def relative_strength_index(close, period=14):
+    """Relative Strength Index for every row."""
+    close = _as_2d(close)
+    delta = close - shift(close)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        gain = rolling_mean(np.where(delta > 0, delta, 0.0), period)
+        loss = rolling_mean(-np.where(delta < 0, delta, 0.0), period)
+        rs = gain / loss
+        return 100 - (100 / (1 + rs))
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    """MACD line and signal line for every row."""
+    macd_line = ema(close, fast) - ema(close, slow)
+    return macd_line, ema(macd_line, signal)
+
+
+def bollinger_bands(close, period=20, k=2):
+    """Upper and lower Bollinger Bands for every row."""
+    ma = rolling_mean(close, period)
+    std_dev = rolling_std(close, period)
+    return ma + k * std_dev, ma - k * std_dev
+
+
+def compute_indicators(close, high=None, low=None):
+    """
+    Computes the indicator set of `analytics.add_analytics_to_df` for every row in one pass.
+
+    - `close`, `high`, `low`: (tickers x time) arrays. ATR_14 is only computed when `high`
+      and `low` are given.
+
+    Returns a dictionary of indicator name to a (tickers x time) array.
+    """
+    close = _as_2d(close)
+    ema_12 = ema(close, 12)
+    ema_26 = ema(close, 26)
+    macd_line = ema_12 - ema_26
+
+    indicators = {"MA_50": rolling_mean(close, 50)}
+    if high is not None and low is not None:
+        indicators["ATR_14"] = average_true_range(high, low, close, 14)
+    indicators["RSI_14"] = relative_strength_index(close, 14)
+    indicators["EMA_12"] = ema_12
+    indicators["EMA_26"] = ema_26
+    indicators["MACD"] = macd_line
+    indicators["Signal_Line"] = ema(macd_line, 9)
+    return indicators
+
+
+def add_panel_indicators(name):
+    """Computes the standard indicators for every ticker of a stored panel and saves them as panel fields."""
+    tickers, _, fields = bar_store.open_panel(name, ["High", "Low", "Close"])
+    indicators = compute_indicators(fields["Close"], fields["High"], fields["Low"])
+    bar_store.update_columns(name, indicators)
+    print(f"Analytics added: {name} ({len(tickers)} tickers)")
+    return indicators
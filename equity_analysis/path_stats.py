@@ -0,0 +1,528 @@
+import numpy as np
+import pandas as pd
+
+# Online accumulators fed with (days x paths) chunks of simulated prices. Each keeps a fixed
+# amount of state, independent of the number of paths, and two accumulators built over
+# different paths can be merged (e.g. results of several workers).
+
+
+class RunningMoments:
+    """Per-day count, mean and variance (Welford updates, Chan et al. merge)."""
+
+    def __init__(self, days):
+        self.count = 0
+        self.mean = np.zeros(days)
+        self.m2 = np.zeros(days)
+
+    def update(self, chunk):
+        chunk = np.asarray(chunk, dtype=np.float64)
+        n = chunk.shape[1]
+        if n == 0:
+            return self
+        chunk_mean = chunk.mean(axis=1)
+        chunk_m2 = ((chunk - chunk_mean[:, np.newaxis]) ** 2).sum(axis=1)
+        self._combine(n, chunk_mean, chunk_m2)
+        return self
+
+    def _combine(self, n, mean, m2):
+        if self.count == 0:
+            # Copy instead of combining, so merging into an empty accumulator is exact
+            self.count, self.mean, self.m2 = n, np.array(mean, dtype=np.float64), np.array(m2, dtype=np.float64)
+            return
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean = self.mean + delta * n / total
+        self.m2 = self.m2 + m2 + delta ** 2 * self.count * n / total
+        self.count = total
+
+    def merge(self, other):
+        if other.count:
+            self._combine(other.count, other.mean, other.m2)
+        return self
+
+    @property
+    def variance(self):
+        """Sample variance (ddof=1) per day."""
+        return self.m2 / (self.count - 1) if self.count > 1 else np.full_like(self.m2, np.nan)
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+
+class QuantileSketch:
+    """
+    Per-day histogram of positive values (prices) on log-spaced bins between `low` and `high`.
+
+    Quantiles are interpolated inside the bin, so the error is a fraction of the bin width
+    (about 0.1% of the price with the defaults). Values outside the range go to under- and
+    overflow bins, which are interpolated towards the exact per-day minimum and maximum.
+    """
+
+    def __init__(self, days, low, high, bins=4096):
+        self.days = days
+        self.bins = bins
+        self.log_low = np.log(low)
+        self.log_high = np.log(high)
+        self.width = (self.log_high - self.log_low) / bins
+        # Column 0 is the underflow bin and column bins + 1 the overflow bin
+        self.counts = np.zeros((days, bins + 2), dtype=np.int64)
+        self.minimum = np.full(days, np.inf)
+        self.maximum = np.full(days, -np.inf)
+
+    @classmethod
+    def for_paths(cls, S0, sigma, days, bins=4096, width=8.0):
+        """Creates a sketch covering +-`width` standard deviations of the final log price."""
+        spread = width * max(sigma, 1e-12) * np.sqrt(days)
+        return cls(days, S0 * np.exp(-spread), S0 * np.exp(spread), bins)
+
+    def update(self, chunk):
+        chunk = np.asarray(chunk, dtype=np.float64)
+        if chunk.shape[1] == 0:
+            return self
+        with np.errstate(divide="ignore"):
+            position = (np.log(chunk) - self.log_low) / self.width
+        index = np.clip(np.floor(position), -1, self.bins).astype(np.int64) + 1
+        flat = index + (self.bins + 2) * np.arange(self.days)[:, np.newaxis]
+        self.counts += np.bincount(flat.ravel(), minlength=self.counts.size).reshape(self.counts.shape)
+        self.minimum = np.minimum(self.minimum, chunk.min(axis=1))
+        self.maximum = np.maximum(self.maximum, chunk.max(axis=1))
+        return self
+
+    def merge(self, other):
+        if (other.bins, other.log_low, other.log_high) != (self.bins, self.log_low, self.log_high):
+            raise ValueError("Only sketches with the same bins can be merged")
+        self.counts += other.counts
+        self.minimum = np.minimum(self.minimum, other.minimum)
+        self.maximum = np.maximum(self.maximum, other.maximum)
+        return self
+
+    def quantile(self, q):
+        """Returns the `q` quantile (scalar or sequence) per day as a (days,) or (len(q), days) array."""
+        q = np.asarray(q, dtype=np.float64)
+        result = np.array([self._quantile(level) for level in np.atleast_1d(q)])
+        return result[0] if q.ndim == 0 else result
+
+    def _quantile(self, level):
+        total = self.counts.sum(axis=1)
+        cumulative = np.cumsum(self.counts, axis=1)
+        rank = level * total
+        column = np.minimum((cumulative < rank[:, np.newaxis]).sum(axis=1), self.bins + 1)
+        rows = np.arange(self.days)
+        below = np.where(column > 0, cumulative[rows, np.maximum(column - 1, 0)], 0)
+        inside = self.counts[rows, column]
+        fraction = np.where(inside > 0, (rank - below) / np.maximum(inside, 1), 0.0)
+
+        # Log-price edges of the bin, with the exact extremes for under- and overflow
+        lower = self.log_low + (column - 1) * self.width
+        upper = lower + self.width
+        with np.errstate(divide="ignore"):
+            lower = np.where(column == 0, np.log(self.minimum), lower)
+            upper = np.where(column == self.bins + 1, np.log(self.maximum), upper)
+        lower = np.maximum(lower, np.log(np.maximum(self.minimum, 1e-300)))
+        upper = np.minimum(upper, np.log(self.maximum))
+        value = np.exp(lower + fraction * (upper - lower))
+        return np.where(total > 0, value, np.nan)
+
+
+class TargetHits:
+    """
+    Number of paths that touch each target level at any point of the forecast.
+
+    Targets at or above `reference` count paths whose maximum reaches them (take-profit),
+    targets below count paths whose minimum falls to them (stop-loss).
+    """
+
+    def __init__(self, targets, reference):
+        self.targets = np.asarray(targets, dtype=np.float64)
+        self.reference = reference
+        self.count = 0
+        self.hits = np.zeros(len(self.targets), dtype=np.int64)
+
+    def update(self, chunk):
+        chunk = np.asarray(chunk)
+        up = self.targets >= self.reference
+        path_max = np.sort(chunk.max(axis=0))
+        path_min = np.sort(chunk.min(axis=0))
+        n = len(path_max)
+        self.hits[up] += n - np.searchsorted(path_max, self.targets[up], side="left")
+        self.hits[~up] += np.searchsorted(path_min, self.targets[~up], side="right")
+        self.count += n
+        return self
+
+    def merge(self, other):
+        self.hits += other.hits
+        self.count += other.count
+        return self
+
+    @property
+    def probability(self):
+        """Touch probability of every target in percent."""
+        return self.hits / self.count * 100 if self.count else np.full(len(self.targets), np.nan)
+
+
+def bridge_touch_probability(paths, target, S0, sigma, step=1.0, direction="up", chunk_size=20_000):
+    """
+    Per-path probability that the continuous price path touches `target`, not only at the
+    simulated steps. Between two steps the log price is a Brownian bridge, which crosses a
+    barrier at distance a and b from its end points with probability exp(-2ab / (sigma^2 * step)),
+    so coarse steps no longer underestimate touch probabilities.
+
+    - `paths`: (steps x simulations) array of simulated prices (may be memory-mapped).
+    - `S0`: Initial price (the start of the first step).
+    - `sigma`, `step`: Daily volatility of the log returns and days per simulated step.
+    - `direction`: 'up' for a target reached from below, 'down' for one reached from above.
+
+    Returns an array with one probability (0 to 1) per path; paths that touch the target at a
+    simulated step have probability 1.
+    """
+    if direction not in ("up", "down"):
+        raise ValueError("direction must be 'up' or 'down'")
+    log_target = np.log(target)
+    variance = sigma ** 2 * step
+    result = np.empty(paths.shape[1])
+    for start in range(0, paths.shape[1], chunk_size):
+        block = np.log(np.asarray(paths[:, start:start + chunk_size], dtype=np.float64))
+        log_prices = np.vstack([np.full((1, block.shape[1]), np.log(S0)), block])
+        # Distance to the target, positive while it has not been reached
+        distance = log_target - log_prices if direction == "up" else log_prices - log_target
+        distance = np.maximum(distance, 0.0)
+        crossing = np.exp(-2.0 * distance[:-1] * distance[1:] / variance)
+        with np.errstate(divide="ignore"):
+            log_miss = np.log1p(-crossing).sum(axis=0)
+        result[start:start + block.shape[1]] = -np.expm1(log_miss)
+    return result
+
+
+class ForecastResult:
+    """
+    In-memory forecast with the running maximum and minimum of every path sorted once, so
+    the probability of touching any target is a binary search instead of a scan of all paths.
+
+    - `paths`: (days x simulations) array of simulated prices.
+    - `S0`, `sigma`, `step`: Initial price, daily volatility and days per step of the model,
+      needed for the bridge-corrected `touch_probability`.
+    """
+
+    def __init__(self, paths, S0=None, sigma=None, step=1):
+        self.paths = np.asarray(paths, dtype=np.float64)
+        self.sorted_max = np.sort(self.paths.max(axis=0))
+        self.sorted_min = np.sort(self.paths.min(axis=0))
+        self.S0 = S0
+        self.sigma = sigma
+        self.step = step
+
+    @property
+    def simulations(self):
+        return self.paths.shape[1]
+
+    def probability_above(self, targets):
+        """Probability (%) that a path reaches or exceeds each target at any point."""
+        hits = self.simulations - np.searchsorted(self.sorted_max, targets, side="left")
+        return hits / self.simulations * 100
+
+    def probability_below(self, targets):
+        """Probability (%) that a path falls to or below each target at any point."""
+        hits = np.searchsorted(self.sorted_min, targets, side="right")
+        return hits / self.simulations * 100
+
+    def touch_probability(self, targets, direction="up"):
+        """
+        Probability (%) that a path touches each target between or at the simulated steps
+        (see `bridge_touch_probability`). Needs `S0` and `sigma`.
+        """
+        if self.S0 is None or self.sigma is None:
+            raise ValueError("The bridge correction needs the initial price and volatility of the model")
+        probabilities = [bridge_touch_probability(self.paths, target, self.S0, self.sigma, self.step, direction).mean()
+                         for target in np.atleast_1d(targets)]
+        probabilities = np.array(probabilities) * 100
+        return probabilities if np.ndim(targets) else probabilities[0]
+
+
+def final_price(chunk):
+    """Per-path statistic: the price on the last day."""
+    return chunk[-1]
+
+
+def target_touches(chunk, targets, reference, sigma=None, step=1):
+    """
+    Per-path statistic: 100 if the path touches the target, else 0 (one row per target).
+    Targets at or above `reference` are reached from below, the others from above.
+
+    - `sigma`, `step`: When given, the Brownian-bridge touch probability (0 to 100) of every
+      path is used instead (see `bridge_touch_probability`), with `reference` as the initial price.
+    """
+    if sigma is not None:
+        return np.array([bridge_touch_probability(chunk, target, reference, sigma, step,
+                                                  "up" if target >= reference else "down")
+                         for target in np.atleast_1d(targets)]) * 100.0
+    targets = np.asarray(targets, dtype=np.float64)[:, np.newaxis]
+    up = targets >= reference
+    touched = np.where(up, chunk.max(axis=0) >= targets, chunk.min(axis=0) <= targets)
+    return touched * 100.0
+
+
+class MeanEstimator:
+    """
+    Monte Carlo estimate of the expected value of per-path statistics with standard errors.
+
+    - `statistic`: Module-level function (or functools.partial) mapping a (days x paths)
+      chunk to (paths,) or (statistics x paths) values, e.g. `final_price`.
+    - `unit`: Independent sampling unit: 'path', 'pair' (antithetic pairs i and i + paths // 2)
+      or 'chunk' (one randomized quasi-Monte Carlo replicate per chunk).
+    - `control_mean`: Expected final price E[S_T] = S0 * exp(mu * days). When given, the final
+      price is used as a control variate with the optimal coefficient (not for `final_price`
+      itself, whose estimate would collapse to `control_mean` with no error).
+    """
+
+    def __init__(self, statistic, unit="path", control_mean=None):
+        self.statistic = statistic
+        self.unit = unit
+        self.control_mean = control_mean
+        self.n = 0
+        self.sums = None
+
+    def _units(self, values):
+        if self.unit == "pair":
+            half = values.shape[1] // 2
+            return (values[:, :half] + values[:, half:]) / 2
+        if self.unit == "chunk":
+            return values.mean(axis=1, keepdims=True)
+        return values
+
+    def update(self, chunk):
+        y = self._units(np.atleast_2d(np.asarray(self.statistic(chunk), dtype=np.float64)))
+        # Centered control, so the sums do not lose precision
+        x = self._units(np.asarray(chunk[-1:], dtype=np.float64) - (self.control_mean or 0.0))
+        sums = {"y": y.sum(axis=1), "yy": (y ** 2).sum(axis=1), "x": x.sum(), "xx": (x ** 2).sum(),
+                "xy": (x * y).sum(axis=1)}
+        self._add(y.shape[1], sums)
+        return self
+
+    def _add(self, n, sums):
+        if self.sums is None:
+            self.n, self.sums = n, sums
+        else:
+            self.n += n
+            self.sums = {key: self.sums[key] + value for key, value in sums.items()}
+
+    def merge(self, other):
+        if other.sums is not None:
+            self._add(other.n, other.sums)
+        return self
+
+    def result(self):
+        """Returns (estimate, std_error) arrays with one value per statistic."""
+        n = self.n
+        mean_y = self.sums["y"] / n
+        var_y = (self.sums["yy"] - n * mean_y ** 2) / (n - 1)
+        if self.control_mean is None:
+            return mean_y, np.sqrt(np.maximum(var_y, 0.0) / n)
+
+        mean_x = self.sums["x"] / n
+        var_x = (self.sums["xx"] - n * mean_x ** 2) / (n - 1)
+        cov_xy = (self.sums["xy"] - n * mean_x * mean_y) / (n - 1)
+        beta = cov_xy / var_x if var_x > 0 else np.zeros_like(cov_xy)
+        # The centered control has expectation 0
+        estimate = mean_y - beta * mean_x
+        residual_var = np.maximum(var_y - beta * cov_xy, 0.0)
+        return estimate, np.sqrt(residual_var / n)
+
+
+class BatchQuantiles:
+    """
+    Final-day quantiles computed per batch of paths; the mean over batches is the estimate and
+    their spread gives the standard error.
+
+    - `unit`: As in `MeanEstimator`. Chunks of 'path' and 'pair' units are split into `splits`
+      batches (keeping antithetic pairs together); a 'chunk' unit is one batch.
+    """
+
+    def __init__(self, levels, unit="path", splits=8):
+        self.levels = np.asarray(levels, dtype=np.float64)
+        self.unit = unit
+        self.splits = splits
+        self.batches = []
+
+    def update(self, chunk):
+        final = np.asarray(chunk[-1], dtype=np.float64)
+        if self.unit == "chunk":
+            groups = [np.arange(len(final))]
+        elif self.unit == "pair":
+            half = len(final) // 2
+            groups = [np.concatenate([g, g + half]) for g in np.array_split(np.arange(half), self.splits)]
+        else:
+            groups = np.array_split(np.arange(len(final)), self.splits)
+        self.batches += [np.quantile(final[group], self.levels) for group in groups if len(group)]
+        return self
+
+    def merge(self, other):
+        self.batches.extend(other.batches)
+        return self
+
+    def result(self):
+        """Returns (estimate, std_error) arrays with one value per quantile level."""
+        batches = np.array(self.batches)
+        if len(batches) < 2:
+            return batches.mean(axis=0), np.full(len(self.levels), np.nan)
+        return batches.mean(axis=0), batches.std(axis=0, ddof=1) / np.sqrt(len(batches))
+
+
+class _Histogram:
+    """
+    Histograms of several series on shared linear bins between `low` and `high`, with the
+    sum of the values per bin, so quantiles and tail means (CVaR) can be read back. Values
+    outside the range go to under- and overflow bins.
+    """
+
+    def __init__(self, series, low, high, bins=8192):
+        self.low, self.high, self.bins = low, high, bins
+        self.width = (high - low) / bins
+        self.counts = np.zeros((series, bins + 2), dtype=np.int64)
+        self.sums = np.zeros((series, bins + 2))
+
+    def add(self, values):
+        """Adds a (series x n) array of values."""
+        index = np.clip(np.floor((values - self.low) / self.width), -1, self.bins).astype(np.int64) + 1
+        flat = (index + (self.bins + 2) * np.arange(values.shape[0])[:, np.newaxis]).ravel()
+        self.counts += np.bincount(flat, minlength=self.counts.size).reshape(self.counts.shape)
+        self.sums += np.bincount(flat, weights=values.ravel(), minlength=self.sums.size).reshape(self.sums.shape)
+
+    def merge(self, other):
+        self.counts += other.counts
+        self.sums += other.sums
+
+    def quantile(self, level):
+        """Returns the `level` quantile of every series (interpolated inside the bin)."""
+        cumulative = np.cumsum(self.counts, axis=1)
+        rank = level * cumulative[:, -1]
+        column = np.minimum((cumulative < rank[:, np.newaxis]).sum(axis=1), self.bins + 1)
+        rows = np.arange(len(column))
+        below = np.where(column > 0, cumulative[rows, np.maximum(column - 1, 0)], 0)
+        inside = self.counts[rows, column]
+        fraction = np.where(inside > 0, (rank - below) / np.maximum(inside, 1), 0.0)
+        lower = self.low + (np.clip(column, 1, self.bins) - 1) * self.width
+        # Under- and overflow values are represented by their mean
+        overflow_mean = self.sums[rows, column] / np.maximum(inside, 1)
+        value = lower + np.clip(fraction, 0, 1) * self.width
+        return np.where((column == 0) | (column == self.bins + 1), overflow_mean, value)
+
+    def lower_tail_mean(self, level):
+        """Returns the mean of the lowest `level` fraction of values of every series."""
+        cumulative = np.cumsum(self.counts, axis=1)
+        rank = level * cumulative[:, -1]
+        column = np.minimum((cumulative < rank[:, np.newaxis]).sum(axis=1), self.bins + 1)
+        rows = np.arange(len(column))
+        cumulative_sums = np.cumsum(self.sums, axis=1)
+        below = np.where(column > 0, cumulative[rows, np.maximum(column - 1, 0)], 0)
+        below_sum = np.where(column > 0, cumulative_sums[rows, np.maximum(column - 1, 0)], 0.0)
+        # Part of the bin holding the quantile, at the bin's mean value
+        inside = self.counts[rows, column]
+        partial = (rank - below) * self.sums[rows, column] / np.maximum(inside, 1)
+        return (below_sum + partial) / np.maximum(rank, 1e-300)
+
+
+class PathRiskStatistics:
+    """
+    Path-dependent risk metrics collected in one pass over (steps x paths) chunks of prices.
+
+    - `S0`: Initial price of the paths.
+    - `days`: Number of simulated steps (rows) of the paths.
+    - `horizons`: Days (1-based) at which VaR and CVaR of the return are measured; horizons
+      beyond the paths are skipped.
+    - `barriers`: Price levels whose first-passage time is recorded (levels at or above `S0`
+      are reached from below, the others from above).
+    - `levels`: VaR/CVaR confidence levels.
+    - `step`: Days per simulated step. Horizons must be multiples of it, and passage times
+      and days under water are reported in days.
+
+    Per chunk it computes the horizon returns, the running peak (maximum drawdown and days
+    under water) and the first day each barrier is touched, and adds them to histograms, so
+    memory does not depend on the number of paths and results can be merged.
+    """
+
+    def __init__(self, S0, days, horizons=(1, 5, 10, 30), barriers=(), levels=(0.95, 0.99), bins=8192, step=1):
+        uneven = [h for h in horizons if h % step]
+        if uneven:
+            raise ValueError(f"Horizons {uneven} are not multiples of the step ({step} days)")
+        self.S0 = S0
+        self.days = days
+        self.step = step
+        self.horizons = [h for h in horizons if 1 <= h // step <= days]
+        self.barriers = np.asarray(barriers, dtype=np.float64)
+        self.levels = tuple(levels)
+        self.count = 0
+        self.returns = _Histogram(len(self.horizons), -1.0, 3.0, bins)
+        self.drawdowns = _Histogram(1, 0.0, 1.0, bins)
+        # Day of the first touch per barrier (column days + 1 = never touched)
+        self.first_hits = np.zeros((len(self.barriers), days + 2), dtype=np.int64)
+        # Number of days below the running peak per path
+        self.under_water = np.zeros(days + 1, dtype=np.int64)
+
+    def update(self, chunk):
+        chunk = np.asarray(chunk, dtype=np.float64)
+        n = chunk.shape[1]
+        if n == 0:
+            return self
+        self.count += n
+
+        rows = np.array(self.horizons, dtype=np.int64) // self.step - 1
+        self.returns.add(chunk[rows] / self.S0 - 1)
+
+        peak = np.maximum.accumulate(np.vstack([np.full((1, n), self.S0), chunk]), axis=0)[1:]
+        drawdown = 1 - chunk / peak
+        self.drawdowns.add(drawdown.max(axis=0)[np.newaxis, :])
+        self.under_water += np.bincount((drawdown > 0).sum(axis=0), minlength=self.days + 1)
+
+        for i, barrier in enumerate(self.barriers):
+            touched = chunk >= barrier if barrier >= self.S0 else chunk <= barrier
+            # argmax gives the first True; paths without a touch go to the last column
+            day = np.where(touched.any(axis=0), touched.argmax(axis=0) + 1, self.days + 1)
+            self.first_hits[i] += np.bincount(day, minlength=self.days + 2)
+        return self
+
+    def merge(self, other):
+        self.count += other.count
+        self.returns.merge(other.returns)
+        self.drawdowns.merge(other.drawdowns)
+        self.first_hits += other.first_hits
+        self.under_water += other.under_water
+        return self
+
+    def value_at_risk(self):
+        """VaR and CVaR of the return (as positive loss fractions) per horizon and level."""
+        rows = []
+        for level in self.levels:
+            var = -self.returns.quantile(1 - level)
+            cvar = -self.returns.lower_tail_mean(1 - level)
+            rows += [{"Horizon": h, "Level": level, "VaR": v, "CVaR": c}
+                     for h, v, c in zip(self.horizons, var, cvar)]
+        return pd.DataFrame(rows).sort_values(["Horizon", "Level"], ignore_index=True)
+
+    def max_drawdown(self, quantiles=(0.5, 0.95, 0.99)):
+        """Mean and quantiles of the maximum drawdown (fraction of the running peak)."""
+        result = {"Mean": self.drawdowns.sums.sum() / self.count}
+        for q in quantiles:
+            result[f"Percentile {q * 100:g}"] = float(self.drawdowns.quantile(q)[0])
+        return result
+
+    def first_passage(self):
+        """Touch probability and first-passage day statistics per barrier."""
+        days = np.arange(1, self.days + 1) * self.step
+        rows = []
+        for barrier, counts in zip(self.barriers, self.first_hits):
+            hits = counts[1:self.days + 1]
+            touched = hits.sum()
+            cumulative = np.cumsum(hits)
+            rows.append({
+                "Barrier": barrier,
+                "Probability (%)": touched / self.count * 100,
+                "Mean Day": (hits * days).sum() / touched if touched else np.nan,
+                "Median Day": int(days[np.searchsorted(cumulative, touched / 2)]) if touched else np.nan,
+            })
+        return pd.DataFrame(rows)
+
+    def time_under_water(self):
+        """Distribution of the number of days spent below the running peak (share of paths per day count)."""
+        index = pd.Index(np.arange(self.days + 1) * self.step, name="Days")
+        return pd.Series(self.under_water / self.count, index=index, name="Share of Paths")
@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+from equity_analysis import bar_store
+
+# Higher timeframes are aggregated from a finer stored series. Buckets are formed in the
+# exchange timezone recorded with the data: dates in the store are already the timezone-naive
+# exchange time (see `data_request.prepare_history`), timezone-aware dates are converted to it.
+# Calendar days, weeks and months are therefore the exchange's own and intraday buckets are
+# anchored at the session open, also across daylight saving changes.
+
+AGGREGATIONS = {
+    "Open": "first",
+    "High": "max",
+    "Low": "min",
+    "Close": "last",
+    "Volume": "sum",
+    "Dividends": "sum",
+}
+INTRADAY_RULES = {"15m": "15min", "30m": "30min", "1h": "1h", "90m": "90min"}
+
+
+def exchange_time(dates, timezone=None):
+    """
+    Returns dates as timezone-naive exchange time.
+
+    - `timezone`: Exchange timezone (e.g. 'America/New_York'). Timezone-aware dates are
+      converted to it; naive dates are taken as the stored exchange time.
+    """
+    dates = pd.DatetimeIndex(dates)
+    if dates.tz is None:
+        return dates
+    return (dates.tz_convert(timezone) if timezone else dates).tz_localize(None)
+
+
+def _data_timezone(data):
+    """Returns the exchange timezone of a bar DataFrame from its 'Timezone' column, or None."""
+    if "Timezone" not in data.columns:
+        return None
+    zones = data["Timezone"].dropna()
+    return str(zones.iloc[-1]) if not zones.empty else None
+
+
+def session_open(dates):
+    """
+    Returns the usual session open (offset from midnight) of an intraday series: the most
+    common time of the first bar of each trading day.
+    """
+    dates = pd.DatetimeIndex(dates)
+    first_bars = pd.Series(dates).groupby(dates.normalize()).min()
+    offsets = first_bars - first_bars.dt.normalize()
+    return offsets.mode().iloc[0] if not offsets.empty else pd.Timedelta(0)
+
+
+def bucket_starts(dates, interval, open_offset=None, timezone=None):
+    """
+    Returns the start of the target bar every timestamp belongs to, in exchange time.
+
+    - `interval`: Target interval ('1h', '1d', '1wk', '1mo', ...). Weekly bars start on
+      Monday and monthly bars on the first of the month, like the Yahoo bars.
+    - `open_offset`: Session open used to anchor intraday buckets (default: inferred with
+      `session_open`), so 1h bars start at e.g. 09:30, 10:30, ... as delivered by Yahoo.
+    - `timezone`: Exchange timezone timezone-aware dates are converted to (see `exchange_time`).
+    """
+    dates = exchange_time(dates, timezone)
+    days = dates.normalize()
+    if interval == "1d":
+        return days
+    if interval == "1wk":
+        return days - pd.to_timedelta(days.weekday, unit="D")
+    if interval == "1mo":
+        return days - pd.to_timedelta(days.day - 1, unit="D")
+    if interval not in INTRADAY_RULES:
+        raise ValueError(f"Unsupported target interval: {interval}")
+
+    step = pd.Timedelta(INTRADAY_RULES[interval])
+    open_offset = session_open(dates) if open_offset is None else open_offset
+    since_open = dates - days - open_offset
+    # Bars before the usual open (pre-market) form their own buckets counted back from the open
+    return days + open_offset + (since_open // step) * step
+
+
+def resample_bars(data, interval, open_offset=None, timezone=None):
+    """
+    Aggregates bars to a higher timeframe.
+
+    - `data`: Bar DataFrame with a 'Date' column (and OHLCV, 'Dividends', 'Stock Splits',
+      'Timezone' columns where available). Indicator columns are dropped.
+    - `interval`: Target interval (see `bucket_starts`).
+    - `timezone`: Exchange timezone (default: from the 'Timezone' column).
+
+    Open/Close take the first/last bar, High/Low the extremes, Volume and Dividends are summed
+    and split ratios within a bar are multiplied. Returns a DataFrame in the same layout.
+    """
+    if data.empty:
+        return data[[c for c in data.columns if c in AGGREGATIONS or c in ("Date", "Stock Splits", "Timezone")]]
+
+    buckets = bucket_starts(data["Date"], interval, open_offset, timezone or _data_timezone(data))
+    grouped = data.groupby(buckets.values, sort=True)
+
+    result = pd.DataFrame({"Date": pd.DatetimeIndex(grouped.size().index)})
+    for column, how in AGGREGATIONS.items():
+        if column in data.columns:
+            result[column] = grouped[column].agg(how).values
+    if "Stock Splits" in data.columns:
+        # 0 means no split; several splits within one bar compound
+        ratios = data["Stock Splits"].where(data["Stock Splits"] != 0, 1.0)
+        combined = ratios.groupby(buckets.values, sort=True).prod().values
+        result["Stock Splits"] = np.where(combined == 1.0, 0.0, combined)
+    if "Timezone" in data.columns:
+        result["Timezone"] = grouped["Timezone"].last().values
+    return result
+
+
+def resample_dataset(base_name, target_name, interval, ticker=None):
+    """Builds a higher-timeframe dataset from a stored base series and saves it to the bar store."""
+    base_meta = bar_store.read_meta(base_name)
+    data = resample_bars(bar_store.read_bars(base_name), interval, timezone=base_meta.get("timezone"))
+    bar_store.write_bars(data, target_name, ticker=ticker or base_meta.get("ticker"), interval=interval)
+    return data
+
+
+def update_resampled(base_name, target_name, interval):
+    """
+    Updates a resampled dataset after new base bars have been appended.
+
+    Only the base bars from the start of the last stored target bar onwards are aggregated
+    again, so the still forming bar is completed and new bars are appended. Returns the
+    number of target bars added. The dataset is built from scratch if it does not exist yet
+    or holds another ticker or interval.
+    """
+    base_meta = bar_store.read_meta(base_name)
+    ticker = base_meta.get("ticker")
+    target_meta = bar_store.read_meta(target_name) if bar_store.has_bars(target_name) else {}
+    if (not target_meta.get("length") or target_meta.get("ticker") != ticker
+            or target_meta.get("interval") != interval):
+        return len(resample_dataset(base_name, target_name, interval))
+
+    target_dates = bar_store.open_bars(target_name, ["Date"])["Date"]
+    base_dates = bar_store.open_bars(base_name, ["Date"])["Date"]
+    start = int(np.searchsorted(base_dates, target_dates[-1], side="left"))
+
+    open_offset = None
+    if interval in INTRADAY_RULES:
+        open_offset = session_open(np.asarray(base_dates).astype("datetime64[ns]"))
+    recent = resample_bars(bar_store.read_bars(base_name, start=start), interval, open_offset,
+                           timezone=base_meta.get("timezone"))
+    return bar_store.append_bars(recent, target_name)
@@ -0,0 +1,321 @@
+import copy
+import time
+from collections import deque
+import numpy as np
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from scipy import special, stats
+from scipy.stats import qmc
+
+# Monte Carlo paths are generated in chunks of paths, each with its own random stream
+# spawned from one SeedSequence. A chunk is a (days x paths) array, so memory is bounded by
+# the chunk size and the result for a given seed does not depend on how chunks are consumed
+# or on how many processes generate them.
+
+CHUNK_SIZE = 20_000
+
+
+def estimate_parameters(close_prices):
+    """
+    Estimates the log-return model of `MCS.prediction_mcs` from closing prices.
+
+    Returns (mu, sigma, S0): mean and standard deviation of the daily log returns and the
+    last price.
+    """
+    close_prices = np.asarray(close_prices, dtype=np.float64)
+    close_prices = close_prices[~np.isnan(close_prices)]
+    log_returns = np.log(close_prices[1:] / close_prices[:-1])
+    return float(np.mean(log_returns)), float(np.std(log_returns)), float(close_prices[-1])
+
+
+def chunk_sizes(simulations, chunk_size=CHUNK_SIZE):
+    """Splits `simulations` paths into chunks of at most `chunk_size` paths."""
+    full, rest = divmod(simulations, chunk_size)
+    return [chunk_size] * full + ([rest] if rest else [])
+
+
+def log_normal_paths(S0, mu, sigma, days, paths, rng, dtype=np.float64, step=1):
+    """
+    Simulates price paths with normally distributed daily log returns
+    (mu - sigma^2 / 2 + sigma * Z), computed in place in one (days x paths) array.
+
+    - `step`: Days per simulated step; with step=5 every row is one week and `days` is the
+      number of steps.
+    """
+    result = rng.standard_normal((days, paths), dtype=dtype)
+    result *= sigma * np.sqrt(step)
+    result += (mu - 0.5 * sigma ** 2) * step
+    np.cumsum(result, axis=0, out=result)
+    np.exp(result, out=result)
+    result *= S0
+    return result
+
+
+def antithetic_paths(S0, mu, sigma, days, paths, rng, dtype=np.float64):
+    """
+    Like `log_normal_paths`, but the second half of the paths uses the negated normals of the
+    first half (path i and i + paths // 2 form an antithetic pair). `paths` must be even.
+    """
+    if paths % 2:
+        raise ValueError("Antithetic sampling needs an even number of paths per chunk")
+    half = rng.standard_normal((days, paths // 2), dtype=dtype)
+    result = np.concatenate([half, -half], axis=1)
+    result *= sigma
+    result += mu - 0.5 * sigma ** 2
+    np.cumsum(result, axis=0, out=result)
+    np.exp(result, out=result)
+    result *= S0
+    return result
+
+
+def _bridge_plan(days):
+    """
+    Construction order of a Brownian bridge over steps 1..days: the end point first, then
+    the midpoints of the remaining intervals. Returns (index, left, right) per dimension.
+    """
+    plan = [(days, 0, None)]
+    intervals = deque([(0, days)])
+    while intervals:
+        left, right = intervals.popleft()
+        if right - left > 1:
+            middle = (left + right) // 2
+            plan.append((middle, left, right))
+            intervals.extend([(left, middle), (middle, right)])
+    return plan
+
+
+def brownian_bridge(normals):
+    """
+    Turns (days x paths) standard normals into Brownian motion values at steps 1..days, using
+    the first rows for the coarse shape (end point, midpoint, ...). This puts the most
+    important dimensions of quasi-random points into the path's main movements.
+    """
+    days = normals.shape[0]
+    W = np.zeros((days + 1, normals.shape[1]), dtype=normals.dtype)
+    for row, (index, left, right) in enumerate(_bridge_plan(days)):
+        if right is None:
+            W[index] = np.sqrt(index - left) * normals[row]
+        else:
+            span = right - left
+            W[index] = ((right - index) * W[left] + (index - left) * W[right]) / span
+            W[index] += np.sqrt((index - left) * (right - index) / span) * normals[row]
+    return W[1:]
+
+
+def sobol_paths(S0, mu, sigma, days, paths, rng, dtype=np.float64):
+    """
+    Simulates paths from one scrambled Sobol point set (one randomized QMC replicate) built
+    with a Brownian bridge. `paths` should be a power of two.
+    """
+    sampler = qmc.Sobol(d=days, scramble=True, seed=rng)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)  # balance warning for non powers of two
+        points = sampler.random(paths)
+    normals = stats.norm.ppf(np.clip(points, 1e-12, 1 - 1e-12)).T
+    W = brownian_bridge(normals)
+    steps = np.arange(1, days + 1)[:, np.newaxis]
+    return (S0 * np.exp((mu - 0.5 * sigma ** 2) * steps + sigma * W)).astype(dtype, copy=False)
+
+
+def garch_paths(S0, omega, alpha, beta, residuals, variances, days, paths, rng, dtype=np.float64, mu=0.0,
+                scale=100.0):
+    """
+    Simulates price paths whose daily log returns follow a zero-mean GARCH(p, q) model (see
+    `arima_garch.garch_parameters`). The variance recursion is stepped for all paths at once,
+    so volatility clusters within every path.
+
+    - `omega`, `alpha`, `beta`: GARCH parameters in the units of the fitted returns.
+    - `residuals`, `variances`: Last p residuals and last q conditional variances of the fit
+      (oldest first); every path starts from this state.
+    - `mu`: Daily drift added to the log returns.
+    - `scale`: Factor the log returns were multiplied by before fitting (100 for percent).
+    """
+    alpha = np.asarray(alpha, dtype=np.float64)
+    beta = np.asarray(beta, dtype=np.float64)
+    # Rolling state with the newest value first, matching alpha[1] and beta[1]
+    squared_residuals = np.repeat(np.asarray(residuals, dtype=dtype)[::-1][:len(alpha), np.newaxis] ** 2, paths, axis=1)
+    past_variances = np.repeat(np.asarray(variances, dtype=dtype)[::-1][:len(beta), np.newaxis], paths, axis=1)
+
+    result = rng.standard_normal((days, paths), dtype=dtype)
+    for day in range(days):
+        variance = omega + alpha @ squared_residuals + beta @ past_variances
+        result[day] *= np.sqrt(variance, dtype=dtype)
+        if len(alpha):
+            squared_residuals[1:] = squared_residuals[:-1]
+            squared_residuals[0] = result[day] ** 2
+        if len(beta):
+            past_variances[1:] = past_variances[:-1]
+            past_variances[0] = variance
+
+    result /= scale
+    result += mu
+    np.cumsum(result, axis=0, out=result)
+    np.exp(result, out=result)
+    result *= S0
+    return result
+
+
+def truncated_normal(uniforms, low=-2.0, high=2.0):
+    """
+    Maps uniforms to a standard normal truncated to [low, high] by inverse CDF, in bulk
+    (the same distribution as `scipy.stats.truncnorm(low, high)`).
+    """
+    cdf_low, cdf_high = special.ndtr(low), special.ndtr(high)
+    return special.ndtri(cdf_low + uniforms * (cdf_high - cdf_low))
+
+
+SAMPLERS = {"plain": log_normal_paths, "antithetic": antithetic_paths, "sobol": sobol_paths}
+
+
+def _run_chunk(task):
+    """Generates one chunk of paths and returns it, or the accumulators fed with it."""
+    generator, params, days, size, seed_sequence, dtype, accumulators = task
+    chunk = generator(days=days, paths=size, rng=np.random.default_rng(seed_sequence), dtype=dtype, **params)
+    if accumulators is None:
+        return chunk
+    for accumulator in accumulators:
+        accumulator.update(chunk)
+    return accumulators
+
+
+def map_chunks(generator, params, days=30, simulations=1000, seed=None, chunk_size=CHUNK_SIZE,
+               dtype=np.float64, workers=1, accumulators=None):
+    """
+    Runs a path generator chunk by chunk, in the current process or in a process pool.
+
+    - `generator`: Module-level function called as generator(days=, paths=, rng=, dtype=, **params)
+      that returns a (days x paths) array (e.g. `log_normal_paths`).
+    - `params`: Model parameters passed to the generator.
+    - `workers`: Number of processes; 1 runs in the current process.
+    - `accumulators`: Optional empty accumulators (see `path_stats.py`). Every chunk is fed
+      into fresh copies, which are yielded instead of the paths.
+
+    Every chunk draws from its own stream spawned from `seed`, and results are yielded in
+    chunk order, so the output is the same for any number of workers.
+    """
+    sizes = chunk_sizes(simulations, chunk_size)
+    streams = np.random.SeedSequence(seed).spawn(len(sizes))
+    # Empty copies taken before any chunk is merged into the caller's accumulators
+    template = copy.deepcopy(accumulators)
+    tasks = ((generator, params, days, size, stream, dtype, copy.deepcopy(template))
+             for size, stream in zip(sizes, streams))
+
+    if workers <= 1 or len(sizes) <= 1:
+        yield from map(_run_chunk, tasks)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(sizes))) as executor:
+        # Keep only a few chunks in flight so finished results do not pile up in memory
+        pending = deque()
+        for task in tasks:
+            pending.append(executor.submit(_run_chunk, task))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def merge_chunks(accumulators, partials):
+    """Merges per-chunk accumulators (as yielded by `map_chunks`) into `accumulators` in chunk order."""
+    for partial in partials:
+        for accumulator, part in zip(accumulators, partial):
+            accumulator.merge(part)
+    return accumulators
+
+
+def simulate_paths(S0, mu, sigma, days=30, simulations=1000, seed=None, chunk_size=CHUNK_SIZE, dtype=np.float64,
+                   workers=1, step=1):
+    """
+    Generates Monte Carlo price paths chunk by chunk.
+
+    - `S0`, `mu`, `sigma`: Initial price, daily drift and volatility of the log returns.
+    - `seed`: Seed of the SeedSequence the per-chunk streams are spawned from (None = random).
+    - `chunk_size`: Maximum number of paths held in memory at once.
+    - `dtype`: np.float64 (default) or np.float32 to halve memory and speed up large runs.
+    - `workers`: Number of processes generating chunks (see `map_chunks`).
+    - `step`: Days per simulated step (see `log_normal_paths`).
+
+    Yields (days x paths) arrays.
+    """
+    params = {"S0": S0, "mu": mu, "sigma": sigma, "step": step}
+    yield from map_chunks(log_normal_paths, params, days, simulations, seed, chunk_size, dtype, workers)
+
+
+def simulate(S0, mu, sigma, days=30, simulations=1000, seed=None, chunk_size=CHUNK_SIZE, dtype=np.float64,
+             workers=1):
+    """Returns all simulated paths as one (days x simulations) array (see `simulate_paths`)."""
+    result = np.empty((days, simulations), dtype=dtype)
+    start = 0
+    for chunk in simulate_paths(S0, mu, sigma, days, simulations, seed, chunk_size, dtype, workers):
+        result[:, start:start + chunk.shape[1]] = chunk
+        start += chunk.shape[1]
+    return result
+
+
+def accumulate(S0, mu, sigma, accumulators, days=30, simulations=1000, seed=None, chunk_size=CHUNK_SIZE,
+               dtype=np.float64, workers=1):
+    """
+    Feeds every chunk of simulated paths into online accumulators (see `path_stats.py`) and
+    drops it afterwards, so memory does not grow with the number of paths.
+
+    Chunks are accumulated separately and merged in chunk order, so the statistics for a
+    given seed are bit-identical for any number of `workers`.
+    """
+    params = {"S0": S0, "mu": mu, "sigma": sigma}
+    partials = map_chunks(log_normal_paths, params, days, simulations, seed, chunk_size, dtype, workers,
+                          accumulators=accumulators)
+    return merge_chunks(accumulators, partials)
+
+
+def estimate(S0, mu, sigma, accumulators, days=30, simulations=100_000, method="plain", seed=None,
+             chunk_size=CHUNK_SIZE, replicates=16, dtype=np.float64, workers=1):
+    """
+    Runs the log-return model with a variance-reduction method and feeds the chunks into
+    accumulators (e.g. `path_stats.MeanEstimator`, which also applies the control variate).
+
+    - `method`: 'plain', 'antithetic' (pairs of paths with negated normals) or 'sobol'
+      (scrambled Sobol points with Brownian-bridge construction).
+    - `replicates`: For 'sobol', the number of independently scrambled point sets the paths are
+      split into; their spread gives the standard error. The set size is rounded down to a
+      power of two, so up to `simulations` paths are used.
+    """
+    if method not in SAMPLERS:
+        raise ValueError(f"Unknown sampling method: {method}")
+    if method == "sobol":
+        chunk_size = 2 ** int(np.log2(max(simulations // replicates, 2)))
+        simulations = chunk_size * replicates
+    elif method == "antithetic":
+        chunk_size += chunk_size % 2
+        simulations += simulations % 2
+
+    params = {"S0": S0, "mu": mu, "sigma": sigma}
+    partials = map_chunks(SAMPLERS[method], params, days, simulations, seed, chunk_size, dtype, workers,
+                          accumulators=accumulators)
+    return merge_chunks(accumulators, partials)
+
+
+def benchmark_mcs(days=252, simulations=10_000_000, chunk_size=CHUNK_SIZE, dtype=np.float32,
+                  S0=100.0, mu=0.0003, sigma=0.02, seed=0, workers=1):
+    """
+    Measures the throughput of the chunked engine without keeping the paths.
+
+    Returns a dictionary with the elapsed time, paths per second and the mean final price.
+    """
+    started = time.perf_counter()
+    final_sum = 0.0
+    for chunk in simulate_paths(S0, mu, sigma, days, simulations, seed, chunk_size, dtype, workers):
+        final_sum += float(chunk[-1].sum(dtype=np.float64))
+    elapsed = time.perf_counter() - started
+
+    result = {
+        "paths": simulations,
+        "days": days,
+        "dtype": np.dtype(dtype).name,
+        "workers": workers,
+        "seconds": round(elapsed, 3),
+        "paths_per_second": round(simulations / elapsed),
+        "mean_final_price": final_sum / simulations,
+    }
+    print(f"{simulations} paths x {days} days ({result['dtype']}, {workers} workers): {elapsed:.2f}s, "
+          f"{result['paths_per_second']:,} paths/s")
+    return result
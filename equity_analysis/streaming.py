@@ -0,0 +1,269 @@
+import json
+import math
+from collections import deque
+import numpy as np
+from equity_analysis import bar_store
+
+
+class RollingMean:
+    """
+    Streaming equivalent of `Series.rolling(window=period).mean()`.
+
+    Keeps the window values and a compensated (Kahan) running sum, following the same
+    add/remove arithmetic as pandas, so every update is O(1) and matches the batch result.
+    """
+
+    def __init__(self, period):
+        self.period = period
+        self.window = deque()
+        self.nobs = 0
+        self.neg_ct = 0
+        self.sum_x = 0.0
+        self.compensation_add = 0.0
+        self.compensation_remove = 0.0
+        self.num_consecutive_same_value = 0
+        self.prev_value = None
+
+    def _add(self, value):
+        if value == value:
+            self.nobs += 1
+            y = value - self.compensation_add
+            t = self.sum_x + y
+            self.compensation_add = t - self.sum_x - y
+            self.sum_x = t
+            if math.copysign(1.0, value) < 0:
+                self.neg_ct += 1
+            if value == self.prev_value:
+                self.num_consecutive_same_value += 1
+            else:
+                self.num_consecutive_same_value = 1
+            self.prev_value = value
+
+    def _remove(self, value):
+        if value == value:
+            self.nobs -= 1
+            y = -value - self.compensation_remove
+            t = self.sum_x + y
+            self.compensation_remove = t - self.sum_x - y
+            self.sum_x = t
+            if math.copysign(1.0, value) < 0:
+                self.neg_ct -= 1
+
+    def update(self, value):
+        """Consumes one value and returns the rolling mean (NaN until the window is full)."""
+        value = float(value)
+        if self.prev_value is None:
+            self.prev_value = value
+        if len(self.window) == self.period:
+            self._remove(self.window.popleft())
+        self.window.append(value)
+        self._add(value)
+
+        if self.nobs < self.period or self.nobs == 0:
+            return math.nan
+        result = self.sum_x / self.nobs
+        if self.num_consecutive_same_value >= self.nobs:
+            result = self.prev_value
+        elif self.neg_ct == 0 and result < 0:
+            result = 0.0
+        elif self.neg_ct == self.nobs and result > 0:
+            result = 0.0
+        return result
+
+    def to_dict(self):
+        state = dict(vars(self))
+        state["window"] = list(self.window)
+        return state
+
+    @classmethod
+    def from_dict(cls, state):
+        indicator = cls(state["period"])
+        indicator.__dict__.update(state)
+        indicator.window = deque(state["window"])
+        return indicator
+
+
+class ExponentialMovingAverage:
+    """
+    Streaming equivalent of `Series.ewm(span=period, adjust=False).mean()`.
+    Uses the same weight recursion as pandas, so values match the batch result.
+    """
+
+    def __init__(self, period):
+        self.period = period
+        com = (period - 1) / 2.0
+        self.alpha = 1.0 / (1.0 + com)
+        self.weighted = None
+        self.old_wt = 1.0
+        self.nobs = 0
+
+    def update(self, value):
+        """Consumes one value and returns the updated EMA."""
+        value = float(value)
+        is_observation = value == value
+        if self.weighted is None:
+            self.weighted = value
+            self.nobs = int(is_observation)
+        else:
+            self.nobs += is_observation
+            if self.weighted == self.weighted:
+                self.old_wt *= 1.0 - self.alpha
+                if is_observation:
+                    if self.weighted != value:
+                        self.weighted = self.old_wt * self.weighted + self.alpha * value
+                        self.weighted /= self.old_wt + self.alpha
+                    self.old_wt = 1.0
+            elif is_observation:
+                self.weighted = value
+        return self.value
+
+    @property
+    def value(self):
+        """The current EMA (NaN before the first observation)."""
+        return self.weighted if self.nobs >= 1 else math.nan
+
+    def to_dict(self):
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, state):
+        indicator = cls(state["period"])
+        indicator.__dict__.update(state)
+        return indicator
+
+
+class AverageTrueRange:
+    """Streaming equivalent of `analytics.average_true_range`."""
+
+    def __init__(self, period=14):
+        self.period = period
+        self.prev_close = math.nan
+        self.mean = RollingMean(period)
+
+    def update(self, high, low, close):
+        """Consumes one bar and returns the ATR."""
+        high_low = np.float64(high) - np.float64(low)
+        high_close = np.abs(np.float64(high) - self.prev_close)
+        low_close = np.abs(np.float64(low) - self.prev_close)
+        true_range = np.maximum(np.maximum(high_low, high_close), low_close)
+        self.prev_close = float(close)
+        return self.mean.update(true_range)
+
+    def to_dict(self):
+        return {"period": self.period, "prev_close": self.prev_close, "mean": self.mean.to_dict()}
+
+    @classmethod
+    def from_dict(cls, state):
+        indicator = cls(state["period"])
+        indicator.prev_close = state["prev_close"]
+        indicator.mean = RollingMean.from_dict(state["mean"])
+        return indicator
+
+
+class RelativeStrengthIndex:
+    """Streaming equivalent of `analytics.relative_strength_index`."""
+
+    def __init__(self, period=14):
+        self.period = period
+        self.prev_close = math.nan
+        self.gain = RollingMean(period)
+        self.loss = RollingMean(period)
+
+    def update(self, close):
+        """Consumes one closing price and returns the RSI."""
+        close = np.float64(close)
+        delta = close - self.prev_close
+        self.prev_close = float(close)
+        # Same as delta.where(delta > 0, 0) and -delta.where(delta < 0, 0) (including the -0.0)
+        gain = self.gain.update(delta if delta > 0 else 0.0)
+        loss = self.loss.update(-(delta if delta < 0 else 0.0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rs = np.float64(gain) / np.float64(loss)
+            return float(100 - (100 / (1 + rs)))
+
+    def to_dict(self):
+        return {"period": self.period, "prev_close": self.prev_close,
+                "gain": self.gain.to_dict(), "loss": self.loss.to_dict()}
+
+    @classmethod
+    def from_dict(cls, state):
+        indicator = cls(state["period"])
+        indicator.prev_close = state["prev_close"]
+        indicator.gain = RollingMean.from_dict(state["gain"])
+        indicator.loss = RollingMean.from_dict(state["loss"])
+        return indicator
+
+
+class MACD:
+    """Streaming equivalent of `analytics.macd`, returns (macd_line, signal_line) per bar."""
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = ExponentialMovingAverage(fast)
+        self.slow = ExponentialMovingAverage(slow)
+        self.signal = ExponentialMovingAverage(signal)
+
+    def update(self, close):
+        macd_line = self.fast.update(close) - self.slow.update(close)
+        return macd_line, self.signal.update(macd_line)
+
+    def to_dict(self):
+        return {"fast": self.fast.to_dict(), "slow": self.slow.to_dict(), "signal": self.signal.to_dict()}
+
+    @classmethod
+    def from_dict(cls, state):
+        indicator = cls()
+        indicator.fast = ExponentialMovingAverage.from_dict(state["fast"])
+        indicator.slow = ExponentialMovingAverage.from_dict(state["slow"])
+        indicator.signal = ExponentialMovingAverage.from_dict(state["signal"])
+        return indicator
+
+
+class IndicatorEngine:
+    """
+    Computes the indicator set of `analytics.add_analytics_to_df` one bar at a time:
+    MA_50, ATR_14, RSI_14, EMA_12, EMA_26, MACD and Signal_Line. EMA_12 and EMA_26 are the
+    fast and slow EMAs of the MACD, so they are updated and saved once.
+    """
+    columns = ["MA_50", "ATR_14", "RSI_14", "EMA_12", "EMA_26", "MACD", "Signal_Line"]
+
+    def __init__(self):
+        self.ma_50 = RollingMean(50)
+        self.atr_14 = AverageTrueRange(14)
+        self.rsi_14 = RelativeStrengthIndex(14)
+        self.macd = MACD(12, 26, 9)
+
+    def update(self, high, low, close):
+        """Consumes one bar and returns a dictionary of indicator values."""
+        macd_line, signal_line = self.macd.update(close)
+        return {
+            "MA_50": self.ma_50.update(close),
+            "ATR_14": self.atr_14.update(high, low, close),
+            "RSI_14": self.rsi_14.update(close),
+            "EMA_12": self.macd.fast.value,
+            "EMA_26": self.macd.slow.value,
+            "MACD": macd_line,
+            "Signal_Line": signal_line,
+        }
+
+    def to_dict(self):
+        return {name: indicator.to_dict() for name, indicator in vars(self).items()}
+
+    @classmethod
+    def from_dict(cls, state):
+        engine = cls()
+        engine.ma_50 = RollingMean.from_dict(state["ma_50"])
+        engine.atr_14 = AverageTrueRange.from_dict(state["atr_14"])
+        engine.rsi_14 = RelativeStrengthIndex.from_dict(state["rsi_14"])
+        engine.macd = MACD.from_dict(state["macd"])
+        return engine
+
+    def save(self, file_path, **extra):
+        """Saves the engine state (plus any extra fields) as JSON, replacing the file atomically."""
+        bar_store.write_json(file_path, dict(extra, engine=self.to_dict()))
+
+    @classmethod
+    def load(cls, file_path):
+        """Loads a saved engine; returns (engine, extra fields)."""
+        with open(file_path) as f:
+            state = json.load(f)
+        return cls.from_dict(state.pop("engine")), state
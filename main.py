@@ -16,8 +16,7 @@ ea.conf_intervals()
 ea.probability_of_target (150)
 ea.probability_distribution(current_price)
 ea.risk_reward_analysis(current_price,150,110)
-ea.stress_test_mcs(ticker, stress_factor = 1.5, max_price_multiplier = 3, use_log_normal=True)
-ea.stress_test_mcs(ticker, stress_factor = 1.5, max_price_multiplier = 3, use_log_normal=False)
+ea.stress_grid(ticker, stress_factors = [1.5], max_price_multiplier = 3, distributions = ["log_normal", "normal"])
 ea.arima_model(ticker)
 ea.garch_model(ticker)
 ea.gbm_model(ticker)
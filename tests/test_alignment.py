@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+from equity_analysis.alignment import CalendarIndex
+
+# 2024-05-01 (Labour Day) is a holiday for the DAX but a trading day for the S&P 500,
+# and 2024-05-27 (Memorial Day) the other way round
+US = pd.DatetimeIndex(["2024-04-29", "2024-04-30", "2024-05-01", "2024-05-02", "2024-05-28"])
+EU = pd.DatetimeIndex(["2024-04-30", "2024-05-02", "2024-05-27", "2024-05-28"])
+
+
+def test_asof_alignment_forward_fills_holidays():
+    calendar = CalendarIndex({"^GSPC": US, "^GDAXI": EU})
+    frame = calendar.frame({"^GSPC": np.arange(1.0, 6.0), "^GDAXI": np.array([10.0, 20.0, 30.0, 40.0])},
+                           start=calendar.first_common_position())
+
+    assert frame["Date"].tolist() == list(pd.DatetimeIndex(["2024-04-30", "2024-05-01", "2024-05-02",
+                                                             "2024-05-27", "2024-05-28"]))
+    # The European holiday keeps the previous DAX close instead of dropping the US bar
+    assert frame["^GDAXI"].tolist() == [10.0, 10.0, 20.0, 30.0, 40.0]
+    assert frame["^GSPC"].tolist() == [2.0, 3.0, 4.0, 4.0, 5.0]
+
+
+def test_exact_alignment_and_common_start():
+    calendar = CalendarIndex({"^GSPC": US, "^GDAXI": EU})
+    assert calendar.first_common_position() == 1
+    assert calendar.exact_mask("^GDAXI").tolist() == [False, True, False, True, True, True]
+    aligned = calendar.align("^GDAXI", [10.0, 20.0, 30.0, 40.0], method="exact")
+    np.testing.assert_array_equal(aligned, [np.nan, 10.0, np.nan, 20.0, 30.0, 40.0])
+
+
+def test_adding_a_series_remaps_existing_positions():
+    incremental = CalendarIndex({"^GSPC": US})
+    incremental.add("^GDAXI", EU)
+    direct = CalendarIndex({"^GDAXI": EU, "^GSPC": US})
+    for key in ("^GSPC", "^GDAXI"):
+        np.testing.assert_array_equal(incremental.positions[key], direct.positions[key])
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from equity_analysis import bar_store
+
+
+@pytest.fixture(autouse=True)
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(bar_store, "STORE_DIR", str(tmp_path / "bar_store"))
+    return tmp_path / "bar_store"
+
+
+def bars(start, periods, first_close=100.0):
+    return pd.DataFrame({
+        "Date": pd.date_range(start, periods=periods, freq="D"),
+        "Close": first_close + np.arange(periods, dtype=np.float64),
+        "Volume": np.arange(periods, dtype=np.int64) + 1_000,
+    })
+
+
+def test_append_replaces_the_overlapping_last_bar():
+    bar_store.write_bars(bars("2024-01-01", 5), "data_1d")
+    fresh = bars("2024-01-05", 3, first_close=500.0)
+
+    assert bar_store.append_bars(fresh, "data_1d") == 2
+    stored = bar_store.read_bars("data_1d")
+    assert stored["Date"].is_unique and len(stored) == 7
+    assert stored["Close"].tolist() == [100.0, 101.0, 102.0, 103.0, 500.0, 501.0, 502.0]
+
+
+def test_append_without_new_bars_adds_nothing():
+    bar_store.write_bars(bars("2024-01-01", 5), "data_1d")
+    generation = bar_store.read_meta("data_1d")["generation"]
+
+    assert bar_store.append_bars(bars("2024-01-06", 0), "data_1d") == 0
+    assert bar_store.read_meta("data_1d")["generation"] == generation
+    assert len(bar_store.read_bars("data_1d")) == 5
+
+
+def test_append_fills_columns_of_one_side_with_nan():
+    stored = bars("2024-01-01", 4)
+    stored["RSI_14"] = np.float32(50.0)
+    bar_store.write_bars(stored, "data_1d", dtypes={"RSI_14": "float32"})
+    fresh = bars("2024-01-05", 2)
+    fresh["Trades"] = np.array([7, 8], dtype=np.int64)
+
+    assert bar_store.append_bars(fresh, "data_1d") == 2
+    result = bar_store.read_bars("data_1d")
+    assert result["RSI_14"].dtype == np.float32
+    np.testing.assert_array_equal(result["RSI_14"], [50, 50, 50, 50, np.nan, np.nan])
+    # The integer column gets NaN for the stored bars and is promoted to float
+    assert result["Trades"].dtype == np.float64
+    np.testing.assert_array_equal(result["Trades"], [np.nan] * 4 + [7, 8])
+    assert result["Volume"].dtype == np.int64
+
+
+def test_round_trip_keeps_dates_timezone_and_dtypes():
+    data = bars("2024-03-08 09:30", 4)
+    data["Date"] = pd.date_range("2024-03-08 09:30", periods=4, freq="15min")
+    data["Timezone"] = "America/New_York"
+    data["RSI_14"] = np.array([30.5, 40.25, np.nan, 70.0])
+    bar_store.write_bars(data, "data_15m", ticker="MS", interval="15m", dtypes={"RSI_14": "float32"})
+
+    result = bar_store.read_bars("data_15m")
+    assert list(result.columns) == list(data.columns)
+    pd.testing.assert_series_equal(result["Date"], data["Date"])
+    assert (result["Timezone"] == "America/New_York").all()
+    assert result["RSI_14"].dtype == np.float32 and result["Volume"].dtype == np.int64
+    np.testing.assert_array_equal(result["RSI_14"], data["RSI_14"].astype(np.float32))
+    meta = bar_store.read_meta("data_15m")
+    assert (meta["ticker"], meta["interval"], meta["length"]) == ("MS", "15m", 4)
+
+
+def test_panel_round_trip():
+    dates = pd.date_range("2024-01-01", periods=3)
+    close = np.array([[1.0, 2.0, np.nan], [10.0, 11.0, 12.0]])
+    bar_store.write_panel("universe_1d", ["AAA", "BBB"], dates, {"Close": close}, interval="1d",
+                          dtypes={"Close": np.float32})
+
+    panel = bar_store.read_panel("universe_1d", "Close")
+    assert list(panel.columns) == ["AAA", "BBB"] and (panel.index == dates).all()
+    np.testing.assert_array_equal(panel.to_numpy(), close.T.astype(np.float32))
+    with pytest.raises(ValueError):
+        bar_store.write_panel("universe_1d", ["AAA"], dates, {"Close": close})
+
+
+def test_previous_generation_stays_readable_after_a_rewrite(store):
+    bar_store.write_bars(bars("2024-01-01", 5), "data_1d")
+    mapped = bar_store.open_bars("data_1d", columns=["Close"])["Close"]
+
+    bar_store.update_columns("data_1d", {"Close": np.zeros(5)})
+    # A reader of the previous header still sees its complete generation
+    assert mapped.tolist() == [100.0, 101.0, 102.0, 103.0, 104.0]
+    assert bar_store.read_bars("data_1d")["Close"].tolist() == [0.0] * 5
+
+    # Replaced files are removed on the next write only
+    bar_store.update_columns("data_1d", {"Close": np.ones(5)})
+    live = {spec["file"] for spec in bar_store.read_meta("data_1d")["columns"].values()}
+    previous = {"c1.2.npy"}
+    assert sorted(path.name for path in (store / "data_1d").iterdir()) == sorted(live | previous | {"meta.json"})
+
+
+def test_failed_write_keeps_the_previous_generation(store):
+    bar_store.write_bars(bars("2024-01-01", 5), "data_1d")
+    files = sorted(path.name for path in (store / "data_1d").iterdir())
+
+    with pytest.raises(ValueError):
+        bar_store.update_columns("data_1d", {"Close": np.zeros(3)})
+    assert sorted(path.name for path in (store / "data_1d").iterdir()) == files
+    assert bar_store.read_bars("data_1d")["Close"].tolist() == [100.0, 101.0, 102.0, 103.0, 104.0]
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from equity_analysis import data_request, fetch
+
+AS_OF = "2025-02-19"
+
+
+DATES = pd.bdate_range(end=AS_OF, periods=150)
+START, END = data_request.get_date(365), data_request.get_date(0)
+
+
+def write_history(directory, symbol, dates, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates))))
+    pd.DataFrame({"Date": dates, "Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+                  "Volume": rng.integers(1_000, 10_000, len(dates))}).to_csv(directory / f"{symbol}.csv", index=False)
+
+
+@pytest.fixture
+def provider(tmp_path):
+    source = tmp_path / "src"
+    source.mkdir()
+    write_history(source, "^GSPC", DATES, seed=1)
+    write_history(source, "^GDAXI", DATES, seed=2)
+    # Three market holidays of the Nikkei
+    write_history(source, "^N225", DATES.delete(slice(40, 43)), seed=3)
+    return fetch.FileProvider(str(source), as_of=AS_OF)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Records the retry delays instead of sleeping."""
+    delays = []
+    monkeypatch.setattr(fetch.time, "sleep", delays.append)
+    return delays
+
+
+class FlakyProvider:
+    """Fails the first `failures` requests, then serves from the wrapped provider."""
+    host = "flaky"
+    rate = None
+
+    def __init__(self, provider, failures):
+        self.provider = provider
+        self.failures = failures
+        self.calls = 0
+
+    def history(self, symbol, interval, start, end):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("temporary failure")
+        return self.provider.history(symbol, interval, start, end)
+
+
+def test_file_provider_serves_the_requested_window(provider):
+    data = provider.history("^GSPC", "1d", data_request.get_date(30), data_request.get_date(0))
+    assert data.index.name == "Date"
+    assert data.index.max() < pd.Timestamp(AS_OF) and data.index.min() >= pd.Timestamp(AS_OF) - pd.Timedelta(days=30)
+    assert list(data.columns) == ["Open", "High", "Low", "Close", "Volume"]
+
+
+def test_fetch_history_retries_with_exponential_backoff(provider, sleeps):
+    flaky = FlakyProvider(provider, failures=2)
+    data = fetch.fetch_history("^GSPC", "1d", START, END, provider=flaky, backoff=0.5)
+    assert flaky.calls == 3 and not data.empty
+    assert sleeps == [0.5, 1.0]
+
+
+def test_fetch_history_gives_up_after_the_retries(provider, sleeps):
+    flaky = FlakyProvider(provider, failures=10)
+    with pytest.raises(ConnectionError):
+        fetch.fetch_history("^GSPC", "1d", START, END, provider=flaky, retries=2, backoff=0.5)
+    assert flaky.calls == 3
+    assert sleeps == [0.5, 1.0]
+
+
+def test_fetch_batch_skips_failing_symbols(provider, sleeps):
+    data = fetch.fetch_batch(["^GSPC", "MISSING", "^N225"], "1d", START, END, provider=provider)
+    assert list(data) == ["^GSPC", "^N225"]
+    assert sleeps == []
+    with pytest.raises(ValueError):
+        fetch.fetch_batch(["MISSING"], "1d", START, END, provider=provider, retries=1)
+    assert sleeps == [fetch.BACKOFF]
+
+
+def test_run_parallel_isolates_failures():
+    def fail():
+        raise RuntimeError("boom")
+
+    results, failures = fetch.run_parallel({"a": lambda: 1, "b": fail, "c": lambda: 3}, max_workers=3)
+    assert results == {"a": 1, "c": 3}
+    assert list(failures) == ["b"] and isinstance(failures["b"], RuntimeError)
+
+
+def test_request_indices_merges_the_available_indices(provider, sleeps, tmp_path, monkeypatch):
+    (tmp_path / "data" / "raw_data").mkdir(parents=True)
+    (tmp_path / "run").mkdir()
+    monkeypatch.chdir(tmp_path / "run")
+
+    data_request.request_indices(provider=provider, include_ticker=False)
+
+    merged = pd.read_csv(tmp_path / "data" / "raw_data" / "merged_indices.csv", parse_dates=["Date"])
+    assert list(merged.columns) == ["Date", "^GSPC", "^GDAXI", "^N225"]
+    window = DATES[DATES >= pd.Timestamp(AS_OF) - pd.Timedelta(days=180)]
+    assert merged["Date"].tolist() == window[:-1].tolist()
+    # The Nikkei holidays are forward-filled, not dropped
+    merged = merged.set_index("Date")
+    assert merged.notna().all().all()
+    assert (merged.loc[DATES[40]:DATES[42], "^N225"] == merged.loc[DATES[39], "^N225"]).all()
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from equity_analysis import analytics, indicators
+
+
+@pytest.fixture
+def ohlc():
+    rng = np.random.default_rng(11)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 200)))
+    return pd.DataFrame({
+        "High": close * (1 + rng.uniform(0, 0.02, 200)),
+        "Low": close * (1 - rng.uniform(0, 0.02, 200)),
+        "Close": close,
+    })
+
+
+def legacy_indicators(df):
+    """The columns the original add_analytics_to_df wrote, with its pandas formulas."""
+    close = df["Close"]
+    prev_close = close.shift()
+    true_range = pd.Series(np.maximum.reduce([df["High"] - df["Low"], np.abs(df["High"] - prev_close),
+                                              np.abs(df["Low"] - prev_close)]), index=df.index)
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0).rolling(window=14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    ema12 = close.ewm(span=12, adjust=False).mean()
+    ema26 = close.ewm(span=26, adjust=False).mean()
+    macd_line = ema12 - ema26
+    return {
+        "MA_50": close.rolling(window=50).mean(),
+        "ATR_14": true_range.rolling(window=14).mean(),
+        "RSI_14": 100 - (100 / (1 + gain / loss)),
+        "EMA_12": ema12,
+        "EMA_26": ema26,
+        "MACD": macd_line,
+        "Signal_Line": macd_line.ewm(span=9, adjust=False).mean(),
+    }
+
+
+def test_standard_indicators_match_legacy_formulas(ohlc):
+    computed = indicators.compute_indicators(ohlc, indicators.STANDARD_INDICATORS)
+    for name, expected in legacy_indicators(ohlc).items():
+        pd.testing.assert_series_equal(computed[name], expected, check_names=False, obj=name)
+
+
+def test_analytics_functions_use_the_registry(ohlc):
+    close = ohlc["Close"]
+    upper, lower = analytics.bollinger_bands(ohlc, 20, k=1.5)
+    pd.testing.assert_series_equal(upper, close.rolling(20).mean() + 1.5 * close.rolling(20).std())
+    pd.testing.assert_series_equal(lower, close.rolling(20).mean() - 1.5 * close.rolling(20).std())
+    macd_line, signal_line = analytics.macd(ohlc)
+    expected = legacy_indicators(ohlc)
+    pd.testing.assert_series_equal(macd_line, expected["MACD"], check_names=False)
+    pd.testing.assert_series_equal(signal_line, expected["Signal_Line"], check_names=False)
+
+
+def test_custom_indicator_shares_the_cache(ohlc, monkeypatch):
+    calls = []
+
+    def counted_ema(close):
+        calls.append(1)
+        return close.ewm(span=12, adjust=False).mean()
+
+    monkeypatch.setitem(indicators._REGISTRY, "EMA_12", (["Close"], counted_ema))
+    monkeypatch.setitem(indicators._REGISTRY, "EMA_Spread", (["EMA_12", "Close"], lambda ema, close: close - ema))
+
+    cache = {}
+    first = indicators.compute_indicators(ohlc, ["MACD", "EMA_Spread"], cache)
+    second = indicators.compute_indicators(ohlc, ["Signal_Line", "EMA_Spread"], cache)
+    assert len(calls) == 1
+    assert second["EMA_Spread"] is first["EMA_Spread"]
+    pd.testing.assert_series_equal(first["EMA_Spread"], ohlc["Close"] - cache["EMA_12"])
+
+
+def test_circular_dependency_is_rejected(monkeypatch):
+    monkeypatch.setitem(indicators._REGISTRY, "A", (["B"], lambda b: b))
+    monkeypatch.setitem(indicators._REGISTRY, "B", (["A"], lambda a: a))
+    with pytest.raises(ValueError):
+        indicators.dependency_order(["A"])
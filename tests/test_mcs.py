@@ -0,0 +1,16 @@
+import numpy as np
+
+from equity_analysis import MCS, artifacts
+
+
+def test_forecast_cache_keeps_the_most_recent_runs(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifacts, "ARTIFACT_DIR", str(tmp_path / "simulations"))
+    monkeypatch.setattr(MCS, "_forecasts", type(MCS._forecasts)())
+    runs = [artifacts.save_run(np.full((3, 4), 100.0 + i), "mcs", S0=100.0, sigma=0.02) for i in range(3)]
+
+    first = MCS.load_forecast(runs[0])
+    MCS.load_forecast(runs[1])
+    assert MCS.load_forecast(runs[0]) is first
+    MCS.load_forecast(runs[2])
+    assert list(MCS._forecasts) == [runs[0], runs[2]]
+    assert MCS.load_forecast().paths[0, 0] == 102.0
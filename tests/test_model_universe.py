@@ -0,0 +1,45 @@
+import signal
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from equity_analysis import arima_garch
+
+
+def quick_model(close, horizon):
+    return True, [("Forecast", "Close", horizon, float(close.iloc[-1]))]
+
+
+def hung_model(close, horizon):
+    time.sleep(60)
+
+
+@pytest.fixture
+def closes(tmp_path, monkeypatch):
+    (tmp_path / "data" / "raw_data").mkdir(parents=True)
+    (tmp_path / "run").mkdir()
+    monkeypatch.chdir(tmp_path / "run")
+    monkeypatch.setitem(arima_garch.UNIVERSE_MODELS, "quick", quick_model)
+    monkeypatch.setitem(arima_garch.UNIVERSE_MODELS, "hung", hung_model)
+    index = pd.date_range("2024-01-01", periods=50)
+    return {name: pd.Series(np.linspace(1, 2, 50) * scale, index=index) for name, scale in [("A", 1), ("B", 2)]}
+
+
+@pytest.mark.parametrize("alarm", [True, False])
+def test_hung_fit_times_out_without_blocking_the_others(closes, monkeypatch, alarm):
+    if not alarm:
+        monkeypatch.delattr(signal, "SIGALRM", raising=False)
+    elif not hasattr(signal, "SIGALRM"):
+        pytest.skip("SIGALRM is not available")
+
+    started = time.perf_counter()
+    table = arima_garch.model_universe(closes, models=("hung", "quick"), workers=2, timeout=1)
+    assert time.perf_counter() - started < 20
+
+    status = table.groupby(["Series", "Model"])["Status"].first()
+    assert (status.xs("hung", level="Model") == "timeout").all()
+    assert (status.xs("quick", level="Model") == "ok").all()
+    values = table[table["Model"] == "quick"].set_index("Series")["Value"]
+    assert values.to_dict() == {"A": 2.0, "B": 4.0}
@@ -0,0 +1,42 @@
+from functools import partial
+
+import numpy as np
+
+from equity_analysis import path_stats, simulation
+
+S0, MU, SIGMA, DAYS = 100.0, 0.0005, 0.02, 30
+
+
+def touch_estimate(control_mean):
+    touches = path_stats.MeanEstimator(partial(path_stats.target_touches, targets=[110.0, 92.0], reference=S0),
+                                       "path", control_mean)
+    simulation.estimate(S0, MU, SIGMA, [touches], DAYS, 50_000, method="plain", seed=3)
+    return touches.result()
+
+
+def test_control_variate_reduces_touch_probability_error():
+    plain, plain_errors = touch_estimate(None)
+    controlled, control_errors = touch_estimate(S0 * np.exp(MU * DAYS))
+    assert np.all(control_errors > 0)
+    assert np.all(control_errors < plain_errors)
+    assert np.all(np.abs(controlled - plain) < 4 * plain_errors)
+
+
+def test_mean_final_price_is_reported_raw():
+    final = path_stats.MeanEstimator(path_stats.final_price, "path")
+    simulation.estimate(S0, MU, SIGMA, [final], DAYS, 20_000, method="plain", seed=3)
+    estimate, error = final.result()
+    paths = np.concatenate(list(simulation.simulate_paths(S0, MU, SIGMA, DAYS, 20_000, seed=3)), axis=1)
+    assert error[0] > 1e-3
+    np.testing.assert_allclose(estimate[0], paths[-1].mean())
+
+
+def test_sorted_extremes_match_a_scan_of_the_paths():
+    paths = np.concatenate(list(simulation.simulate_paths(S0, MU, SIGMA, DAYS, 5_000, seed=9, chunk_size=1_000)),
+                           axis=1)
+    forecast = path_stats.ForecastResult(paths)
+    targets = np.array([80.0, 95.0, paths.min(), S0, 105.0, 120.0, paths.max()])
+    np.testing.assert_allclose(forecast.probability_above(targets),
+                               [(paths >= target).any(axis=0).mean() * 100 for target in targets])
+    np.testing.assert_allclose(forecast.probability_below(targets),
+                               [(paths <= target).any(axis=0).mean() * 100 for target in targets])
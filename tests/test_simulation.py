@@ -0,0 +1,37 @@
+import numpy as np
+
+from equity_analysis import simulation
+
+S0, MU, SIGMA = 100.0, 0.0003, 0.02
+
+
+def reference_paths(days, simulations, seed, chunk_size):
+    """The original per-path formula S0 * exp(cumsum(mu - sigma^2 / 2 + sigma * Z)) on the per-chunk streams."""
+    sizes = simulation.chunk_sizes(simulations, chunk_size)
+    streams = np.random.SeedSequence(seed).spawn(len(sizes))
+    chunks = []
+    for size, stream in zip(sizes, streams):
+        Z = np.random.default_rng(stream).standard_normal((days, size))
+        chunks.append(S0 * np.exp(np.cumsum(MU - 0.5 * SIGMA ** 2 + SIGMA * Z, axis=0)))
+    return np.concatenate(chunks, axis=1)
+
+
+def test_chunked_paths_match_reference_for_a_seed():
+    paths = np.concatenate(list(simulation.simulate_paths(S0, MU, SIGMA, 30, 2_500, seed=42, chunk_size=1_000)), axis=1)
+    np.testing.assert_allclose(paths, reference_paths(30, 2_500, 42, 1_000), rtol=1e-12)
+
+
+def test_paths_do_not_depend_on_workers():
+    def run(workers):
+        return np.concatenate(list(simulation.simulate_paths(S0, MU, SIGMA, 20, 3_000, seed=7, chunk_size=500,
+                                                             workers=workers)), axis=1)
+
+    np.testing.assert_array_equal(run(1), run(3))
+    assert not np.array_equal(run(1), np.concatenate(list(simulation.simulate_paths(
+        S0, MU, SIGMA, 20, 3_000, seed=8, chunk_size=500)), axis=1))
+
+
+def test_benchmark_reports_throughput():
+    result = simulation.benchmark_mcs(days=10, simulations=5_000, chunk_size=1_000, seed=0)
+    assert result["paths"] == 5_000 and result["paths_per_second"] > 0
+    assert abs(result["mean_final_price"] / (S0 * np.exp(MU * 10)) - 1) < 0.01
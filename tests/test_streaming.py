@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from equity_analysis import analytics, bar_store
+from equity_analysis.streaming import IndicatorEngine
+
+
+@pytest.fixture
+def ohlcv():
+    """Fixed random-walk OHLCV frame with a gap, long enough to fill every indicator window."""
+    rng = np.random.default_rng(7)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 300)))
+    high = close * (1 + rng.uniform(0, 0.02, 300))
+    low = close * (1 - rng.uniform(0, 0.02, 300))
+    close[150] = np.nan
+    return pd.DataFrame({
+        "Date": pd.date_range("2023-01-02", periods=300, freq="B"),
+        "Open": close,
+        "High": high,
+        "Low": low,
+        "Close": close,
+        "Volume": rng.integers(1_000, 10_000, 300).astype(np.float64),
+    })
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(bar_store, "STORE_DIR", str(tmp_path / "bar_store"))
+    monkeypatch.setattr(analytics, "STATE_DIR", str(tmp_path / "indicator_state"))
+    return tmp_path
+
+
+def stream(data, engine=None):
+    engine = engine or IndicatorEngine()
+    rows = [engine.update(high, low, close) for high, low, close in zip(data["High"], data["Low"], data["Close"])]
+    return pd.DataFrame(rows, columns=IndicatorEngine.columns)
+
+
+def test_stream_matches_batch_indicators(store, ohlcv):
+    bar_store.write_bars(ohlcv, "data_1d")
+    analytics.add_analytics_to_df()
+    batch = bar_store.read_bars("data_1d", columns=IndicatorEngine.columns)
+
+    streamed = stream(ohlcv)
+    for column in IndicatorEngine.columns:
+        np.testing.assert_array_equal(streamed[column].to_numpy(), batch[column].to_numpy(), err_msg=column)
+
+
+def test_saved_engine_resumes_exactly(store, ohlcv):
+    engine = IndicatorEngine()
+    stream(ohlcv.iloc[:200], engine)
+    state_path = store / "engine.json"
+    engine.save(state_path, position=200)
+
+    resumed, extra = IndicatorEngine.load(state_path)
+    assert extra == {"position": 200}
+    pd.testing.assert_frame_equal(stream(ohlcv.iloc[200:], resumed), stream(ohlcv).iloc[200:].reset_index(drop=True))
+
+
+def test_update_analytics_matches_full_recompute(store, ohlcv):
+    bar_store.write_bars(ohlcv.iloc[:250], "data_1d")
+    analytics.update_analytics("data_1d")
+    bar_store.append_bars(ohlcv.iloc[250:], "data_1d")
+    analytics.update_analytics("data_1d")
+    incremental = bar_store.read_bars("data_1d", columns=IndicatorEngine.columns)
+
+    streamed = stream(ohlcv)
+    for column in IndicatorEngine.columns:
+        np.testing.assert_array_equal(incremental[column].to_numpy(), streamed[column].to_numpy(), err_msg=column)
+
+
+def test_engine_keeps_one_copy_of_the_macd_emas(ohlcv):
+    engine = IndicatorEngine()
+    streamed = stream(ohlcv, engine)
+    assert set(engine.to_dict()) == {"ma_50", "atr_14", "rsi_14", "macd"}
+    np.testing.assert_array_equal(streamed["MACD"], streamed["EMA_12"] - streamed["EMA_26"])
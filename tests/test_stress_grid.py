@@ -0,0 +1,32 @@
+import numpy as np
+from scipy import stats
+
+from equity_analysis import MCS, simulation
+
+S0, DAYS, SIMULATIONS = 100.0, 20, 30_000
+SIGMAS, DISTRIBUTIONS = [0.02, 0.04], ["log_normal", "normal"]
+
+
+def grid_cube(workers, chunk_size=4_000):
+    statistics = MCS.StressScenarios(S0, SIGMAS, DISTRIBUTIONS, 3 * S0, DAYS)
+    partials = simulation.map_chunks(MCS.common_uniforms, {}, DAYS, SIMULATIONS, seed=5, chunk_size=chunk_size,
+                                     workers=workers, accumulators=[statistics])
+    simulation.merge_chunks([statistics], partials)
+    return statistics.cube()
+
+
+def test_chunked_grid_matches_the_full_matrix():
+    uniforms = np.concatenate(list(simulation.map_chunks(MCS.common_uniforms, {}, DAYS, SIMULATIONS, seed=5,
+                                                         chunk_size=4_000)), axis=1)
+    shocks = {"log_normal": np.cumsum(simulation.truncated_normal(uniforms, -2, 2), axis=0),
+              "normal": np.cumsum(stats.norm.ppf(uniforms), axis=0)}
+    steps = np.arange(1, DAYS + 1)[:, np.newaxis]
+    cube = grid_cube(workers=1)
+    for i, (sigma, distribution) in enumerate(zip(SIGMAS, DISTRIBUTIONS)):
+        paths = np.minimum(S0 * np.exp(-0.5 * sigma ** 2 * steps + sigma * shocks[distribution]), 3 * S0)
+        np.testing.assert_allclose(cube[i, :, 0], paths.mean(axis=1), rtol=1e-12)
+        np.testing.assert_allclose(cube[i, :, 1:], np.quantile(paths, [0.05, 0.5, 0.95], axis=1).T, rtol=1e-3)
+
+
+def test_grid_does_not_depend_on_workers():
+    np.testing.assert_array_equal(grid_cube(workers=1), grid_cube(workers=2))